@@ -1,7 +1,40 @@
 # admin.py
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
 from django.contrib.auth.hashers import make_password
+from django.db.models import Count
 from .models import PlatformUser, Course, Test, Question, Answer, Result, UserTheme
+from .search import SEARCH_SOURCES, matching_entries, tokenize
+
+
+class FullTextSearchMixin:
+    """Власне текстове поле моделі шукається через повнотекстовий індекс замість
+    LIKE '%...%'; решта search_fields (зв'язані моделі) - звичайним пошуком Django.
+    Результати об'єднуються, ліміту кількості немає"""
+    search_object_type = None
+    search_help_text = 'Повнотекстовий пошук: усі слова, кожне - за початком'
+
+    def get_search_fields(self, request):
+        fields = super().get_search_fields(request)
+        if getattr(request, '_full_text_search', False):
+            text_field = SEARCH_SOURCES[self.search_object_type][1]
+            fields = [field for field in fields if field != text_field]
+        return fields
+
+    def get_search_results(self, request, queryset, search_term):
+        if not tokenize(search_term):
+            return super().get_search_results(request, queryset, search_term)
+        results = queryset.filter(
+            pk__in=matching_entries(self.search_object_type, search_term).values('object_id')
+        )
+        request._full_text_search = True
+        try:
+            if not self.get_search_fields(request):
+                return results, False
+            related, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        finally:
+            request._full_text_search = False
+        return results | related, may_have_duplicates
 
 
 class PlatformUserAdmin(admin.ModelAdmin):
@@ -16,33 +49,50 @@ class PlatformUserAdmin(admin.ModelAdmin):
             obj.password = make_password(obj.password)
         super().save_model(request, obj, form, change)
 
+    # Кількість рахується одним запитом через annotate, а не .count() на кожен рядок
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(courses_count=Count('course', distinct=True))
+
     def get_courses_count(self, obj):
-        return obj.course_set.count()
+        return obj.courses_count
 
     get_courses_count.short_description = 'Кількість курсів'
+    get_courses_count.admin_order_field = 'courses_count'
 
 
-class CourseAdmin(admin.ModelAdmin):
+class CourseAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_object_type = 'course'
     list_display = ('course_id', 'course_name', 'teacher', 'get_tests_count')
     list_filter = ('teacher__role',)
     search_fields = ('course_name', 'teacher__username')
     raw_id_fields = ('teacher',)
+    # teacher може бути NULL - автоматичний select_related() Django його не підтягує
+    list_select_related = ('teacher',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(tests_count=Count('test', distinct=True))
 
     def get_tests_count(self, obj):
-        return obj.test_set.count()
+        return obj.tests_count
 
     get_tests_count.short_description = 'Кількість тестів'
+    get_tests_count.admin_order_field = 'tests_count'
 
 
-class TestAdmin(admin.ModelAdmin):
+class TestAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_object_type = 'test'
     list_display = ('test_id', 'test_name', 'course', 'get_questions_count')
     list_filter = ('course',)
     search_fields = ('test_name', 'course__course_name')
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(questions_count=Count('question', distinct=True))
+
     def get_questions_count(self, obj):
-        return obj.question_set.count()
+        return obj.questions_count
 
     get_questions_count.short_description = 'Кількість питань'
+    get_questions_count.admin_order_field = 'questions_count'
 
 
 class AnswerInline(admin.TabularInline):
@@ -51,7 +101,8 @@ class AnswerInline(admin.TabularInline):
     fields = ('answer_text', 'is_correct')
 
 
-class QuestionAdmin(admin.ModelAdmin):
+class QuestionAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_object_type = 'question'
     list_display = ('question_id', 'test', 'question_text_preview')
     list_filter = ('test',)
     search_fields = ('question_text', 'test__test_name')
@@ -63,7 +114,8 @@ class QuestionAdmin(admin.ModelAdmin):
     question_text_preview.short_description = 'Текст питання'
 
 
-class AnswerAdmin(admin.ModelAdmin):
+class AnswerAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_object_type = 'answer'
     list_display = ('answer_id', 'question', 'answer_text_preview', 'is_correct')
     list_filter = ('is_correct', 'question__test')
     search_fields = ('answer_text', 'question__question_text')
@@ -74,12 +126,54 @@ class AnswerAdmin(admin.ModelAdmin):
     answer_text_preview.short_description = 'Відповідь'
 
 
+class TestIdListFilter(admin.SimpleListFilter):
+    """Фільтр за id тесту з полем вводу. Звичайний фільтр за FK будує список з усіх
+    тестів (SELECT по всій таблиці tests на кожне відкриття списку результатів)"""
+    title = 'тестом (id)'
+    parameter_name = 'test_id'
+    template = 'admin/input_filter.html'
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value is None:
+            return queryset
+        if not value.isdigit():
+            raise IncorrectLookupParameters(f'{self.parameter_name}: очікується id тесту')
+        return queryset.filter(test_id=int(value))
+
+    def choices(self, changelist):
+        yield {
+            'selected': self.value() is None,
+            'query_string': changelist.get_query_string(remove=[self.parameter_name]),
+            'display': 'Усі',
+        }
+        yield {
+            'selected': self.value() is not None,
+            'parameter_name': self.parameter_name,
+            'value': self.value(),
+            # Решта параметрів списку зберігається прихованими полями форми
+            'query_parts': [
+                (name, value) for name, value in changelist.params.items() if name != self.parameter_name
+            ],
+        }
+
+
 class ResultAdmin(admin.ModelAdmin):
     list_display = ('result_id', 'user', 'test', 'score', 'passed_at', 'time_spent')
-    list_filter = ('test', 'passed_at')
+    list_filter = (TestIdListFilter, 'passed_at')
     search_fields = ('user__username', 'test__test_name')
     readonly_fields = ('passed_at',)
     date_hierarchy = 'passed_at'
+    raw_id_fields = ('user', 'test')
+    ordering = ('-result_id',)
+    # Без повного COUNT(*) по results на кожній сторінці списку з фільтром/пошуком
+    show_full_result_count = False
 
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('user', 'test')
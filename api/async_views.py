@@ -0,0 +1,150 @@
+"""Асинхронні версії гарячих сторінок і read-only API для запуску під ASGI (uvicorn).
+
+Запити до бази йдуть через async ORM і не тримають потік на час очікування.
+Кешовані синхронні помічники (ключ відповідей, лічильники, рейтинг) та рендеринг
+шаблонів (контекстні процесори читають сесію) виконуються через sync_to_async.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.shortcuts import render
+
+from .dashboard import get_dashboard_counters
+from .grading import get_answer_key
+from .leaderboard import get_leaderboard, clamp_window, window_start, LEADERBOARD_DEFAULT_DAYS
+from .models import PlatformUser, Course, Test, Question, Answer, Result
+from .pages import statistics_context, score_totals, totals_queryset, recent_days_queryset, top_students_queryset, \
+    hardest_tests_queryset, courses_stats_queryset, test_questions_queryset, students_queryset, graded_result, \
+    take_test_context, test_result_context
+from .serializers import UserSerializer, CourseSerializer, TestSerializer, QuestionSerializer, AnswerSerializer, \
+    ResultSerializer
+
+async_render = sync_to_async(render)
+
+
+async def _get_or_404(queryset, **lookup):
+    try:
+        return await queryset.aget(**lookup)
+    except queryset.model.DoesNotExist:
+        raise Http404
+
+
+async def statistics(request):
+    """Сторінка статистики (як views.statistics)"""
+    return await async_render(request, 'statistics.html', statistics_context(
+        await sync_to_async(get_dashboard_counters)(),
+        totals=await totals_queryset().aaggregate(**score_totals()),
+        recent_days=await recent_days_queryset().aaggregate(**score_totals()),
+        top_students=[row async for row in top_students_queryset()],
+        hardest_tests=[row async for row in hardest_tests_queryset()],
+        courses_stats=[course async for course in courses_stats_queryset()],
+    ))
+
+
+async def take_test(request, test_id):
+    """Проходження тесту (як views.take_test)"""
+    test = await _get_or_404(Test.objects.all(), test_id=test_id)
+
+    if request.method == 'POST':
+        grade = (await sync_to_async(get_answer_key)(test.test_id)).grade_post(request.POST)
+
+        user_id = request.POST.get('user_id')
+        if user_id:
+            await graded_result(test, await PlatformUser.objects.aget(id=user_id), grade).asave()
+
+        return await async_render(request, 'tests/test_result.html', test_result_context(test, grade))
+
+    return await async_render(request, 'tests/take_test.html', take_test_context(
+        test,
+        [question async for question in test_questions_queryset(test)],
+        [user async for user in students_queryset()],
+    ))
+
+
+async def top_results(request):
+    """Рейтинг студентів (як views.top_results)"""
+    days = clamp_window(request.GET.get('days', LEADERBOARD_DEFAULT_DAYS))
+    course = None
+    course_id = request.GET.get('course')
+    if course_id and course_id.isdigit():
+        course = await Course.objects.filter(course_id=course_id).afirst()
+
+    top_students = await sync_to_async(get_leaderboard)(
+        days=days, course_id=course.course_id if course else None
+    )
+    return await async_render(request, 'top_results/top_results.html', {
+        'top_students': top_students,
+        'week_ago': window_start(days),
+        'days': days,
+        'course': course,
+    })
+
+
+# === Read-only API ===
+API_RESOURCES = {
+    'users': (PlatformUser, UserSerializer),
+    'courses': (Course, CourseSerializer),
+    'tests': (Test, TestSerializer),
+    'questions': (Question, QuestionSerializer),
+    'answers': (Answer, AnswerSerializer),
+    'results': (Result, ResultSerializer),
+}
+API_PAGE_SIZE = getattr(settings, 'API_PAGE_SIZE', 50)
+API_MAX_PAGE_SIZE = getattr(settings, 'API_MAX_PAGE_SIZE', 500)
+
+
+def _resource(name):
+    if name not in API_RESOURCES:
+        raise Http404
+    return API_RESOURCES[name]
+
+
+async def _serializer_context(model, objects):
+    """Ключі відповідей для розгортання answers_data завантажуються заздалегідь -
+    серіалізатор тоді не звертається до бази"""
+    if model is not Result:
+        return {}
+    answer_keys = {}
+    for test_id in {obj.test_id for obj in objects if obj.answers_data is not None}:
+        answer_keys[test_id] = await sync_to_async(get_answer_key)(test_id)
+    return {'answer_keys': answer_keys}
+
+
+def _page_size(request):
+    try:
+        page_size = int(request.GET.get('page_size', API_PAGE_SIZE))
+    except ValueError:
+        page_size = API_PAGE_SIZE
+    return max(1, min(page_size, API_MAX_PAGE_SIZE))
+
+
+async def api_list(request, resource):
+    """GET /async/api/<resource>/?after=<pk>&page_size=N - keyset-пагінація за первинним ключем"""
+    model, serializer_class = _resource(resource)
+    page_size = _page_size(request)
+    after = request.GET.get('after', '')
+
+    queryset = model.objects.order_by('pk')
+    if after.isdigit():
+        queryset = queryset.filter(pk__gt=int(after))
+    objects = [obj async for obj in queryset[:page_size + 1]]
+    has_next = len(objects) > page_size
+    objects = objects[:page_size]
+
+    context = await _serializer_context(model, objects)
+    next_url = None
+    if has_next:
+        params = request.GET.copy()
+        params['after'] = objects[-1].pk
+        next_url = request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+    return JsonResponse({
+        'next': next_url,
+        'results': serializer_class(objects, many=True, context=context).data,
+    })
+
+
+async def api_detail(request, resource, pk):
+    model, serializer_class = _resource(resource)
+    obj = await _get_or_404(model.objects.all(), pk=pk)
+    context = await _serializer_context(model, [obj])
+    return JsonResponse(serializer_class(obj, context=context).data)
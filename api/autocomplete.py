@@ -0,0 +1,84 @@
+from django.conf import settings
+
+from .models import PlatformUser, Course, Test, Question
+from .search import search_ids
+
+AUTOCOMPLETE_DEFAULT_LIMIT = 20
+AUTOCOMPLETE_MAX_LIMIT = getattr(settings, 'AUTOCOMPLETE_MAX_LIMIT', 50)
+AUTOCOMPLETE_MIN_LENGTH = getattr(settings, 'AUTOCOMPLETE_MIN_LENGTH', 2)
+LABEL_MAX_LENGTH = 80
+
+
+def _label(text):
+    return text[:LABEL_MAX_LENGTH] + '...' if len(text) > LABEL_MAX_LENGTH else text
+
+
+class AutocompleteSource:
+    """Джерело варіантів для асинхронного select: queryset і поле з підписом.
+
+    search_type - тип повнотекстового індексу (api.search) для полів без власного
+    індексу; без нього пошук іде за префіксом поля, яке має бути проіндексоване.
+    """
+
+    def __init__(self, queryset, search_field, search_type=None):
+        self._queryset = queryset
+        self.search_field = search_field
+        self.search_type = search_type
+
+    def get_queryset(self):
+        return self._queryset()
+
+    def rows(self, queryset):
+        pk_name = queryset.model._meta.pk.name
+        return [
+            {'id': pk, 'text': _label(text)}
+            for pk, text in queryset.values_list(pk_name, self.search_field)
+        ]
+
+    def search(self, term, limit=AUTOCOMPLETE_DEFAULT_LIMIT):
+        """Порожній запит - перші об'єкти за первинним ключем (без сортування тексту).
+        Число також шукається як первинний ключ; текстовий пошук - лише від
+        AUTOCOMPLETE_MIN_LENGTH символів"""
+        queryset = self.get_queryset()
+        term = term.strip()
+        if not term:
+            return self.rows(queryset.order_by('pk')[:limit])
+
+        results = self.rows(queryset.filter(pk=int(term))) if term.isdigit() else []
+        if len(term) < AUTOCOMPLETE_MIN_LENGTH:
+            return results
+        if self.search_type:
+            # Індекс повертає ключі за релевантністю - порядок зберігаємо
+            ids = search_ids(self.search_type, term, limit=limit)
+            found = {row['id']: row for row in self.rows(queryset.filter(pk__in=ids))}
+            matches = [found[pk] for pk in ids if pk in found]
+        else:
+            matches = self.rows(
+                queryset.filter(**{f'{self.search_field}__istartswith': term}).order_by(self.search_field)[:limit]
+            )
+        seen = {row['id'] for row in results}
+        return (results + [row for row in matches if row['id'] not in seen])[:limit]
+
+    def selected(self, values):
+        """Підписи лише для вибраних значень - одним запитом"""
+        values = [value for value in values if str(value).isdigit()]
+        if not values:
+            return []
+        return self.rows(self.get_queryset().filter(pk__in=values))
+
+
+AUTOCOMPLETE_SOURCES = {
+    'students': AutocompleteSource(lambda: PlatformUser.objects.filter(role='student'), 'username'),
+    'teachers': AutocompleteSource(lambda: PlatformUser.objects.filter(role__in=['teacher', 'admin']), 'username'),
+    'courses': AutocompleteSource(Course.objects.all, 'course_name', search_type='course'),
+    'tests': AutocompleteSource(Test.objects.all, 'test_name', search_type='test'),
+    'questions': AutocompleteSource(Question.objects.all, 'question_text', search_type='question'),
+}
+
+
+def clamp_limit(limit):
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        return AUTOCOMPLETE_DEFAULT_LIMIT
+    return max(1, min(limit, AUTOCOMPLETE_MAX_LIMIT))
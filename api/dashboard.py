@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q
+
+from .models import PlatformUser, Course, Test, Question, Answer, Result
+
+DASHBOARD_CACHE_TIMEOUT = 60  # секунд
+DASHBOARD_CACHE_PREFIX = 'dashboard'
+
+ROLE_COUNTERS = {
+    'teacher': 'teachers_count',
+    'student': 'students_count',
+    'admin': 'admins_count',
+}
+
+TABLE_COUNTERS = {
+    PlatformUser: 'users_count',
+    Course: 'courses_count',
+    Test: 'tests_count',
+    Question: 'questions_count',
+    Answer: 'answers_count',
+    Result: 'results_count',
+}
+
+COUNTER_NAMES = list(ROLE_COUNTERS.values()) + list(TABLE_COUNTERS.values())
+
+
+def _cache_key(name):
+    return f'{DASHBOARD_CACHE_PREFIX}:{name}'
+
+
+def compute_counters():
+    """Рахує всі лічильники двома запитами"""
+    # Ролі - одна умовна агрегація по platform_users
+    counters = PlatformUser.objects.aggregate(**{
+        name: Count('id', filter=Q(role=role))
+        for role, name in ROLE_COUNTERS.items()
+    })
+
+    # Розміри таблиць - один запит зі скалярними підзапитами
+    quote = connection.ops.quote_name
+    selects = ', '.join(
+        f'(SELECT COUNT(*) FROM {quote(model._meta.db_table)})'
+        for model in TABLE_COUNTERS
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT {selects}')
+        row = cursor.fetchone()
+    counters.update(zip(TABLE_COUNTERS.values(), row))
+    return counters
+
+
+def get_dashboard_counters():
+    """Лічильники для головної сторінки: з кешу або перераховані"""
+    keys = {_cache_key(name): name for name in COUNTER_NAMES}
+    cached = cache.get_many(keys)
+    if len(cached) == len(keys):
+        return {keys[key]: value for key, value in cached.items()}
+
+    counters = compute_counters()
+    cache.set_many({_cache_key(name): value for name, value in counters.items()}, DASHBOARD_CACHE_TIMEOUT)
+    return counters
+
+
+def invalidate_counters():
+    """Скидає лічильники в кеші - наступне читання перерахує їх з бази.
+    Без cache.incr: у кеші окремого воркера (LocMem) прирости накопичували б розбіжність"""
+    cache.delete_many([_cache_key(name) for name in COUNTER_NAMES])
@@ -0,0 +1,264 @@
+"""Пул з'єднань з базою в межах процесу-воркера.
+
+Бекенди api.db_pool.mysql, api.db_pool.postgresql і api.db_pool.sqlite3 - це звичайні
+бекенди Django, у яких закриття з'єднання повертає його в пул, а нове з'єднання
+спершу береться з пулу. Налаштування - ключ POOL у DATABASES:
+{'SIZE': 10, 'MAX_OPEN': 20, 'CHECKOUT_TIMEOUT': 10, 'HEALTH_CHECK_INTERVAL': 30, 'MAX_LIFETIME': 3600}.
+
+Відкритих з'єднань (зайнятих і вільних) у процесі не більше MAX_OPEN: коли всі
+зайняті, потік чекає на повернене до CHECKOUT_TIMEOUT секунд і отримує PoolTimeout.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from django.db import OperationalError
+
+DEFAULT_POOL_OPTIONS = {
+    'SIZE': 10,                   # скільки вільних з'єднань тримати
+    'MAX_OPEN': 20,               # скільки з'єднань може бути відкрито одночасно
+    'CHECKOUT_TIMEOUT': 10,       # скільки чекати на вільне з'єднання, коли відкрито MAX_OPEN (с)
+    'HEALTH_CHECK_INTERVAL': 30,  # перевіряти з'єднання, що простояло довше (с)
+    'MAX_LIFETIME': 60 * 60,      # закривати з'єднання, старші за це (с)
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    """За CHECKOUT_TIMEOUT не звільнилося жодне з MAX_OPEN з'єднань"""
+
+
+class ConnectionPool:
+    """Вільні з'єднання одного набору параметрів; потокобезпечний"""
+
+    def __init__(self, alias, size, health_check_interval, max_lifetime, max_open=None, checkout_timeout=10):
+        self.alias = alias
+        self.size = size
+        self.max_open = max(max_open or size, 1)
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        self.max_lifetime = max_lifetime
+        self._idle = deque()  # (з'єднання, створено, повернуто)
+        self._created_at = {}
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)  # звільнилося місце або з'єднання
+        self._reserved = 0  # з'єднання, що відкриваються або перевіряються в acquire
+        self.in_use = 0
+        self.created = 0
+        self.reused = 0
+        self.health_checks = 0
+        self.health_check_failures = 0
+        self.closed = 0
+        self.max_in_use = 0
+        self.waits = 0
+        self.timeouts = 0
+
+    @property
+    def open(self):
+        return self.in_use + len(self._idle) + self._reserved
+
+    def _discard(self, connection):
+        self._created_at.pop(id(connection), None)
+        self.closed += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _reserve(self):
+        """Місце під з'єднання (до register, cancel_open або рішення acquire щодо вільного):
+        вільне з черги або None, якщо слід відкрити нове; коли відкрито max_open - чекає"""
+        deadline = None
+        while not self._idle and self.open >= self.max_open:
+            now = time.monotonic()
+            if deadline is None:
+                deadline = now + self.checkout_timeout
+                self.waits += 1
+            elif now >= deadline:
+                self.timeouts += 1
+                raise PoolTimeout(
+                    f"Пул '{self.alias}': усі {self.max_open} з'єднань зайняті довше {self.checkout_timeout} с"
+                )
+            self._available.wait(deadline - now)
+        self._reserved += 1
+        return self._idle.pop() if self._idle else None  # LIFO: найсвіжіше
+
+    def _unreserve(self):
+        self._reserved = max(self._reserved - 1, 0)
+        self._available.notify()
+
+    def acquire(self, ping):
+        """Вільне справне з'єднання або None - тоді слід відкрити нове й викликати register
+        (або cancel_open, якщо відкрити не вдалося); ping(з'єднання) кидає виняток,
+        якщо воно непрацездатне. PoolTimeout - відкрито max_open і жодне не звільнилося вчасно"""
+        while True:
+            with self._lock:
+                idle = self._reserve()
+                if idle is None:
+                    return None
+                connection, created_at, returned_at = idle
+            now = time.monotonic()
+            if now - created_at > self.max_lifetime:
+                with self._lock:
+                    self._unreserve()
+                    self._discard(connection)
+                continue
+            if now - returned_at > self.health_check_interval:
+                try:
+                    ping(connection)
+                except Exception:
+                    with self._lock:
+                        self.health_checks += 1
+                        self.health_check_failures += 1
+                        self._unreserve()
+                        self._discard(connection)
+                    continue
+                with self._lock:
+                    self.health_checks += 1
+            with self._lock:
+                self._reserved -= 1
+                self.reused += 1
+                self._checked_out()
+            return connection
+
+    def register(self, connection):
+        """Облік нового з'єднання, відкритого драйвером"""
+        with self._lock:
+            self._reserved = max(self._reserved - 1, 0)
+            self._created_at[id(connection)] = time.monotonic()
+            self.created += 1
+            self._checked_out()
+
+    def cancel_open(self):
+        """Звільняє місце, зарезервоване acquire, якщо нове з'єднання не відкрилося"""
+        with self._lock:
+            self._unreserve()
+
+    def _checked_out(self):
+        self.in_use += 1
+        self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def release(self, connection, reusable=True):
+        """Повертає з'єднання в пул; зайві, застарілі та зіпсовані закриваються"""
+        now = time.monotonic()
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+            created_at = self._created_at.get(id(connection), now)
+            if reusable and len(self._idle) < self.size and now - created_at <= self.max_lifetime:
+                self._idle.append((connection, created_at, now))
+                self._available.notify()
+                return True
+            self._discard(connection)
+            self._available.notify()
+            return False
+
+    def clear(self):
+        with self._lock:
+            while self._idle:
+                self._discard(self._idle.pop()[0])
+            self._available.notify_all()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': self.size,
+                'max_open': self.max_open,
+                'open': self.open,
+                'idle': len(self._idle),
+                'in_use': self.in_use,
+                'max_in_use': self.max_in_use,
+                'waits': self.waits,
+                'timeouts': self.timeouts,
+                'created': self.created,
+                'reused': self.reused,
+                'health_checks': self.health_checks,
+                'health_check_failures': self.health_check_failures,
+                'closed': self.closed,
+            }
+
+
+def pool_options(settings_dict):
+    return {**DEFAULT_POOL_OPTIONS, **(settings_dict.get('POOL') or {})}
+
+
+def get_pool(alias, settings_dict):
+    """Пул процесу для з'єднання; ключ включає параметри, тож тестова база має окремий пул"""
+    key = (os.getpid(), alias, str(settings_dict.get('NAME')), settings_dict.get('HOST'),
+           settings_dict.get('PORT'), settings_dict.get('USER'))
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                options = pool_options(settings_dict)
+                pool = _pools[key] = ConnectionPool(
+                    alias, options['SIZE'], options['HEALTH_CHECK_INTERVAL'], options['MAX_LIFETIME'],
+                    max_open=options['MAX_OPEN'], checkout_timeout=options['CHECKOUT_TIMEOUT'],
+                )
+    return pool
+
+
+def pool_stats():
+    """Статистика пулів поточного процесу (кожен воркер має власні пули)"""
+    pid = os.getpid()
+    with _pools_lock:
+        pools = [(key, pool) for key, pool in _pools.items() if key[0] == pid]
+    return {
+        'pid': pid,
+        'pools': [{'alias': key[1], 'database': key[2], **pool.stats()} for key, pool in pools],
+    }
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.clear()
+
+
+class PooledDatabaseWrapperMixin:
+    """Домішка до DatabaseWrapper: get_new_connection бере з пулу, _close повертає в пул"""
+
+    def ping_connection(self, connection):
+        cursor = connection.cursor()
+        try:
+            cursor.execute('SELECT 1')
+        finally:
+            cursor.close()
+
+    def reset_connection(self, connection):
+        """Стан, який не повинен перейти до наступного користувача з'єднання"""
+        if not self.autocommit:
+            connection.rollback()
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        connection = pool.acquire(self.ping_connection)
+        if connection is None:
+            try:
+                connection = super().get_new_connection(conn_params)
+            except BaseException:
+                pool.cancel_open()
+                raise
+            pool.register(connection)
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # Незавершена транзакція чи помилки - з'єднання не повертається в пул
+        reusable = not self.in_atomic_block and not self.errors_occurred
+        if reusable:
+            try:
+                self.reset_connection(self.connection)
+            except Exception:
+                reusable = False
+        with self.wrap_database_errors:
+            self.pool.release(self.connection, reusable=reusable)
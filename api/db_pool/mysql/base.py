@@ -0,0 +1,8 @@
+from django.db.backends.mysql import base
+
+from .. import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    def ping_connection(self, connection):
+        connection.ping(False)
@@ -0,0 +1,11 @@
+from django.db.backends.postgresql import base
+
+from .. import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    def reset_connection(self, connection):
+        # Розірване з'єднання psycopg2 не повертаємо в пул
+        if connection.closed:
+            raise ConnectionError("З'єднання закрито")
+        super().reset_connection(connection)
@@ -0,0 +1,7 @@
+from django.db.backends.sqlite3 import base
+
+from .. import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """SQLite з пулом - для локальної перевірки пулу без MySQL/PostgreSQL"""
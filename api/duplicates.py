@@ -0,0 +1,241 @@
+"""Пошук точних і майже однакових питань у всьому банку.
+
+Текст нормалізується (регістр, пунктуація, пробіли), точні дублікати групуються
+за нормалізованим текстом. Для унікальних текстів рахується MinHash-сигнатура
+символьних шинглів, а LSH (сигнатура ділиться на смуги, однакова смуга - кандидат)
+дає пари-кандидати без порівняння кожного з кожним. Кандидати перевіряються
+оцінкою схожості Жаккара за сигнатурами.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Question, DuplicateReport
+from .search import tokenize
+
+DUPLICATE_THRESHOLD = getattr(settings, 'DUPLICATE_QUESTIONS_THRESHOLD', 0.8)
+DUPLICATE_CACHE_TIMEOUT = getattr(settings, 'DUPLICATE_QUESTIONS_CACHE_TIMEOUT', 3600)
+MINHASH_PERMUTATIONS = 128
+SHINGLE_SIZE = 5
+LOAD_BATCH_SIZE = 5000
+# Фіксовані непарні множники: хеші однакові в усіх процесах і запусках
+SHINGLE_WEIGHTS = np.random.default_rng(2).integers(1, 1 << 63, SHINGLE_SIZE, dtype=np.uint64) * np.uint64(2) \
+    + np.uint64(1)
+SIGNATURE_BATCH_SHINGLES = 2000  # матриця пачки (шингли x 128 x 8 байт) вміщується в кеш процесора
+
+
+def normalize_text(text):
+    return ' '.join(tokenize(text))
+
+
+def shingle_hashes(normalized, size=SHINGLE_SIZE):
+    """64-бітні хеші символьних шинглів довжини size: поліном від кодів символів у
+    ковзному вікні, без Python-циклу по шинглах. Повтори не прибираються - на мінімум
+    у MinHash вони не впливають"""
+    codes = np.frombuffer(normalized.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    if len(codes) <= size:
+        return np.array([(codes * SHINGLE_WEIGHTS[:len(codes)]).sum()], dtype=np.uint64)
+    return sliding_window_view(codes, size) @ SHINGLE_WEIGHTS
+
+
+class MinHasher:
+    """num_perm хеш-функцій multiply-shift ((a*x + b) mod 2^64) >> 32 над хешами
+    шинглів; сигнатура - мінімум кожної функції по всіх шинглах тексту"""
+
+    def __init__(self, num_perm=MINHASH_PERMUTATIONS, seed=1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, 1 << 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)
+
+    def signatures(self, shingle_sets):
+        """Матриця сигнатур (текстів x num_perm) для списку масивів хешів шинглів.
+        Тексти обробляються пачками як одна матриця шингли x функції; мінімум по
+        шинглах кожного тексту - np.minimum.reduceat за межами його рядків"""
+        result = np.empty((len(shingle_sets), self.num_perm), dtype=np.uint32)
+        start = 0
+        while start < len(shingle_sets):
+            end, size = start, 0
+            while end < len(shingle_sets) and (size < SIGNATURE_BATCH_SHINGLES or end == start):
+                size += len(shingle_sets[end])
+                end += 1
+            hashes = np.concatenate(shingle_sets[start:end])
+            offsets = np.cumsum([0] + [len(item) for item in shingle_sets[start:end - 1]])
+            values = hashes[:, None] * self.a  # переповнення uint64 - частина схеми multiply-shift
+            values += self.b
+            values >>= np.uint64(32)
+            result[start:end] = np.minimum.reduceat(values.astype(np.uint32), offsets, axis=0)
+            start = end
+        return result
+
+
+def lsh_params(threshold, num_perm=MINHASH_PERMUTATIONS):
+    """(смуг, рядків у смузі) з порогом (1/b)^(1/r) якомога ближчим до threshold знизу -
+    пара зі схожістю threshold стає кандидатом з високою ймовірністю"""
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+def _load_questions(queryset):
+    """{нормалізований текст: [question_id, ...]} keyset-пачками по pk"""
+    groups = {}
+    queryset = queryset.order_by('pk').values_list('pk', 'question_text')
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:LOAD_BATCH_SIZE])
+        if not batch:
+            return groups
+        for pk, text in batch:
+            normalized = normalize_text(text)
+            if normalized:
+                groups.setdefault(normalized, []).append(pk)
+        last_pk = batch[-1][0]
+
+
+def _near_duplicate_groups(signatures, threshold):
+    """Кластери індексів унікальних текстів навколо "лідера": кожен член схожий
+    саме на лідера (>= threshold), тож ланцюжки A~B~C не зливають несхожі A і C.
+
+    Кандидати лідера - тексти з його LSH-кошиків; розподілені тексти з кошиків
+    вилучаються, тому кожен текст переглядається майже один раз.
+    """
+    count, num_perm = signatures.shape
+    bands, rows = lsh_params(threshold, num_perm)
+    text_buckets = np.empty((bands, count), dtype=np.intp)
+    band_weights = np.random.default_rng(0).integers(1, 1 << 63, rows, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    buckets = []
+    for band in range(bands):
+        # Смуга згортається в один uint64 - np.unique по одному стовпцю значно швидший, ніж по рядках;
+        # випадковий збіг ключів лише додає кандидата, якого відсіє перевірка схожості
+        band_keys = (signatures[:, band * rows:(band + 1) * rows].astype(np.uint64) * band_weights).sum(axis=1)
+        _, bucket_ids = np.unique(band_keys, return_inverse=True)
+        text_buckets[band] = bucket_ids
+        order = np.argsort(bucket_ids, kind='stable')
+        bounds = np.flatnonzero(np.diff(bucket_ids[order])) + 1
+        buckets.append({
+            int(bucket_ids[members[0]]): set(members.tolist())
+            for members in np.split(order, bounds) if len(members) > 1
+        })
+
+    def remove(indices):
+        for index in indices:
+            for band in range(bands):
+                bucket = buckets[band].get(text_buckets[band, index])
+                if bucket is not None:
+                    bucket.discard(index)
+
+    assigned = np.zeros(count, dtype=bool)
+    clusters = []
+    for leader in range(count):
+        if assigned[leader]:
+            continue
+        candidates = set()
+        for band in range(bands):
+            candidates |= buckets[band].get(text_buckets[band, leader], set())
+        candidates.discard(leader)
+        remove([leader])
+        if not candidates:
+            continue
+        candidates = np.fromiter(sorted(candidates), dtype=np.intp, count=len(candidates))
+        similar = candidates[(signatures[candidates] == signatures[leader]).mean(axis=1) >= threshold].tolist()
+        if similar:
+            assigned[similar] = True
+            remove(similar)
+            clusters.append([leader] + similar)
+    return clusters
+
+
+def _question_details(question_ids):
+    details = {}
+    question_ids = list(question_ids)
+    for start in range(0, len(question_ids), 1000):
+        for row in Question.objects.filter(pk__in=question_ids[start:start + 1000]).values(
+            'question_id', 'question_text', 'test_id', 'test__test_name', 'test__course_id', 'test__course__course_name'
+        ):
+            details[row['question_id']] = {
+                'question_id': row['question_id'],
+                'question_text': row['question_text'],
+                'test_id': row['test_id'],
+                'test_name': row['test__test_name'],
+                'course_id': row['test__course_id'],
+                'course_name': row['test__course__course_name'],
+            }
+    return details
+
+
+def find_duplicates(threshold=DUPLICATE_THRESHOLD, num_perm=MINHASH_PERMUTATIONS, queryset=None):
+    """Кластери дублікатів, найбільші першими.
+
+    kind - 'exact' (однаковий нормалізований текст) або 'near'; similarity -
+    мінімальна оцінена схожість членів кластера з його першим текстом (лідером).
+    """
+    groups = _load_questions(queryset if queryset is not None else Question.objects.all())
+    texts = list(groups)
+
+    clusters = [[index] for index, text in enumerate(texts) if len(groups[text]) > 1]
+    similarities = [1.0] * len(clusters)
+    if len(texts) > 1 and threshold < 1:
+        signatures = MinHasher(num_perm).signatures([shingle_hashes(text) for text in texts])
+
+        # Точні групи, що увійшли в кластер майже однакових, окремо не показуються
+        near = _near_duplicate_groups(signatures, threshold)
+        in_near = {index for members in near for index in members}
+        clusters = [members for members in clusters if members[0] not in in_near] + near
+        similarities = [
+            float((signatures[members[1:]] == signatures[members[0]]).mean(axis=1).min()) if len(members) > 1 else 1.0
+            for members in clusters
+        ]
+
+    question_ids = [[pk for index in members for pk in groups[texts[index]]] for members in clusters]
+    details = _question_details(pk for pks in question_ids for pk in pks)
+    report = [
+        {
+            'kind': 'exact' if len(members) == 1 else 'near',
+            'similarity': round(similarity, 3),
+            'size': len(pks),
+            'questions': [details[pk] for pk in pks if pk in details],
+        }
+        for members, similarity, pks in zip(clusters, similarities, question_ids)
+    ]
+    report.sort(key=lambda cluster: -cluster['size'])
+    return {
+        'threshold': threshold,
+        'questions_scanned': sum(len(pks) for pks in groups.values()),
+        'duplicate_questions': sum(cluster['size'] - 1 for cluster in report),
+        'clusters': report,
+    }
+
+
+def save_duplicate_report(report):
+    """Зберігає звіт як останній; попередні видаляються"""
+    with transaction.atomic():
+        saved = DuplicateReport.objects.create(threshold=report['threshold'], report=report)
+        DuplicateReport.objects.exclude(pk=saved.pk).delete()
+    return saved
+
+
+def latest_duplicate_report():
+    """Останній збережений звіт з часом розрахунку або None. Сам пошук у запиті не
+    виконується (на 200 тис. питань це десятки секунд) - лише команда find_duplicate_questions.
+    Розібраний JSON кешується за id звіту, тож запит читає з бази лише id"""
+    latest = DuplicateReport.objects.order_by('-pk').values_list('pk', 'created_at').first()
+    if latest is None:
+        return None
+    pk, created_at = latest
+    key = f'question_duplicates:{pk}'
+    report = cache.get(key)
+    if report is None:
+        report = {
+            **DuplicateReport.objects.values_list('report', flat=True).get(pk=pk),
+            'computed_at': created_at.isoformat(),
+        }
+        cache.set(key, report, DUPLICATE_CACHE_TIMEOUT)
+    return report
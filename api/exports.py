@@ -0,0 +1,129 @@
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .grading import expand_answers_data
+from .models import Result
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+EXPORT_CHUNK_SIZE = getattr(settings, 'RESULTS_EXPORT_CHUNK_SIZE', 2000)
+
+EXPORT_FIELDS = (
+    'result_id', 'user_id', 'user__username', 'test_id', 'test__test_name', 'test__course_id',
+    'score', 'passed_at', 'time_spent',
+)
+EXPORT_HEADER = (
+    'result_id', 'user_id', 'username', 'test_id', 'test_name', 'course_id',
+    'score', 'passed_at', 'time_spent',
+)
+
+
+class ExportFilterError(ValueError):
+    pass
+
+
+def _day_start(value, name):
+    try:
+        day = parse_date(value)
+    except ValueError:
+        # Правильний формат, але неіснуюча дата (2024-02-30)
+        day = None
+    if day is None:
+        raise ExportFilterError(f'{name}: очікується дата у форматі РРРР-ММ-ДД')
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def parse_export_filters(params):
+    """Фільтри експорту з GET-параметрів: test, course, date_from, date_to (включно), answers"""
+    filters = {}
+    for name in ('test', 'course'):
+        value = params.get(name)
+        if value:
+            if not value.isdigit():
+                raise ExportFilterError(f'{name}: очікується ціле число')
+            filters[f'{name}_id'] = int(value)
+    if params.get('date_from'):
+        filters['date_from'] = _day_start(params['date_from'], 'date_from')
+    if params.get('date_to'):
+        filters['date_to'] = _day_start(params['date_to'], 'date_to') + timedelta(days=1)
+    filters['include_answers'] = params.get('answers', '0').lower() in ('1', 'true', 'yes')
+    return filters
+
+
+def export_queryset(test_id=None, course_id=None, date_from=None, date_to=None, include_answers=False):
+    """Рядки експорту як кортежі полів EXPORT_FIELDS; date_to - виключна межа"""
+    queryset = Result.objects.all()
+    if test_id is not None:
+        queryset = queryset.filter(test_id=test_id)
+    if course_id is not None:
+        queryset = queryset.filter(test__course_id=course_id)
+    if date_from is not None:
+        queryset = queryset.filter(passed_at__gte=date_from)
+    if date_to is not None:
+        queryset = queryset.filter(passed_at__lt=date_to)
+
+    fields = EXPORT_FIELDS + ('answers_data',) if include_answers else EXPORT_FIELDS
+    return queryset.order_by('pk').values_list(*fields)
+
+
+def iter_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Keyset-пачки по pk: у пам'яті щонайбільше chunk_size рядків незалежно від драйвера БД
+    (PyMySQL без серверного курсора інакше буферизує весь результат)"""
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+        if not batch:
+            return
+        yield from batch
+        last_pk = batch[-1][0]
+
+
+def with_answer_details(rows):
+    """Розгортає компактний answers_data (останнє поле); ключі відповідей - один на тест"""
+    answer_keys = {}
+    for row in rows:
+        yield row[:-1] + (expand_answers_data(row[-1], row[3], answer_keys) if row[-1] is not None else None,)
+
+
+class _Echo:
+    """Псевдо-файл для csv.writer: повертає рядок замість запису"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows, include_answers=False):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_HEADER + ('answers_data',) if include_answers else EXPORT_HEADER)
+    for row in rows:
+        row = list(row)
+        row[7] = row[7].isoformat()
+        if include_answers:
+            row[-1] = json.dumps(row[-1], ensure_ascii=False) if row[-1] is not None else ''
+        yield writer.writerow(row)
+
+
+def iter_jsonl(rows, include_answers=False):
+    header = EXPORT_HEADER + ('answers_data',) if include_answers else EXPORT_HEADER
+    for row in rows:
+        yield json.dumps(dict(zip(header, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def stream_export(export_format, filters, chunk_size=EXPORT_CHUNK_SIZE):
+    """Генератор рядків експорту у вибраному форматі"""
+    include_answers = filters.get('include_answers', False)
+    rows = iter_rows(export_queryset(**filters), chunk_size)
+    if include_answers:
+        rows = with_answer_details(rows)
+    if export_format == 'csv':
+        return iter_csv(rows, include_answers)
+    return iter_jsonl(rows, include_answers)
+
+
+def export_content_type(export_format):
+    return 'text/csv; charset=utf-8' if export_format == 'csv' else 'application/x-ndjson; charset=utf-8'
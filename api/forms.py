@@ -1,5 +1,6 @@
 from django import forms
 from .models import PlatformUser, Course, Test, Question, Answer, Result, UserTheme
+from .widgets import AutocompleteSelect
 
 
 class UserForm(forms.ModelForm):
@@ -35,7 +36,7 @@ class CourseForm(forms.ModelForm):
                 'placeholder': 'Введіть опис курсу',
                 'rows': 4
             }),
-            'teacher': forms.Select(attrs={
+            'teacher': AutocompleteSelect('teachers', attrs={
                 'class': 'form-control'
             })
         }
@@ -55,7 +56,7 @@ class TestForm(forms.ModelForm):
         model = Test
         fields = ['course', 'test_name', 'description']
         widgets = {
-            'course': forms.Select(attrs={
+            'course': AutocompleteSelect('courses', attrs={
                 'class': 'form-control'
             }),
             'test_name': forms.TextInput(attrs={
@@ -81,7 +82,7 @@ class QuestionForm(forms.ModelForm):
         model = Question
         fields = ['test', 'question_text']
         widgets = {
-            'test': forms.Select(attrs={
+            'test': AutocompleteSelect('tests', attrs={
                 'class': 'form-control'
             }),
             'question_text': forms.Textarea(attrs={
@@ -97,12 +98,23 @@ class QuestionForm(forms.ModelForm):
         self.fields['question_text'].label = "Текст питання"
 
 
+class QuestionImportForm(forms.Form):
+    test = forms.ModelChoiceField(
+        queryset=Test.objects.all(), label="Тест",
+        widget=AutocompleteSelect('tests', attrs={'class': 'form-control'})
+    )
+    file = forms.FileField(
+        label="Файл банку питань (JSON або CSV)",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.json,.csv'})
+    )
+
+
 class AnswerForm(forms.ModelForm):
     class Meta:
         model = Answer
         fields = ['question', 'answer_text', 'is_correct']
         widgets = {
-            'question': forms.Select(attrs={
+            'question': AutocompleteSelect('questions', attrs={
                 'class': 'form-control'
             }),
             'answer_text': forms.Textarea(attrs={
@@ -127,10 +139,10 @@ class ResultForm(forms.ModelForm):
         model = Result
         fields = ['user', 'test', 'score']
         widgets = {
-            'user': forms.Select(attrs={
+            'user': AutocompleteSelect('students', attrs={
                 'class': 'form-control'
             }),
-            'test': forms.Select(attrs={
+            'test': AutocompleteSelect('tests', attrs={
                 'class': 'form-control'
             }),
             'score': forms.NumberInput(attrs={
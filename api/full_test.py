@@ -0,0 +1,41 @@
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from .models import Test, Question, Answer
+from .serializers import FullTestSerializer
+from .versioning import test_content_version
+
+FULL_TEST_CACHE_TIMEOUT = 60 * 60  # 1 година
+FULL_TEST_CACHE_PREFIX = 'full_test'
+
+
+def full_test_cache_key(test_id, version, include_correct):
+    return f'{FULL_TEST_CACHE_PREFIX}:{test_id}:{version}:{"full" if include_correct else "student"}'
+
+
+def full_test_queryset():
+    """Тест з питаннями і відповідями - рівно три запити незалежно від розміру"""
+    return Test.objects.prefetch_related(
+        Prefetch('question_set', queryset=Question.objects.order_by('question_id').prefetch_related(
+            Prefetch('answer_set', queryset=Answer.objects.order_by('answer_id'))
+        ))
+    )
+
+
+def get_full_test_payload(test_id, include_correct=False):
+    """Серіалізований тест з кешу; None, якщо тесту немає.
+    Правильні відповіді (is_correct) - лише з include_correct=True.
+    Ключ містить версію вмісту тесту з бази (як у ключа відповідей), тож зміну,
+    зроблену іншим воркером, видно одразу"""
+    version = test_content_version(test_id)
+    if version is None:
+        return None
+    key = full_test_cache_key(test_id, version, include_correct)
+    payload = cache.get(key)
+    if payload is None:
+        test = full_test_queryset().filter(test_id=test_id).first()
+        if test is None:
+            return None
+        payload = FullTestSerializer(test, context={'include_correct': include_correct}).data
+        cache.set(key, payload, FULL_TEST_CACHE_TIMEOUT)
+    return payload
@@ -0,0 +1,176 @@
+from django.core.cache import cache
+
+from .models import Question, Answer
+from .versioning import test_content_version
+
+ANSWER_KEY_CACHE_TIMEOUT = 60 * 60  # 1 година
+ANSWER_KEY_CACHE_PREFIX = 'answer_key'
+
+# Компактний формат Result.answers_data: {"v": 2, "s": [[question_id, answer_id], ...], "c": "101"}.
+# "s" - вибрані відповіді у порядку питань, "c" - правильність кожної на момент спроби.
+# Тексти питань і відповідей не зберігаються - вони відновлюються з ключа відповідей при читанні.
+ANSWERS_DATA_VERSION = 2
+DELETED_QUESTION_TEXT = 'Питання видалено'
+
+
+def answer_key_cache_key(test_id, version):
+    return f'{ANSWER_KEY_CACHE_PREFIX}:{test_id}:{version}'
+
+
+class AnswerKey:
+    """Ключ відповідей тесту: всі питання та варіанти, завантажені одним разом"""
+
+    def __init__(self, test_id, questions, answers):
+        self.test_id = test_id
+        # [(question_id, question_text), ...] у порядку питань тесту
+        self.questions = questions
+        # answer_id -> (question_id, answer_text, is_correct)
+        self.answers = answers
+        # question_id -> [(answer_id, answer_text), ...] лише правильні відповіді
+        self.correct = {}
+        for answer_id, (question_id, answer_text, is_correct) in answers.items():
+            if is_correct:
+                self.correct.setdefault(question_id, []).append((answer_id, answer_text))
+
+    @property
+    def total_questions(self):
+        return len(self.questions)
+
+    def correct_answer_text(self, question_id):
+        correct = self.correct.get(question_id)
+        return correct[0][1] if correct else ''
+
+    def grade(self, selections):
+        """Оцінює спробу без жодного запиту до бази.
+
+        selections - словник question_id -> answer_id (int або рядок з форми).
+        Відповідь, що не існує або належить іншому питанню, вважається пропущеною.
+        """
+        score = 0
+        answers_data = []
+        selected_ids = []
+
+        for question_id, question_text in self.questions:
+            selected_answer_id = selections.get(question_id)
+            if not selected_answer_id:
+                continue
+            try:
+                selected = self.answers.get(int(selected_answer_id))
+            except (TypeError, ValueError):
+                selected = None
+            if selected is None or selected[0] != question_id:
+                continue
+
+            _, selected_text, is_correct = selected
+            if is_correct:
+                score += 1
+
+            answers_data.append({
+                'question_id': question_id,
+                'question_text': question_text,
+                'selected_answer': selected_text,
+                'is_correct': is_correct,
+                'correct_answer': self.correct_answer_text(question_id),
+            })
+            selected_ids.append((question_id, int(selected_answer_id), is_correct))
+
+        total_questions = self.total_questions
+        final_score = (score / total_questions * 100) if total_questions > 0 else 0
+        return GradeResult(final_score, score, total_questions, answers_data, compact_answers(selected_ids))
+
+    def grade_post(self, data):
+        """Оцінює дані форми take_test (поля question_<id>)"""
+        selections = {
+            question_id: data.get(f'question_{question_id}')
+            for question_id, _ in self.questions
+        }
+        return self.grade(selections)
+
+    def expand(self, compact):
+        """Повні деталі спроби з компактного answers_data (тексти - поточні, правильність - на момент спроби)"""
+        question_texts = dict(self.questions)
+        details = []
+        for (question_id, answer_id), is_correct in zip(compact['s'], compact['c']):
+            selected = self.answers.get(answer_id)
+            details.append({
+                'question_id': question_id,
+                'question_text': question_texts.get(question_id, DELETED_QUESTION_TEXT),
+                'selected_answer': selected[1] if selected else '',
+                'is_correct': is_correct == '1',
+                'correct_answer': self.correct_answer_text(question_id),
+            })
+        return details
+
+
+class GradeResult:
+    def __init__(self, score, correct_answers, total_questions, answers_data, compact_answers_data=None):
+        self.score = score
+        self.correct_answers = correct_answers
+        self.total_questions = total_questions
+        # Повні деталі - для показу одразу після спроби; зберігається компактна форма
+        self.answers_data = answers_data
+        self.compact_answers_data = compact_answers_data
+
+
+def compact_answers(selected):
+    """[(question_id, answer_id, is_correct), ...] -> компактний answers_data"""
+    return {
+        'v': ANSWERS_DATA_VERSION,
+        's': [[question_id, answer_id] for question_id, answer_id, _ in selected],
+        'c': ''.join('1' if is_correct else '0' for _, _, is_correct in selected),
+    }
+
+
+def is_compact(answers_data):
+    return isinstance(answers_data, dict) and answers_data.get('v') == ANSWERS_DATA_VERSION
+
+
+def expand_answers_data(answers_data, test_id, answer_keys=None):
+    """Деталі спроби для показу: компактна форма розгортається за ключем відповідей тесту,
+    старий формат (список словників) повертається як є.
+
+    answer_keys - необов'язковий словник test_id -> AnswerKey для читання багатьох результатів.
+    """
+    if not is_compact(answers_data):
+        return answers_data or []
+    if answer_keys is None:
+        return get_answer_key(test_id).expand(answers_data)
+    if test_id not in answer_keys:
+        answer_keys[test_id] = get_answer_key(test_id)
+    return answer_keys[test_id].expand(answers_data)
+
+
+def build_answer_key(test_id):
+    """Будує ключ відповідей двома запитами (питання + відповіді)"""
+    questions = list(
+        Question.objects.filter(test_id=test_id)
+        .order_by('question_id')
+        .values_list('question_id', 'question_text')
+    )
+    answers = {
+        answer_id: (question_id, answer_text, is_correct)
+        for answer_id, question_id, answer_text, is_correct in (
+            Answer.objects.filter(question__test_id=test_id)
+            .order_by('answer_id')
+            .values_list('answer_id', 'question_id', 'answer_text', 'is_correct')
+        )
+    }
+    return AnswerKey(test_id, questions, answers)
+
+
+def get_answer_key(test_id):
+    """Повертає ключ відповідей з кешу, будуючи його за потреби.
+
+    Ключ кешу містить версію вмісту тесту з бази (test_content_version): зміна
+    питань чи відповідей в одному воркері робить застарілими кеші всіх воркерів,
+    тож оцінювання ніде не йде за старим ключем відповідей.
+    """
+    version = test_content_version(test_id)
+    if version is None:
+        return build_answer_key(test_id)
+    key = answer_key_cache_key(test_id, version)
+    answer_key = cache.get(key)
+    if answer_key is None:
+        answer_key = build_answer_key(test_id)
+        cache.set(key, answer_key, ANSWER_KEY_CACHE_TIMEOUT)
+    return answer_key
@@ -0,0 +1,99 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction, DatabaseError
+
+from .dashboard import invalidate_counters
+from .grading import get_answer_key
+from .item_analysis import invalidate_item_analysis
+from .models import PlatformUser, Test, Result
+from .rollups import apply_results, result_row
+from .serializers import BulkResultItemSerializer
+
+BULK_RESULTS_CHUNK_SIZE = getattr(settings, 'BULK_RESULTS_CHUNK_SIZE', 500)
+BULK_RESULTS_MAX_ITEMS = getattr(settings, 'BULK_RESULTS_MAX_ITEMS', 5000)
+
+STATUS_CREATED = 'created'
+STATUS_ERROR = 'error'
+
+
+def ingest_results(items, chunk_size=BULK_RESULTS_CHUNK_SIZE):
+    """Пакетно зберігає спроби тестів.
+
+    Повертає список статусів у порядку вхідних елементів:
+    {'index': i, 'status': 'created', 'result_id': ...} або
+    {'index': i, 'status': 'error', 'errors': {...}}.
+    """
+    statuses = [None] * len(items)
+    valid = []
+
+    # 1. Валідація формату без звернень до бази
+    for index, item in enumerate(items):
+        serializer = BulkResultItemSerializer(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            statuses[index] = {'index': index, 'status': STATUS_ERROR, 'errors': serializer.errors}
+
+    # 2. Перевірка користувачів і тестів - по одному запиту на таблицю
+    user_ids = set(PlatformUser.objects.filter(
+        id__in={data['user'] for _, data in valid}
+    ).values_list('id', flat=True))
+    test_ids = set(Test.objects.filter(
+        test_id__in={data['test'] for _, data in valid}
+    ).values_list('test_id', flat=True))
+
+    # 3. Оцінювання - ключ відповідей завантажується один раз на тест
+    answer_keys = {}
+    pending = []
+    for index, data in valid:
+        errors = {}
+        if data['user'] not in user_ids:
+            errors['user'] = ['Користувача не знайдено']
+        if data['test'] not in test_ids:
+            errors['test'] = ['Тест не знайдено']
+        if errors:
+            statuses[index] = {'index': index, 'status': STATUS_ERROR, 'errors': errors}
+            continue
+
+        answers_data = None
+        score = data.get('score')
+        if 'answers' in data:
+            answer_key = answer_keys.get(data['test'])
+            if answer_key is None:
+                answer_key = answer_keys[data['test']] = get_answer_key(data['test'])
+            grade = answer_key.grade(data['answers'])
+            answers_data = grade.compact_answers_data
+            if score is None:
+                score = Decimal(str(round(grade.score, 2)))
+
+        pending.append((index, Result(
+            user_id=data['user'],
+            test_id=data['test'],
+            score=score,
+            time_spent=data.get('time_spent'),
+            answers_data=answers_data,
+        )))
+
+    # 4. Вставка частинами; збій частини не зачіпає інші
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        try:
+            with transaction.atomic():
+                created = Result.objects.bulk_create([result for _, result in chunk])
+                # bulk_create не надсилає post_save - статистику оновлюємо однією групою після коміту,
+                # як і сигнали: транзакція частини не тримає блокувань рядків статистики курсів і днів
+                rows = [result_row(result) for result in created]
+                transaction.on_commit(lambda rows=rows: apply_results(rows))
+                for test_id in {result.test_id for result in created}:
+                    transaction.on_commit(lambda test_id=test_id: invalidate_item_analysis(test_id))
+                transaction.on_commit(invalidate_counters)
+        except DatabaseError as e:
+            for index, _ in chunk:
+                statuses[index] = {'index': index, 'status': STATUS_ERROR, 'errors': {'non_field_errors': [str(e)]}}
+            continue
+        for (index, _), result in zip(chunk, created):
+            # На MySQL bulk_create не повертає первинні ключі - тоді result_id буде None
+            statuses[index] = {'index': index, 'status': STATUS_CREATED, 'result_id': result.pk}
+
+    return statuses
@@ -0,0 +1,273 @@
+"""Аналіз завдань тесту (класична теорія тестів) за Result.answers_data.
+
+Спроби читаються keyset-пачками як сирий JSON; числа з компактного формату
+пачки розбираються одним викликом np.fromstring. Далі все рахується масивами
+NumPy без циклу по відповідях: вибрані
+питання й відповіді перетворюються на індекси стовпців через searchsorted, а
+лічильники збираються np.bincount. Для індексу дискримінації накопичується
+матриця "смуга сумарного балу x питання" (не більше ITEM_ANALYSIS_SCORE_BANDS
+смуг), тож верхню й нижню групи (по 27%) видно без зберігання всіх спроб у
+пам'яті, а пам'ять лінійна за кількістю питань. Поки смуг вистачає на кожен
+бал, результат точний; інакше межова смуга ділиться пропорційно.
+
+Відсутня відповідь (питання пропущене чи додане після спроби) рахується як
+неправильна для сумарного балу, альфи й дискримінації; складність питання -
+частка правильних серед спроб, у яких на нього відповіли.
+"""
+import json
+import re
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import TextField
+from django.db.models.functions import Cast
+
+from .grading import ANSWERS_DATA_VERSION, build_answer_key
+from .models import Result
+
+ITEM_ANALYSIS_CACHE_TIMEOUT = 60 * 60  # 1 година
+ITEM_ANALYSIS_CACHE_PREFIX = 'item_analysis'
+ITEM_ANALYSIS_CHUNK_SIZE = getattr(settings, 'ITEM_ANALYSIS_CHUNK_SIZE', 50000)
+ITEM_ANALYSIS_SCORE_BANDS = getattr(settings, 'ITEM_ANALYSIS_SCORE_BANDS', 100)
+GROUP_FRACTION = 0.27  # верхня й нижня групи для індексу дискримінації
+
+COMPACT_VERSION_RE = re.compile(r'"v"\s*:\s*%d\b' % ANSWERS_DATA_VERSION)
+COMPACT_SELECTED_RE = re.compile(r'"s"\s*:\s*\[([\d\s,\[\]]*)\]')
+COMPACT_CORRECT_RE = re.compile(r'"c"\s*:\s*"([01]*)"')
+PAIR_SEPARATORS = str.maketrans('[],', '   ')
+
+
+def item_analysis_cache_key(test_id):
+    return f'{ITEM_ANALYSIS_CACHE_PREFIX}:{test_id}'
+
+
+def _answer_chunks(test_id, chunk_size):
+    """Сирий JSON answers_data спроб тесту пачками (рядки, без декодування Django)"""
+    queryset = (
+        Result.objects.filter(test_id=test_id, answers_data__isnull=False)
+        .annotate(raw_answers=Cast('answers_data', TextField()))
+        .order_by('pk').values_list('pk', 'raw_answers')
+    )
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+        if not batch:
+            return
+        yield [raw for _, raw in batch]
+        last_pk = batch[-1][0]
+
+
+def _legacy_to_compact(answers_data, answer_ids):
+    """Старий формат (список словників з текстом відповіді) -> текст пар і рядок правильності"""
+    selected, correct = [], []
+    for item in answers_data:
+        answer_id = answer_ids.get((item.get('question_id'), item.get('selected_answer')))
+        if answer_id is not None:
+            selected.append(f'[{item["question_id"]},{answer_id}]')
+            correct.append('1' if item.get('is_correct') else '0')
+    return ' '.join(selected), ''.join(correct)
+
+
+def _parse_compact(raw):
+    """Пари "s" (як текст) і рядок "c" компактного answers_data без json.loads -
+    повне декодування мільйона спроб у словники й списки коштує більше за весь аналіз.
+    Порядок ключів і пробіли не важливі (MySQL зберігає JSON у власному форматі)"""
+    if not COMPACT_VERSION_RE.search(raw):
+        return None
+    selected, correct = COMPACT_SELECTED_RE.search(raw), COMPACT_CORRECT_RE.search(raw)
+    if selected is None or correct is None:
+        return None
+    return selected.group(1), correct.group(1)
+
+
+def _lookup(sorted_ids, values):
+    """Індекси values у відсортованому sorted_ids і маска знайдених"""
+    if not len(sorted_ids):
+        return np.zeros(len(values), dtype=np.intp), np.zeros(len(values), dtype=bool)
+    positions = np.searchsorted(sorted_ids, values).clip(max=len(sorted_ids) - 1)
+    return positions, sorted_ids[positions] == values
+
+
+class ItemAnalysisAccumulator:
+    """Адитивні лічильники по пачках спроб одного тесту"""
+
+    def __init__(self, answer_key):
+        self.answer_key = answer_key
+        self.question_ids = np.array([question_id for question_id, _ in answer_key.questions], dtype=np.int64)
+        self.answer_ids = np.array(sorted(answer_key.answers), dtype=np.int64)
+        question_columns, found = _lookup(
+            self.question_ids,
+            np.array([answer_key.answers[answer_id][0] for answer_id in self.answer_ids.tolist()], dtype=np.int64)
+        )
+        # Стовпець питання кожної відповіді (-1 - питання не з цього тесту)
+        self.answer_question = np.where(found, question_columns, -1)
+        self.legacy_answer_ids = {}
+        for answer_id, (question_id, answer_text, _) in answer_key.answers.items():
+            self.legacy_answer_ids.setdefault((question_id, answer_text), answer_id)
+
+        questions_count = len(self.question_ids)
+        self.attempts = 0
+        self.answered = np.zeros(questions_count, dtype=np.int64)
+        self.correct = np.zeros(questions_count, dtype=np.int64)
+        self.selected = np.zeros(len(self.answer_ids), dtype=np.int64)
+        # Рядок - смуга сумарного балу спроби (бали 0..k рівномірно на bands смуг), стовпець - питання
+        self.bands = min(questions_count + 1, ITEM_ANALYSIS_SCORE_BANDS)
+        self.by_band_attempts = np.zeros(self.bands, dtype=np.int64)
+        self.by_band_correct = np.zeros((self.bands, questions_count), dtype=np.int64)
+        self.total_sum = 0
+        self.total_square_sum = 0
+
+    def _parse_chunk(self, raw_chunk):
+        """Текст пар і рядки правильності спроб пачки; невідомий формат пропускається"""
+        compact, selected_parts, correct_parts = [], [], []
+        for raw in raw_chunk:
+            if raw.lstrip().startswith('['):
+                selected, correct = _legacy_to_compact(json.loads(raw), self.legacy_answer_ids)
+                selected_parts.append(selected)
+                correct_parts.append(correct)
+            else:
+                compact.append(raw)
+
+        # Швидкий шлях - регулярні вирази по всій пачці; збіги вирівняні з рядками,
+        # якщо в кожному рядку рівно по одному ключу v, s і c
+        joined = '\n'.join(compact)
+        selected, correct = COMPACT_SELECTED_RE.findall(joined), COMPACT_CORRECT_RE.findall(joined)
+        if len(selected) == len(correct) == len(COMPACT_VERSION_RE.findall(joined)) == len(compact):
+            selected_parts.extend(selected)
+            correct_parts.extend(correct)
+        else:
+            for parsed in filter(None, map(_parse_compact, compact)):
+                selected_parts.append(parsed[0])
+                correct_parts.append(parsed[1])
+
+        if ' '.join(selected_parts).count('[') != sum(map(len, correct_parts)):
+            # Є спроба, де кількість пар не збігається з рядком правильності - відкидаємо лише її
+            rows = [(sel, cor) for sel, cor in zip(selected_parts, correct_parts) if sel.count('[') == len(cor)]
+            selected_parts, correct_parts = [sel for sel, _ in rows], [cor for _, cor in rows]
+        return selected_parts, correct_parts
+
+    def add(self, raw_chunk):
+        """Пачка сирого JSON answers_data"""
+        selected_parts, correct_parts = self._parse_chunk(raw_chunk)
+        attempts = len(correct_parts)
+        questions_count = len(self.question_ids)
+        if not attempts:
+            return
+
+        lengths = np.fromiter(map(len, correct_parts), dtype=np.intp, count=attempts)
+        # Усі числа пачки одним викликом: "[[1, 5], [2, 9]]" -> 1 5 2 9
+        pairs = np.fromstring(' '.join(selected_parts).translate(PAIR_SEPARATORS), dtype=np.int64, sep=' ')
+        pairs = pairs.reshape(-1, 2)
+        is_correct = np.frombuffer(''.join(correct_parts).encode('ascii'), dtype=np.uint8) == ord('1')
+        row_index = np.repeat(np.arange(attempts), lengths)
+
+        columns, valid = _lookup(self.question_ids, pairs[:, 0])
+        row_index, columns, is_correct = row_index[valid], columns[valid], is_correct[valid]
+        answer_ids = pairs[valid, 1]
+
+        totals = np.bincount(row_index, weights=is_correct, minlength=attempts).astype(np.int64)
+        self.attempts += attempts
+        self.answered += np.bincount(columns, minlength=questions_count)
+        self.correct += np.bincount(columns, weights=is_correct, minlength=questions_count).astype(np.int64)
+        bands = totals * self.bands // (questions_count + 1)
+        self.by_band_attempts += np.bincount(bands, minlength=self.bands)
+        self.by_band_correct += np.bincount(
+            bands[row_index] * questions_count + columns, weights=is_correct,
+            minlength=self.bands * questions_count
+        ).astype(np.int64).reshape(self.bands, questions_count)
+        self.total_sum += int(totals.sum())
+        self.total_square_sum += int((totals * totals).sum())
+
+        answer_positions, found = _lookup(self.answer_ids, answer_ids)
+        # Відповідь має належати саме тому питанню, до якого її записано
+        found[found] = self.answer_question[answer_positions[found]] == columns[found]
+        self.selected += np.bincount(answer_positions[found], minlength=len(self.answer_ids))
+
+    def _group_difficulty(self, upper):
+        """Частка правильних у верхній (або нижній) групі GROUP_FRACTION спроб за сумарним балом;
+        спроби з граничної смуги балів входять у групу пропорційно"""
+        group_size = self.attempts * GROUP_FRACTION
+        counts, correct = self.by_band_attempts, self.by_band_correct
+        if upper:
+            counts, correct = counts[::-1], correct[::-1]
+        taken_before = np.cumsum(counts) - counts
+        weights = np.clip(group_size - taken_before, 0, counts)
+        share = np.divide(weights, counts, out=np.zeros(len(counts)), where=counts > 0)
+        return share @ correct / group_size
+
+    def cronbach_alpha(self):
+        """Альфа Кронбаха (для дихотомічних завдань - KR-20), дисперсії генеральні"""
+        questions_count = len(self.question_ids)
+        if questions_count < 2 or self.attempts < 2:
+            return None
+        item_p = self.correct / self.attempts
+        total_variance = self.total_square_sum / self.attempts - (self.total_sum / self.attempts) ** 2
+        if total_variance <= 0:
+            return None
+        return questions_count / (questions_count - 1) * (1 - float((item_p * (1 - item_p)).sum()) / total_variance)
+
+    def report(self):
+        discrimination = None
+        if self.attempts >= 2 and len(self.question_ids):
+            discrimination = self._group_difficulty(upper=True) - self._group_difficulty(upper=False)
+
+        answers_by_question = {}
+        for position, answer_id in enumerate(self.answer_ids.tolist()):
+            question_id, answer_text, is_correct = self.answer_key.answers[answer_id]
+            answers_by_question.setdefault(question_id, []).append((answer_id, answer_text, is_correct, position))
+
+        questions = []
+        for column, (question_id, question_text) in enumerate(self.answer_key.questions):
+            answered = int(self.answered[column])
+            questions.append({
+                'question_id': question_id,
+                'question_text': question_text,
+                'answered': answered,
+                'difficulty': round(float(self.correct[column]) / answered, 4) if answered else None,
+                'discrimination': round(float(discrimination[column]), 4) if discrimination is not None else None,
+                'answers': [
+                    {
+                        'answer_id': answer_id,
+                        'answer_text': answer_text,
+                        'is_correct': is_correct,
+                        'selected': int(self.selected[position]),
+                        'rate': round(float(self.selected[position]) / answered, 4) if answered else None,
+                    }
+                    for answer_id, answer_text, is_correct, position in answers_by_question.get(question_id, [])
+                ],
+            })
+
+        alpha = self.cronbach_alpha()
+        return {
+            'test_id': self.answer_key.test_id,
+            'attempts': self.attempts,
+            'questions_count': len(questions),
+            'mean_correct': round(self.total_sum / self.attempts, 4) if self.attempts else None,
+            'cronbach_alpha': round(alpha, 4) if alpha is not None else None,
+            'questions': questions,
+        }
+
+
+def analyze_test(test_id, chunk_size=ITEM_ANALYSIS_CHUNK_SIZE):
+    """Складність, дискримінація, частоти вибору відповідей і альфа Кронбаха для тесту"""
+    # Ключ будується заново, а не з кешу: аналіз має бачити поточний склад питань
+    accumulator = ItemAnalysisAccumulator(build_answer_key(test_id))
+    for raw_chunk in _answer_chunks(test_id, chunk_size):
+        accumulator.add(raw_chunk)
+    return accumulator.report()
+
+
+def get_item_analysis(test_id):
+    """Аналіз з кешу до появи нових результатів тесту або зміни його питань"""
+    key = item_analysis_cache_key(test_id)
+    report = cache.get(key)
+    if report is None:
+        report = analyze_test(test_id)
+        cache.set(key, report, ITEM_ANALYSIS_CACHE_TIMEOUT)
+    return report
+
+
+def invalidate_item_analysis(test_id):
+    if test_id is not None:
+        cache.delete(item_analysis_cache_key(test_id))
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import FloatField, ExpressionWrapper, Sum
+from django.utils import timezone
+
+from .models import LeaderboardBucket
+
+LEADERBOARD_DEFAULT_DAYS = 7
+LEADERBOARD_RETENTION_DAYS = getattr(settings, 'LEADERBOARD_RETENTION_DAYS', 90)
+LEADERBOARD_CACHE_TIMEOUT = getattr(settings, 'LEADERBOARD_CACHE_TIMEOUT', 30)  # секунд
+
+
+def clamp_window(days):
+    """Обмежує вікно рейтингу терміном зберігання кошиків"""
+    try:
+        days = int(days)
+    except (TypeError, ValueError):
+        return LEADERBOARD_DEFAULT_DAYS
+    return max(1, min(days, LEADERBOARD_RETENTION_DAYS))
+
+
+def window_start(days):
+    """Перший день вікна: days календарних днів, включно з сьогоднішнім"""
+    return timezone.localdate() - timedelta(days=days - 1)
+
+
+def leaderboard_queryset(days, course_id=None, limit=5):
+    """Запит рейтингу за вікно в days днів (без кешу) - його ж пояснює explain_hot_queries"""
+    buckets = LeaderboardBucket.objects.filter(day__gte=window_start(days), user__role='student')
+    if course_id:
+        buckets = buckets.filter(course_id=course_id)
+    return buckets.values('user__username', 'user__id').annotate(
+        tests_count=Sum('attempts'),
+        avg_score=ExpressionWrapper(Sum('score_sum') * 1.0 / Sum('attempts'), output_field=FloatField()),
+    ).filter(tests_count__gt=0).order_by('-avg_score', 'user__id')[:limit]
+
+
+def get_leaderboard(days=LEADERBOARD_DEFAULT_DAYS, course_id=None, limit=5):
+    """Топ студентів за останні days днів, зливаючи денні кошики.
+
+    Повертає словники з ключами user__username, user__id, avg_score, tests_count.
+    """
+    days = clamp_window(days)
+    start = window_start(days)
+    key = f'leaderboard:{start}:{days}:{course_id or "all"}:{limit}'
+    leaders = cache.get(key)
+    if leaders is not None:
+        return leaders
+
+    leaders = list(leaderboard_queryset(days, course_id, limit))
+    cache.set(key, leaders, LEADERBOARD_CACHE_TIMEOUT)
+    return leaders
+
+
+def prune_expired_buckets():
+    """Видаляє кошики, старші за термін зберігання; виконується не частіше разу на добу"""
+    today = timezone.localdate()
+    if cache.add(f'leaderboard:pruned:{today}', True, 60 * 60 * 24):
+        LeaderboardBucket.objects.filter(day__lt=today - timedelta(days=LEADERBOARD_RETENTION_DAYS)).delete()
@@ -0,0 +1,129 @@
+import json
+import statistics
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.grading import get_answer_key
+from api.models import PlatformUser, Course, Test, Question, Answer, Result
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = ('Проганяє гарячі сторінки та /api/ через тестовий клієнт Django і звітує p50/p95 та '
+            'кількість запитів; порівнює з базовою лінією і позначає регресії')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--only', help='Лише кейси, назва яких містить цей рядок')
+        parser.add_argument('--baseline', default='bench_baseline.json', help='Файл базової лінії (JSON)')
+        parser.add_argument('--save-baseline', action='store_true', help='Зберегти результати як базову лінію')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Допустиме погіршення p95 відносно базової лінії (0.2 = 20%%)')
+
+    def cases(self):
+        """(назва, метод, url, дані POST) для кожного гарячого endpoint"""
+        test = Test.objects.filter(question__isnull=False).order_by('pk').first()
+        student = PlatformUser.objects.filter(role='student').order_by('pk').first()
+        if test is None or student is None:
+            raise CommandError('Немає даних: спочатку виконайте generate_data')
+
+        answer_key = get_answer_key(test.test_id)
+        take_test_data = {'user_id': student.id}
+        for question_id, _ in answer_key.questions:
+            correct = answer_key.correct.get(question_id)
+            if correct:
+                take_test_data[f'question_{question_id}'] = correct[0][0]
+
+        cases = [
+            ('home', 'get', reverse('home'), None),
+            ('statistics', 'get', reverse('statistics'), None),
+            ('top_results', 'get', reverse('top_results'), None),
+            ('take_test GET', 'get', reverse('take_test', args=[test.test_id]), None),
+            ('take_test POST', 'post', reverse('take_test', args=[test.test_id]), take_test_data),
+        ]
+        for name in ('user_list', 'course_list', 'test_list', 'question_list', 'answer_list', 'result_list'):
+            cases.append((name, 'get', reverse(name), None))
+
+        samples = {
+            'users': PlatformUser, 'courses': Course, 'tests': Test,
+            'questions': Question, 'answers': Answer, 'results': Result,
+        }
+        for prefix, model in samples.items():
+            cases.append((f'api {prefix} list', 'get', f'/api/{prefix}/', None))
+            pk = model.objects.order_by('pk').values_list('pk', flat=True).first()
+            if pk is not None:
+                cases.append((f'api {prefix} detail', 'get', f'/api/{prefix}/{pk}/', None))
+        cases.append(('api tests full', 'get', f'/api/tests/{test.test_id}/full/', None))
+        return cases
+
+    def run_case(self, client, method, url, data, iterations, warmup):
+        request = getattr(client, method)
+        for _ in range(warmup):
+            request(url, data) if data else request(url)
+
+        timings, queries = [], []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = request(url, data) if data else request(url)
+                timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                raise CommandError(f'{method.upper()} {url}: HTTP {response.status_code}')
+            queries.append(len(context))
+        return {
+            'p50_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'queries': max(queries),
+        }
+
+    def handle(self, *args, **options):
+        client = Client()
+        results = {}
+        for name, method, url, data in self.cases():
+            if options['only'] and options['only'] not in name:
+                continue
+            results[name] = self.run_case(client, method, url, data, options['iterations'], options['warmup'])
+
+        baseline_path = Path(options['baseline'])
+        baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        regressions = self.report(results, baseline, options['threshold'])
+
+        if options['save_baseline']:
+            baseline_path.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+            self.stdout.write(self.style.SUCCESS(f'Базову лінію збережено в {baseline_path}'))
+        elif regressions:
+            raise CommandError(f'Регресії: {", ".join(regressions)}')
+
+    def report(self, results, baseline, threshold):
+        regressions = []
+        self.stdout.write(f'{"Кейс":<24} {"p50, мс":>10} {"p95, мс":>10} {"SQL":>6}  Порівняно з базовою')
+        for name, result in results.items():
+            line = f'{name:<24} {result["p50_ms"]:>10} {result["p95_ms"]:>10} {result["queries"]:>6}'
+            previous = baseline.get(name)
+            if previous is None:
+                self.stdout.write(line)
+                continue
+
+            problems = []
+            if result['p95_ms'] > previous['p95_ms'] * (1 + threshold):
+                problems.append(f'p95 {previous["p95_ms"]} -> {result["p95_ms"]}')
+            if result['queries'] > previous['queries']:
+                problems.append(f'SQL {previous["queries"]} -> {result["queries"]}')
+            if problems:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(f'{line}  РЕГРЕСІЯ: {"; ".join(problems)}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{line}  ok'))
+        return regressions
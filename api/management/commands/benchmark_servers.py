@@ -0,0 +1,176 @@
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Test
+
+from .benchmark import percentile
+
+SERVER_START_TIMEOUT = 30
+
+
+def wsgi_command(port, workers):
+    return [sys.executable, '-m', 'gunicorn', 'education_platform_api.wsgi:application',
+            '--worker-class', 'sync', '--workers', str(workers), '--bind', f'127.0.0.1:{port}',
+            '--log-level', 'warning']
+
+
+def asgi_command(port, workers):
+    return [sys.executable, '-m', 'uvicorn', 'education_platform_api.asgi:application',
+            '--workers', str(workers), '--host', '127.0.0.1', '--port', str(port),
+            '--log-level', 'warning', '--no-access-log']
+
+
+class Server:
+    """Сервер у дочірньому процесі з тими ж налаштуваннями (і тією ж базою), що й команда"""
+
+    def __init__(self, name, command, port):
+        self.name = name
+        self.command = command
+        self.port = port
+        self.process = None
+
+    def __enter__(self):
+        try:
+            self.process = subprocess.Popen(self.command, env=os.environ.copy(), stdout=subprocess.DEVNULL)
+        except FileNotFoundError as e:
+            raise CommandError(f'{self.name}: {e}')
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise CommandError(f'{self.name} завершився з кодом {self.process.returncode} (чи встановлено пакет?)')
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=1)
+                connection.request('GET', '/')
+                connection.getresponse().read()
+                return self
+            except OSError:
+                time.sleep(0.2)
+        self.__exit__()
+        raise CommandError(f'{self.name} не відповів за {SERVER_START_TIMEOUT} с')
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def load(port, path, concurrency, duration):
+    """concurrency потоків з keep-alive з'єднаннями надсилають GET path протягом duration секунд"""
+    deadline = time.monotonic() + duration
+    lock = threading.Lock()
+    latencies, errors = [], [0]
+
+    def worker():
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        local_latencies, local_errors = [], 0
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                connection.request('GET', path)
+                response = connection.getresponse()
+                response.read()
+                ok = response.status < 400
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                ok = False
+            if ok:
+                local_latencies.append((time.perf_counter() - start) * 1000)
+            else:
+                local_errors += 1
+        connection.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    elapsed = time.monotonic() - started
+
+    return {
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies), 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95), 2) if latencies else None,
+        'errors': errors[0],
+    }
+
+
+class Command(BaseCommand):
+    help = ('Порівнює пропускну здатність (запитів/с) синхронних view під gunicorn (sync) і '
+            'асинхронних під uvicorn на тих самих даних')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Процесів у кожного сервера')
+        parser.add_argument('--concurrency', type=int, default=32, help='Одночасних клієнтів')
+        parser.add_argument('--duration', type=float, default=10, help='Секунд навантаження на endpoint')
+        parser.add_argument('--wsgi-port', type=int, default=8101)
+        parser.add_argument('--asgi-port', type=int, default=8102)
+        parser.add_argument('--only', help='Лише кейси, назва яких містить цей рядок')
+        parser.add_argument('--json', dest='json_path', help='Зберегти результати у JSON')
+
+    def cases(self):
+        """(назва, шлях sync-view, шлях async-view)"""
+        test_id = Test.objects.filter(question__isnull=False).order_by('pk').values_list('pk', flat=True).first()
+        if test_id is None:
+            raise CommandError('Немає даних: спочатку виконайте generate_data')
+        return [
+            ('statistics', '/statistics/', '/async/statistics/'),
+            ('top_results', '/top-results/', '/async/top-results/'),
+            ('take_test GET', f'/tests/{test_id}/take/', f'/async/tests/{test_id}/take/'),
+            ('api results list', '/api/results/', '/async/api/results/'),
+            ('api test detail', f'/api/tests/{test_id}/', f'/async/api/tests/{test_id}/'),
+        ]
+
+    def run_mode(self, server, paths, options):
+        results = {}
+        with server:
+            for name, path in paths:
+                load(server.port, path, options['concurrency'], 1)  # прогрів кешів і з'єднань
+                results[name] = load(server.port, path, options['concurrency'], options['duration'])
+                self.stdout.write(f'  {server.name:<5} {name:<18} {results[name]["rps"]:>8} запитів/с')
+        return results
+
+    def handle(self, *args, **options):
+        cases = [case for case in self.cases() if not options['only'] or options['only'] in case[0]]
+        workers = options['workers']
+
+        self.stdout.write(f'Навантаження: {options["concurrency"]} клієнтів, {options["duration"]} с на endpoint, '
+                          f'{workers} процесів на сервер')
+        wsgi = self.run_mode(
+            Server('WSGI', wsgi_command(options['wsgi_port'], workers), options['wsgi_port']),
+            [(name, sync_path) for name, sync_path, _ in cases], options
+        )
+        asgi = self.run_mode(
+            Server('ASGI', asgi_command(options['asgi_port'], workers), options['asgi_port']),
+            [(name, async_path) for name, _, async_path in cases], options
+        )
+
+        self.stdout.write('')
+        self.stdout.write(f'{"Кейс":<18} {"WSGI зап/с":>11} {"ASGI зап/с":>11} {"ASGI/WSGI":>10} '
+                          f'{"p95 WSGI":>9} {"p95 ASGI":>9} {"Помилки":>8}')
+        for name, _, _ in cases:
+            sync_result, async_result = wsgi[name], asgi[name]
+            ratio = async_result['rps'] / sync_result['rps'] if sync_result['rps'] else 0
+            self.stdout.write(
+                f'{name:<18} {sync_result["rps"]:>11} {async_result["rps"]:>11} {ratio:>9.2f}x '
+                f'{sync_result["p95_ms"]!s:>9} {async_result["p95_ms"]!s:>9} '
+                f'{sync_result["errors"] + async_result["errors"]:>8}'
+            )
+
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as f:
+                json.dump({'options': {key: options[key] for key in ('workers', 'concurrency', 'duration')},
+                           'wsgi': wsgi, 'asgi': asgi}, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,72 @@
+import re
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from api.leaderboard import LEADERBOARD_DEFAULT_DAYS, leaderboard_queryset
+from api.models import Answer, Result
+
+
+def hot_queries():
+    """Запити, що виконуються найчастіше або по найбільших таблицях"""
+    week_ago = timezone.now() - timedelta(days=7)
+    return [
+        # Той самий запит, що й get_leaderboard, з тією самою межею вікна
+        (f'leaderboard: кошики за {LEADERBOARD_DEFAULT_DAYS} днів', leaderboard_queryset(LEADERBOARD_DEFAULT_DAYS)),
+        ('leaderboard: кошики курсу', leaderboard_queryset(LEADERBOARD_DEFAULT_DAYS, course_id=1)),
+        ('results: експорт за період', Result.objects.filter(
+            passed_at__gte=week_ago, passed_at__lt=timezone.now()
+        ).values_list('pk', 'user_id', 'test_id', 'score')),
+        ('results: роки для date_hierarchy адмінки', Result.objects.dates('passed_at', 'year')),
+        ('results: спроби тесту (аналіз завдань)', Result.objects.filter(
+            test_id=1, answers_data__isnull=False
+        ).values_list('pk', flat=True)),
+        ('results: сторінка списку (keyset)', Result.objects.filter(pk__gt=1000).order_by('pk')[:50]),
+        ('answers: правильні відповіді питання', Answer.objects.filter(question_id=1, is_correct=True)),
+        ('answers: ключ відповідей тесту', Answer.objects.filter(question__test_id=1).values_list(
+            'answer_id', 'question_id', 'is_correct'
+        )),
+    ]
+
+
+def full_scans(plan):
+    """Повертає таблиці, які план читає повністю (для sqlite, mysql, postgresql)"""
+    vendor = connection.vendor
+    if vendor == 'sqlite':
+        # "SCAN results" - повний прохід; "SCAN results USING COVERING INDEX ..." - лише індекс
+        return re.findall(r'SCAN (\w+)\b(?! USING)', plan)
+    if vendor == 'mysql':
+        return re.findall(r'"table_name": "(\w+)",\s*"access_type": "ALL"', plan)
+    if vendor == 'postgresql':
+        return re.findall(r'Seq Scan on (\w+)', plan)
+    return []
+
+
+class Command(BaseCommand):
+    help = 'Виконує EXPLAIN для гарячих запитів і повідомляє про повні проходи таблиць'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plan', action='store_true', help='Показати повний план кожного запиту')
+
+    def handle(self, *args, **options):
+        explain_options = {'format': 'json'} if connection.vendor == 'mysql' else {}
+        scans_found = 0
+
+        for name, queryset in hot_queries():
+            plan = queryset.explain(**explain_options)
+            scans = full_scans(plan)
+            if scans:
+                scans_found += 1
+                self.stdout.write(self.style.WARNING(f'⚠️ {name}: повний прохід {", ".join(scans)}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'✅ {name}: використовує індекси'))
+            if options['verbose_plan']:
+                self.stdout.write(plan)
+                self.stdout.write('')
+
+        if scans_found:
+            self.stdout.write(self.style.WARNING(f'Запитів з повним проходом: {scans_found}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Усі гарячі запити використовують індекси'))
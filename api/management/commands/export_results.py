@@ -0,0 +1,46 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.exports import EXPORT_FORMATS, EXPORT_CHUNK_SIZE, ExportFilterError, parse_export_filters, stream_export
+
+
+class Command(BaseCommand):
+    help = 'Потоково експортує результати у CSV або JSONL (стала пам\'ять незалежно від кількості рядків)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--output', '-o', help='Файл для запису (за замовчуванням stdout)')
+        parser.add_argument('--test', help='ID тесту')
+        parser.add_argument('--course', help='ID курсу')
+        parser.add_argument('--date-from', help='Від дати (РРРР-ММ-ДД, включно)')
+        parser.add_argument('--date-to', help='До дати (РРРР-ММ-ДД, включно)')
+        parser.add_argument('--answers', action='store_true', help='Додати answers_data')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            filters = parse_export_filters({
+                'test': options['test'],
+                'course': options['course'],
+                'date_from': options['date_from'],
+                'date_to': options['date_to'],
+                'answers': '1' if options['answers'] else '0',
+            })
+        except ExportFilterError as error:
+            raise CommandError(str(error))
+
+        output = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else sys.stdout
+        rows = 0
+        try:
+            for line in stream_export(options['format'], filters, options['chunk_size']):
+                output.write(line)
+                rows += 1
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        if options['output']:
+            if options['format'] == 'csv':
+                rows -= 1  # заголовок
+            self.stderr.write(self.style.SUCCESS(f'Експортовано рядків: {rows} -> {options["output"]}'))
@@ -0,0 +1,50 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.duplicates import DUPLICATE_THRESHOLD, MINHASH_PERMUTATIONS, find_duplicates, save_duplicate_report
+
+PREVIEW_LENGTH = 70
+
+
+class Command(BaseCommand):
+    help = ('Шукає точні й майже однакові питання в усьому банку (MinHash + LSH), '
+            'виводить кластери з тестами та курсами і зберігає звіт для API /api/questions/duplicates/')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, default=DUPLICATE_THRESHOLD,
+                            help='Мінімальна схожість Жаккара шинглів (0..1]')
+        parser.add_argument('--num-perm', type=int, default=MINHASH_PERMUTATIONS, help='Довжина MinHash-сигнатури')
+        parser.add_argument('--limit', type=int, default=20, help='Скільки найбільших кластерів вивести')
+        parser.add_argument('--json', dest='json_path', help='Зберегти повний звіт у JSON')
+        parser.add_argument('--no-save', action='store_true', help='Не зберігати звіт у базі для API')
+
+    def handle(self, *args, **options):
+        if not 0 < options['threshold'] <= 1:
+            raise CommandError('--threshold має бути в межах (0, 1]')
+
+        started = time.perf_counter()
+        report = find_duplicates(options['threshold'], options['num_perm'])
+        elapsed = time.perf_counter() - started
+
+        for cluster in report['clusters'][:options['limit']]:
+            self.stdout.write(f'{cluster["kind"]} x{cluster["size"]} (схожість >= {cluster["similarity"]})')
+            for question in cluster['questions']:
+                text = question['question_text'].replace('\n', ' ')
+                if len(text) > PREVIEW_LENGTH:
+                    text = text[:PREVIEW_LENGTH] + '...'
+                self.stdout.write(f'  #{question["question_id"]} [{question["course_name"]} / '
+                                  f'{question["test_name"]}] {text}')
+
+        if not options['no_save']:
+            save_duplicate_report(report)
+
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Питань: {report["questions_scanned"]}, кластерів: {len(report["clusters"])}, '
+            f'зайвих копій: {report["duplicate_questions"]} ({elapsed:.1f} с)'
+        ))
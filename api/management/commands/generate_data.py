@@ -0,0 +1,150 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.grading import compact_answers
+from api.models import PlatformUser, Course, Test, Question, Answer, Result
+from api.rollups import rebuild_all
+from api.search import rebuild_search_index
+
+
+@contextmanager
+def explicit_passed_at():
+    """Дозволяє задати passed_at вручну (auto_now_add інакше перезапише його поточним часом)"""
+    field = Result._meta.get_field('passed_at')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = 'Генерує синтетичні дані для локальних бенчмарків (користувачі, курси, тести, результати)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5000)
+        parser.add_argument('--courses', type=int, default=1000)
+        parser.add_argument('--tests-per-course', type=int, default=5)
+        parser.add_argument('--questions-per-test', type=int, default=10)
+        parser.add_argument('--answers-per-question', type=int, default=4)
+        parser.add_argument('--results', type=int, default=1000000)
+        parser.add_argument('--days', type=int, default=90, help='За скільки останніх днів розподілити результати')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+
+        students, teachers = self.create_users(options['users'])
+        tests = self.create_courses_and_tests(teachers, options['courses'], options['tests_per_course'])
+        answer_keys = self.create_questions(tests, options['questions_per_test'], options['answers_per_question'])
+        self.create_results(students, answer_keys, options['results'], options['days'])
+
+        self.stdout.write('Перебудова статистики...')
+        rebuild_all()
+        self.stdout.write('Перебудова індексу пошуку...')
+        rebuild_search_index()
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS('Дані згенеровано'))
+
+    def bulk_create(self, model, objects):
+        """bulk_create частинами; повертає первинні ключі нових рядків (працює й на MySQL)"""
+        last_pk = model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        for start in range(0, len(objects), self.batch_size):
+            model.objects.bulk_create(objects[start:start + self.batch_size])
+        return list(model.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True))
+
+    def create_users(self, count):
+        offset = PlatformUser.objects.count()
+        users = []
+        for n in range(offset, offset + count):
+            role = self.rng.choices(['student', 'teacher', 'admin'], weights=[90, 8, 2])[0]
+            users.append(PlatformUser(
+                username=f'bench_{role}_{n}', email=f'bench_{n}@example.com', password='!', role=role
+            ))
+        pks = self.bulk_create(PlatformUser, users)
+        students = [pk for pk, user in zip(pks, users) if user.role == 'student']
+        teachers = [pk for pk, user in zip(pks, users) if user.role == 'teacher'] or [None]
+        self.stdout.write(f'Користувачів: {len(pks)} (студентів: {len(students)})')
+        return students, teachers
+
+    def create_courses_and_tests(self, teachers, courses_count, tests_per_course):
+        course_pks = self.bulk_create(Course, [
+            Course(course_name=f'Курс {n}', description=f'Опис курсу {n}', teacher_id=self.rng.choice(teachers))
+            for n in range(courses_count)
+        ])
+        test_pks = self.bulk_create(Test, [
+            Test(course_id=course_pk, test_name=f'Тест {course_pk}.{n}')
+            for course_pk in course_pks for n in range(tests_per_course)
+        ])
+        self.stdout.write(f'Курсів: {len(course_pks)}, тестів: {len(test_pks)}')
+        return test_pks
+
+    def create_questions(self, tests, questions_per_test, answers_per_question):
+        """Повертає ключі відповідей у пам'яті: test_id -> [(question_id, text, [(answer_id, text, correct)])]"""
+        questions = [
+            Question(test_id=test_pk, question_text=f'Питання {n + 1} тесту {test_pk}: оберіть правильний варіант')
+            for test_pk in tests for n in range(questions_per_test)
+        ]
+        question_pks = self.bulk_create(Question, questions)
+
+        answers = []
+        for question_pk in question_pks:
+            correct = self.rng.randrange(answers_per_question)
+            answers.extend(
+                Answer(question_id=question_pk, answer_text=f'Варіант {n + 1}', is_correct=(n == correct))
+                for n in range(answers_per_question)
+            )
+        answer_pks = self.bulk_create(Answer, answers)
+
+        answer_keys = {}
+        answers_iter = iter(zip(answer_pks, answers))
+        for question_pk, question in zip(question_pks, questions):
+            options = [
+                (answer_pk, answer.answer_text, answer.is_correct)
+                for answer_pk, answer in (next(answers_iter) for _ in range(answers_per_question))
+            ]
+            answer_keys.setdefault(question.test_id, []).append((question_pk, question.question_text, options))
+        self.stdout.write(f'Питань: {len(question_pks)}, відповідей: {len(answer_pks)}')
+        return answer_keys
+
+    def create_results(self, students, answer_keys, count, days):
+        if not students or not answer_keys:
+            return
+        now = timezone.now()
+        tests = list(answer_keys)
+        skills = {student: self.rng.uniform(0.3, 0.95) for student in students}
+        created = 0
+
+        with explicit_passed_at():
+            while created < count:
+                batch = []
+                for _ in range(min(self.batch_size, count - created)):
+                    student = self.rng.choice(students)
+                    test_pk = self.rng.choice(tests)
+                    selected_answers = []
+                    for question_pk, _, options in answer_keys[test_pk]:
+                        correct_option = next(option for option in options if option[2])
+                        selected = correct_option if self.rng.random() < skills[student] else self.rng.choice(options)
+                        selected_answers.append((question_pk, selected[0], selected[2]))
+                    correct_count = sum(is_correct for _, _, is_correct in selected_answers)
+                    score = correct_count / len(selected_answers) * 100
+                    batch.append(Result(
+                        user_id=student,
+                        test_id=test_pk,
+                        score=Decimal(str(round(score, 2))),
+                        passed_at=now - timedelta(seconds=self.rng.randrange(days * 24 * 60 * 60)),
+                        time_spent=self.rng.randrange(60, 3600),
+                        answers_data=compact_answers(selected_answers),
+                    ))
+                Result.objects.bulk_create(batch)
+                created += len(batch)
+                self.stdout.write(f'Результатів: {created}/{count}', ending='\r')
+        self.stdout.write('')
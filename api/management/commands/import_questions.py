@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.question_import import QuestionBankError, detect_format, parse_question_bank, import_question_bank
+
+
+class Command(BaseCommand):
+    help = 'Імпортує банк питань (JSON або CSV) у тест: все або нічого, з помилками по рядках'
+
+    def add_arguments(self, parser):
+        parser.add_argument('test_id', type=int)
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=('json', 'csv'), help='За замовчуванням - за розширенням файлу')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        file_format = options['format'] or detect_format(path.name)
+        if file_format is None:
+            raise CommandError('Не вдалося визначити формат, вкажіть --format')
+
+        try:
+            items = parse_question_bank(path.read_bytes(), file_format)
+        except (OSError, QuestionBankError) as error:
+            raise CommandError(str(error))
+
+        report = import_question_bank(options['test_id'], items)
+        if not report.ok:
+            for error in report.errors:
+                prefix = f'Рядок {error["row"]}: ' if error['row'] else ''
+                self.stderr.write(f'{prefix}{"; ".join(error["errors"])}')
+            raise CommandError(f'Нічого не імпортовано, помилок: {len(report.errors)}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Імпортовано питань: {report.questions_created}, відповідей: {report.answers_created}'
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.search import rebuild_search_index, search_backend
+
+
+class Command(BaseCommand):
+    help = 'Повністю перебудовує індекс повнотекстового пошуку з питань, відповідей, тестів і курсів'
+
+    def handle(self, *args, **options):
+        # Одна транзакція: поки індекс перебудовується, пошук бачить старий
+        with transaction.atomic():
+            counts = rebuild_search_index()
+        for object_type, count in counts.items():
+            self.stdout.write(f'{object_type}: {count}')
+        self.stdout.write(self.style.SUCCESS(f'Індекс пошуку перебудовано (backend: {search_backend()})'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.rollups import rebuild_all, ROLLUP_MODELS
+
+
+class Command(BaseCommand):
+    help = 'Повністю перебудовує накопичувальні таблиці статистики з таблиці results'
+
+    def handle(self, *args, **options):
+        rebuild_all()
+        for model in ROLLUP_MODELS:
+            self.stdout.write(f'{model._meta.db_table}: {model.objects.count()} рядків')
+        self.stdout.write(self.style.SUCCESS('Статистику перебудовано'))
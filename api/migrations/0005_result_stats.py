@@ -0,0 +1,92 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:13
+
+import django.db.models.deletion
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+
+def fill_result_stats(apps, schema_editor):
+    Result = apps.get_model('api', 'Result')
+    targets = (
+        ('UserStats', 'user_id', 'user'),
+        ('TestStats', 'test_id', 'test'),
+        ('CourseStats', 'course_id', 'test__course'),
+    )
+    for model_name, field, group_by in targets:
+        model = apps.get_model('api', model_name)
+        model.objects.bulk_create([
+            model(**{field: row[group_by]}, attempts=row['attempts'], score_sum=row['score_sum'])
+            for row in Result.objects.values(group_by).annotate(
+                attempts=Count('result_id'), score_sum=Sum('score')
+            ).order_by()
+        ], batch_size=1000)
+
+    DailyStats = apps.get_model('api', 'DailyStats')
+    daily = defaultdict(lambda: [0, Decimal(0)])
+    for passed_at, score in Result.objects.values_list('passed_at', 'score').iterator(chunk_size=5000):
+        delta = daily[timezone.localdate(passed_at)]
+        delta[0] += 1
+        delta[1] += score
+    DailyStats.objects.bulk_create([
+        DailyStats(day=day, attempts=attempts, score_sum=score_sum)
+        for day, (attempts, score_sum) in daily.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_delete_dailyquiz'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseStats',
+            fields=[
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='result_stats', serialize=False, to='api.course')),
+            ],
+            options={
+                'db_table': 'course_stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyStats',
+            fields=[
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('day', models.DateField(primary_key=True, serialize=False)),
+            ],
+            options={
+                'db_table': 'daily_stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='TestStats',
+            fields=[
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('test', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='result_stats', serialize=False, to='api.test')),
+            ],
+            options={
+                'db_table': 'test_stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='result_stats', serialize=False, to='api.platformuser')),
+            ],
+            options={
+                'db_table': 'user_stats',
+            },
+        ),
+        migrations.RunPython(fill_result_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:14
+
+import django.db.models.deletion
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_leaderboard_buckets(apps, schema_editor):
+    Result = apps.get_model('api', 'Result')
+    LeaderboardBucket = apps.get_model('api', 'LeaderboardBucket')
+    since = timezone.now() - timedelta(days=90)
+    buckets = defaultdict(lambda: [0, Decimal(0)])
+    for passed_at, user_id, course_id, score in Result.objects.filter(passed_at__gte=since).values_list(
+        'passed_at', 'user_id', 'test__course_id', 'score'
+    ).iterator(chunk_size=5000):
+        bucket = buckets[(timezone.localdate(passed_at), user_id, course_id)]
+        bucket[0] += 1
+        bucket[1] += score
+    LeaderboardBucket.objects.bulk_create([
+        LeaderboardBucket(day=day, user_id=user_id, course_id=course_id, attempts=attempts, score_sum=score_sum)
+        for (day, user_id, course_id), (attempts, score_sum) in buckets.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_result_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('day', models.DateField()),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.course')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.platformuser')),
+            ],
+            options={
+                'db_table': 'leaderboard_buckets',
+                'constraints': [models.UniqueConstraint(fields=('day', 'user', 'course'), name='leaderboard_bucket_unique')],
+            },
+        ),
+        migrations.RunPython(fill_leaderboard_buckets, migrations.RunPython.noop),
+    ]
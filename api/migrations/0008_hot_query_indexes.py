@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_content_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='answer',
+            index=models.Index(fields=['question', 'is_correct'], name='answers_question_correct_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardbucket',
+            index=models.Index(fields=['course', 'day'], name='leaderboard_course_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['passed_at', 'user', 'test', 'score'], name='results_leaderboard_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['user', 'score'], name='results_user_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['test', 'score'], name='results_test_score_idx'),
+        ),
+    ]
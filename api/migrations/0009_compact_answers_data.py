@@ -0,0 +1,109 @@
+from django.db import migrations
+
+BATCH_SIZE = 1000
+COMPACT_VERSION = 2
+
+
+def _batches(Result):
+    """Результати з answers_data пачками по первинному ключу"""
+    last_pk = 0
+    while True:
+        batch = list(
+            Result.objects.filter(pk__gt=last_pk, answers_data__isnull=False)
+            .order_by('pk').only('pk', 'test_id', 'answers_data')[:BATCH_SIZE]
+        )
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1].pk
+
+
+def _load_tests(apps, test_ids, cache):
+    """test_id -> {'ids': {(question_id, text): answer_id}, 'answers': {answer_id: (question_id, text)},
+    'questions': {question_id: text}, 'correct': {question_id: text}}"""
+    Question = apps.get_model('api', 'Question')
+    Answer = apps.get_model('api', 'Answer')
+    missing = set(test_ids) - set(cache)
+    if not missing:
+        return
+    for test_id in missing:
+        cache[test_id] = {'ids': {}, 'answers': {}, 'questions': {}, 'correct': {}}
+    for question_id, test_id, text in Question.objects.filter(test_id__in=missing).values_list(
+        'question_id', 'test_id', 'question_text'
+    ):
+        cache[test_id]['questions'][question_id] = text
+    for answer_id, question_id, test_id, text, is_correct in Answer.objects.filter(
+        question__test_id__in=missing
+    ).order_by('answer_id').values_list('answer_id', 'question_id', 'question__test_id', 'answer_text', 'is_correct'):
+        test = cache[test_id]
+        test['ids'].setdefault((question_id, text), answer_id)
+        test['answers'][answer_id] = (question_id, text)
+        if is_correct:
+            test['correct'].setdefault(question_id, text)
+
+
+def compact_answers_data(apps, schema_editor):
+    Result = apps.get_model('api', 'Result')
+    tests = {}
+    for batch in _batches(Result):
+        legacy = [result for result in batch if isinstance(result.answers_data, list)]
+        _load_tests(apps, {result.test_id for result in legacy}, tests)
+
+        changed = []
+        for result in legacy:
+            answer_ids = tests[result.test_id]['ids']
+            selected, correct = [], []
+            for item in result.answers_data:
+                answer_id = answer_ids.get((item.get('question_id'), item.get('selected_answer')))
+                if answer_id is None:
+                    break
+                selected.append([item['question_id'], answer_id])
+                correct.append('1' if item.get('is_correct') else '0')
+            else:
+                result.answers_data = {'v': COMPACT_VERSION, 's': selected, 'c': ''.join(correct)}
+                changed.append(result)
+            # Відповідь, якої вже немає (видалена чи змінена), лишає рядок у старому форматі -
+            # він читається як і раніше
+        Result.objects.bulk_update(changed, ['answers_data'])
+        if len(tests) > 10000:
+            tests.clear()
+
+
+def expand_answers_data(apps, schema_editor):
+    Result = apps.get_model('api', 'Result')
+    tests = {}
+    for batch in _batches(Result):
+        compact = [
+            result for result in batch
+            if isinstance(result.answers_data, dict) and result.answers_data.get('v') == COMPACT_VERSION
+        ]
+        _load_tests(apps, {result.test_id for result in compact}, tests)
+
+        for result in compact:
+            test = tests[result.test_id]
+            result.answers_data = [
+                {
+                    'question_id': question_id,
+                    'question_text': test['questions'].get(question_id, ''),
+                    'selected_answer': test['answers'].get(answer_id, (None, ''))[1],
+                    'is_correct': is_correct == '1',
+                    'correct_answer': test['correct'].get(question_id, ''),
+                }
+                for (question_id, answer_id), is_correct in zip(result.answers_data['s'], result.answers_data['c'])
+            ]
+        Result.objects.bulk_update(compact, ['answers_data'])
+        if len(tests) > 10000:
+            tests.clear()
+
+
+class Migration(migrations.Migration):
+    # Пачки фіксуються окремо: перетворення ідемпотентне, перерваний запуск можна повторити
+    atomic = False
+
+    dependencies = [
+        ('api', '0008_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(compact_answers_data, expand_answers_data, elidable=True),
+    ]
@@ -0,0 +1,125 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:35
+
+import re
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import OperationalError, migrations, models
+
+BATCH_SIZE = 2000
+FTS_TABLE = 'search_fts'
+TOKEN_RE = re.compile(r'[^\W_]+')
+
+# Зовнішня FTS5-таблиця над search_entries; тригери синхронізують її при кожній зміні рядка
+SQLITE_FTS_SQL = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(text, content='search_entries', content_rowid='id', "
+    f"tokenize='unicode61')",
+    f"CREATE TRIGGER search_entries_ai AFTER INSERT ON search_entries BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+    f"CREATE TRIGGER search_entries_ad AFTER DELETE ON search_entries BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text); END",
+    f"CREATE TRIGGER search_entries_au AFTER UPDATE ON search_entries BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+]
+SQLITE_FTS_DROP_SQL = [
+    'DROP TRIGGER IF EXISTS search_entries_ai',
+    'DROP TRIGGER IF EXISTS search_entries_ad',
+    'DROP TRIGGER IF EXISTS search_entries_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+SOURCES = (
+    ('question', 'Question', 'question_text'),
+    ('answer', 'Answer', 'answer_text'),
+    ('test', 'Test', 'test_name'),
+    ('course', 'Course', 'course_name'),
+)
+
+
+def create_fulltext_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(text)')
+                cursor.execute('DROP TABLE temp.fts5_probe')
+        except OperationalError:
+            return  # SQLite зібрано без FTS5 - пошук працюватиме через search_tokens
+        for sql in SQLITE_FTS_SQL:
+            schema_editor.execute(sql)
+    elif connection.vendor == 'mysql':
+        schema_editor.execute('ALTER TABLE search_entries ADD FULLTEXT INDEX search_entries_text_ft (text)')
+
+
+def drop_fulltext_index(apps, schema_editor):
+    # FULLTEXT-індекс MySQL видаляється разом із таблицею
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in SQLITE_FTS_DROP_SQL:
+            schema_editor.execute(sql)
+
+
+def fill_index(apps, schema_editor):
+    """Початкове наповнення з наявних питань, відповідей, тестів і курсів"""
+    connection = schema_editor.connection
+    SearchEntry = apps.get_model('api', 'SearchEntry')
+    SearchToken = apps.get_model('api', 'SearchToken')
+    with_tokens = connection.vendor != 'mysql' and FTS_TABLE not in connection.introspection.table_names()
+
+    for object_type, model_name, field in SOURCES:
+        queryset = apps.get_model('api', model_name).objects.order_by('pk').values_list('pk', field)
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:BATCH_SIZE])
+            if not batch:
+                break
+            SearchEntry.objects.bulk_create(
+                [SearchEntry(object_type=object_type, object_id=pk, text=text) for pk, text in batch]
+            )
+            if with_tokens:
+                tokens = []
+                for entry in SearchEntry.objects.filter(object_type=object_type, object_id__in=[pk for pk, _ in batch]):
+                    counts = defaultdict(int)
+                    for token in TOKEN_RE.findall(entry.text.lower()):
+                        counts[token[:64]] += 1
+                    tokens.extend(SearchToken(token=token, entry_id=entry.pk, count=count)
+                                  for token, count in counts.items())
+                SearchToken.objects.bulk_create(tokens, batch_size=BATCH_SIZE)
+            last_pk = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_compact_answers_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_type', models.CharField(choices=[('question', 'Question'), ('answer', 'Answer'), ('test', 'Test'), ('course', 'Course')], max_length=10)),
+                ('object_id', models.IntegerField()),
+                ('text', models.TextField()),
+            ],
+            options={
+                'db_table': 'search_entries',
+                'constraints': [models.UniqueConstraint(fields=('object_type', 'object_id'), name='search_entry_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('count', models.PositiveIntegerField(default=1)),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.searchentry')),
+            ],
+            options={
+                'db_table': 'search_tokens',
+                'indexes': [models.Index(fields=['token', 'entry'], name='search_token_entry_idx')],
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(fill_index, migrations.RunPython.noop, elidable=True),
+    ]
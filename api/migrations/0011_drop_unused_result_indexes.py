@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_search_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='result',
+            name='results_leaderboard_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='result',
+            name='results_user_score_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='result',
+            name='results_test_score_idx',
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['passed_at'], name='results_passed_at_idx'),
+        ),
+    ]
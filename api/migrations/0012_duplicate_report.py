@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_drop_unused_result_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicateReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('threshold', models.FloatField()),
+                ('report', models.JSONField()),
+            ],
+            options={
+                'db_table': 'duplicate_reports',
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_content_versions'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='searchtoken',
+            name='search_token_entry_idx',
+        ),
+        migrations.AddIndex(
+            model_name='searchtoken',
+            index=models.Index(fields=['token', 'entry'], name='search_token_prefix_idx', opclasses=['varchar_pattern_ops', 'int8_ops']),
+        ),
+    ]
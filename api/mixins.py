@@ -0,0 +1,142 @@
+from django.conf import settings
+from django.db.models import Count
+from django.views.decorators.http import condition
+
+from .versioning import content_version, version_datetime
+
+
+class OptimizedListMixin:
+    """Завантажує зв'язки та лічильники, потрібні шаблону списку, фіксованою кількістю запитів.
+
+    list_select_related - FK, за якими ходить шаблон (result.test.course ...);
+    list_prefetch_related - зворотні зв'язки, що перебираються в шаблоні;
+    list_count_annotations - {ім'я атрибута: зв'язок} замість obj.<зв'язок>_set.count;
+    list_defer - важкі поля, які шаблон не показує.
+    """
+    list_select_related = ()
+    list_prefetch_related = ()
+    list_count_annotations = {}
+    list_defer = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.list_select_related:
+            queryset = queryset.select_related(*self.list_select_related)
+        if self.list_prefetch_related:
+            queryset = queryset.prefetch_related(*self.list_prefetch_related)
+        if self.list_count_annotations:
+            queryset = queryset.annotate(**{
+                name: Count(relation, distinct=True)
+                for name, relation in self.list_count_annotations.items()
+            })
+        if self.list_defer:
+            queryset = queryset.defer(*self.list_defer)
+        return queryset
+
+
+class KeysetPage:
+    """Сторінка keyset-пагінації: межі задаються первинними ключами, а не OFFSET"""
+
+    def __init__(self, object_list, page_size, has_next, has_previous):
+        self.object_list = object_list
+        self.page_size = page_size
+        self.has_next = has_next
+        self.has_previous = has_previous
+
+    @property
+    def next_after(self):
+        return self.object_list[-1].pk if self.has_next and self.object_list else None
+
+    @property
+    def previous_before(self):
+        return self.object_list[0].pk if self.has_previous and self.object_list else None
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class KeysetPaginationMixin:
+    """Пагінація ListView за автоінкрементним первинним ключем.
+
+    ?after=<pk> - наступна сторінка, ?before=<pk> - попередня, ?page_size=N - розмір.
+    Кожна сторінка - один запит WHERE pk > ... ORDER BY pk LIMIT N+1, тож час
+    відповіді не залежить від розміру таблиці чи номера сторінки.
+    """
+    paginate_by = getattr(settings, 'LIST_PAGE_SIZE', 50)
+    max_paginate_by = getattr(settings, 'LIST_MAX_PAGE_SIZE', 500)
+
+    def get_paginate_by(self, queryset):
+        try:
+            page_size = int(self.request.GET.get('page_size', self.paginate_by))
+        except ValueError:
+            page_size = self.paginate_by
+        return max(1, min(page_size, self.max_paginate_by))
+
+    def _keyset_param(self, name):
+        value = self.request.GET.get(name, '')
+        return int(value) if value.isdigit() else None
+
+    def paginate_queryset(self, queryset, page_size):
+        after = self._keyset_param('after')
+        before = self._keyset_param('before')
+
+        if before is not None:
+            rows = list(queryset.filter(pk__lt=before).order_by('-pk')[:page_size + 1])
+            has_previous = len(rows) > page_size
+            rows = rows[:page_size][::-1]
+            has_next = True
+        else:
+            if after is not None:
+                queryset = queryset.filter(pk__gt=after)
+            rows = list(queryset.order_by('pk')[:page_size + 1])
+            has_next = len(rows) > page_size
+            rows = rows[:page_size]
+            has_previous = after is not None
+
+        page = KeysetPage(rows, page_size, has_next, has_previous)
+        return None, page, rows, page.has_other_pages()
+
+
+class ConditionalGetMixin:
+    """ETag/Last-Modified для list і retrieve у ModelViewSet.
+
+    Список версіонується лічильником вмісту моделі (api.versioning, у базі) разом з
+    параметрами запиту, окремий об'єкт - його полем updated_at. Якщо клієнт
+    надіслав актуальний If-None-Match, відповідь 304 повертається без серіалізації.
+    """
+
+    def _list_version(self):
+        # Один запит до content_versions на відповідь: і для ETag, і для Last-Modified
+        if not hasattr(self, '_list_version_cache'):
+            self._list_version_cache = content_version(self.queryset.model)
+        return self._list_version_cache
+
+    def _list_etag(self, request, *args, **kwargs):
+        version = self._list_version()
+        return f'{self.queryset.model._meta.model_name}-{version}-{request.META.get("QUERY_STRING", "")}'
+
+    def _list_last_modified(self, request, *args, **kwargs):
+        return version_datetime(self._list_version())
+
+    def _object_updated_at(self, request, *args, **kwargs):
+        lookup = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        if not hasattr(self, '_updated_at_cache'):
+            self._updated_at_cache = self.queryset.model.objects.filter(
+                **{self.lookup_field: lookup}
+            ).values_list('updated_at', flat=True).first()
+        return self._updated_at_cache
+
+    def _object_etag(self, request, *args, **kwargs):
+        updated_at = self._object_updated_at(request, *args, **kwargs)
+        if updated_at is None:
+            return None
+        lookup = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        return f'{self.queryset.model._meta.model_name}-{lookup}-{updated_at.timestamp()}'
+
+    def list(self, request, *args, **kwargs):
+        view = condition(etag_func=self._list_etag, last_modified_func=self._list_last_modified)(super().list)
+        return view(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        view = condition(etag_func=self._object_etag, last_modified_func=self._object_updated_at)(super().retrieve)
+        return view(request, *args, **kwargs)
@@ -1,4 +1,10 @@
-from django.db import models
+from django.db import models, transaction
+from django.dispatch import Signal
+
+# Надсилається перед видаленням результатів з queryset=<що видаляється>. Звичайні
+# pre_delete/post_delete на Result вимкнули б швидке каскадне видалення (Django тоді
+# завантажує кожен рядок), тому статистика оновлюється пакетно через цей сигнал
+results_deleting = Signal()
 
 class PlatformUser(models.Model):
     id = models.AutoField(primary_key=True)
@@ -22,6 +28,7 @@ class Course(models.Model):
     course_name = models.CharField(max_length=100)
     description = models.TextField(null=True, blank=True)
     teacher = models.ForeignKey('PlatformUser', on_delete=models.SET_NULL, null=True)  # Важливо: 'PlatformUser'
+    updated_at = models.DateTimeField(auto_now=True)  # версія для ETag/Last-Modified
 
     def __str__(self):
         return self.course_name
@@ -34,6 +41,7 @@ class Test(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
     test_name = models.CharField(max_length=100)
     description = models.TextField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)  # версія для ETag/Last-Modified
 
     def __str__(self):
         return self.test_name
@@ -45,6 +53,7 @@ class Question(models.Model):
     question_id = models.AutoField(primary_key=True)
     test = models.ForeignKey(Test, on_delete=models.CASCADE)
     question_text = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)  # версія для ETag/Last-Modified
 
     def __str__(self):
         return f"Question {self.question_id}"
@@ -57,12 +66,24 @@ class Answer(models.Model):
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     answer_text = models.TextField()
     is_correct = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)  # версія для ETag/Last-Modified
 
     def __str__(self):
         return f"Answer {self.answer_id}"
 
     class Meta:
         db_table = 'answers'
+        indexes = [
+            # Правильні відповіді питання (ключ відповідей, перевірка тесту)
+            models.Index(fields=['question', 'is_correct'], name='answers_question_correct_idx'),
+        ]
+
+class ResultQuerySet(models.QuerySet):
+    def delete(self):
+        # Одна транзакція з видаленням: оновлення статистики з on_commit не випередить DELETE
+        with transaction.atomic(using=self.db, savepoint=False):
+            results_deleting.send(sender=Result, queryset=self)
+            return super().delete()
 
 class Result(models.Model):
     result_id = models.AutoField(primary_key=True)
@@ -71,13 +92,26 @@ class Result(models.Model):
     score = models.DecimalField(max_digits=5, decimal_places=2)
     passed_at = models.DateTimeField(auto_now_add=True)
     time_spent = models.IntegerField(null=True, blank=True, help_text="Час у секундах")  # НОВЕ
-    answers_data = models.JSONField(null=True, blank=True)  # НОВЕ - зберігає детальні відповіді
+    # Вибрані відповіді у компактному форматі (див. api.grading.compact_answers), деталі відновлюються при читанні
+    answers_data = models.JSONField(null=True, blank=True)
+
+    objects = ResultQuerySet.as_manager()
 
     def __str__(self):
         return f"Result {self.result_id}"
 
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            results_deleting.send(sender=Result, queryset=Result.objects.filter(pk=self.pk))
+            return super().delete(*args, **kwargs)
+
     class Meta:
         db_table = 'results'
+        indexes = [
+            # Вибірки за період: експорт з date_from/date_to, date_hierarchy і фільтр дати в адмін-панелі.
+            # Рейтинг і статистика читають накопичувальні таблиці, тож покривати user/test/score не треба
+            models.Index(fields=['passed_at'], name='results_passed_at_idx'),
+        ]
 
 class UserTheme(models.Model):
     user = models.OneToOneField(PlatformUser, on_delete=models.CASCADE)
@@ -91,3 +125,138 @@ class UserTheme(models.Model):
 
     class Meta:
         db_table = 'user_themes'
+
+
+# === Накопичувальна статистика результатів ===
+# Оновлюються інкрементно при кожному записі Result (див. api/rollups.py),
+# повністю перебудовуються командою rebuild_statistics
+class ResultStats(models.Model):
+    attempts = models.PositiveIntegerField(default=0)
+    score_sum = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    @property
+    def avg_score(self):
+        return self.score_sum / self.attempts if self.attempts else 0
+
+    class Meta:
+        abstract = True
+
+class UserStats(ResultStats):
+    user = models.OneToOneField(PlatformUser, on_delete=models.CASCADE, primary_key=True, related_name='result_stats')
+
+    def __str__(self):
+        return f"Stats {self.user_id}"
+
+    class Meta:
+        db_table = 'user_stats'
+
+class TestStats(ResultStats):
+    test = models.OneToOneField(Test, on_delete=models.CASCADE, primary_key=True, related_name='result_stats')
+
+    def __str__(self):
+        return f"Stats {self.test_id}"
+
+    class Meta:
+        db_table = 'test_stats'
+
+class CourseStats(ResultStats):
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, primary_key=True, related_name='result_stats')
+
+    def __str__(self):
+        return f"Stats {self.course_id}"
+
+    class Meta:
+        db_table = 'course_stats'
+
+class DailyStats(ResultStats):
+    day = models.DateField(primary_key=True)
+
+    def __str__(self):
+        return f"Stats {self.day}"
+
+    class Meta:
+        db_table = 'daily_stats'
+
+class LeaderboardBucket(ResultStats):
+    """Результати студента за один день в одному курсі - з них зливаються рейтинги за N днів"""
+    day = models.DateField()
+    user = models.ForeignKey(PlatformUser, on_delete=models.CASCADE)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE)
+
+    def __str__(self):
+        return f"Bucket {self.day} {self.user_id} {self.course_id}"
+
+    class Meta:
+        db_table = 'leaderboard_buckets'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'user', 'course'], name='leaderboard_bucket_unique'),
+        ]
+        indexes = [
+            # Рейтинг курсу за вікно днів
+            models.Index(fields=['course', 'day'], name='leaderboard_course_day_idx'),
+        ]
+
+
+# === Повнотекстовий пошук ===
+SEARCH_OBJECT_TYPES = [
+    ('question', 'Question'),
+    ('answer', 'Answer'),
+    ('test', 'Test'),
+    ('course', 'Course'),
+]
+
+class SearchEntry(models.Model):
+    """Текст одного питання, відповіді, тесту чи курсу в індексі пошуку.
+    На SQLite його індексує FTS5-таблиця search_fts, на MySQL - FULLTEXT-індекс"""
+    object_type = models.CharField(max_length=10, choices=SEARCH_OBJECT_TYPES)
+    object_id = models.IntegerField()
+    text = models.TextField()
+
+    def __str__(self):
+        return f"{self.object_type} {self.object_id}"
+
+    class Meta:
+        db_table = 'search_entries'
+        constraints = [
+            models.UniqueConstraint(fields=['object_type', 'object_id'], name='search_entry_unique'),
+        ]
+
+class SearchToken(models.Model):
+    """Інвертований індекс для баз без вбудованого повнотекстового пошуку"""
+    token = models.CharField(max_length=64)
+    entry = models.ForeignKey(SearchEntry, on_delete=models.CASCADE)
+    count = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        db_table = 'search_tokens'
+        indexes = [
+            # opclasses - для LIKE 'префікс%' на PostgreSQL з не-C колацією; інші СУБД їх ігнорують
+            models.Index(
+                fields=['token', 'entry'], name='search_token_prefix_idx', opclasses=['varchar_pattern_ops', 'int8_ops']
+            ),
+        ]
+
+# === Дублікати питань ===
+class DuplicateReport(models.Model):
+    """Звіт find_duplicates, порахований командою find_duplicate_questions; API віддає останній"""
+    created_at = models.DateTimeField(auto_now_add=True)
+    threshold = models.FloatField()
+    report = models.JSONField()
+
+    def __str__(self):
+        return f"Duplicates {self.created_at:%Y-%m-%d %H:%M} (>= {self.threshold})"
+
+    class Meta:
+        db_table = 'duplicate_reports'
+
+# === Версії вмісту для ETag ===
+class ContentVersion(models.Model):
+    """Версія вмісту таблиці (api.versioning) - у базі, тож однакова для всіх воркерів"""
+    model = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.model} v{self.version}"
+
+    class Meta:
+        db_table = 'content_versions'
@@ -0,0 +1,104 @@
+"""Запити й контекст сторінок статистики та проходження тесту.
+
+Спільні для синхронних (views) і асинхронних (async_views) версій: тут лише
+будуються ліниві querysets і збирається контекст шаблону, а виконує запити
+сам view - звичайним ORM або async ORM.
+"""
+from django.db.models import Count, Sum, F, FloatField, ExpressionWrapper
+from django.db.models.functions import NullIf
+
+from .leaderboard import window_start
+from .models import PlatformUser, Course, Question, Result, UserStats, TestStats, DailyStats
+from .rollups import avg_score_expression
+
+
+# === Статистика ===
+def score_totals():
+    """Агрегати спроб і суми балів: queryset.aggregate(**score_totals())"""
+    return {'attempts': Sum('attempts'), 'score_sum': Sum('score_sum')}
+
+
+def totals_queryset():
+    return TestStats.objects.all()
+
+
+def recent_days_queryset():
+    """Активність за останній тиждень: сім календарних днів, включно з сьогоднішнім (як у рейтингу)"""
+    return DailyStats.objects.filter(day__gte=window_start(7))
+
+
+def top_students_queryset():
+    """Топ-5 студентів"""
+    return UserStats.objects.filter(attempts__gt=0).values(
+        'user__username',
+        avg_score=avg_score_expression(),
+        tests_count=F('attempts')
+    ).order_by('-avg_score')[:5]
+
+
+def hardest_tests_queryset():
+    """Топ-5 тестів (найбільш складні)"""
+    return TestStats.objects.filter(attempts__gt=0).values(
+        'test__test_name',
+        'attempts',
+        avg_score=avg_score_expression()
+    ).order_by('avg_score')[:5]
+
+
+def courses_stats_queryset():
+    """Статистика по курсах"""
+    return Course.objects.select_related('teacher').annotate(
+        tests_count=Count('test'),
+        avg_score=ExpressionWrapper(
+            F('result_stats__score_sum') * 1.0 / NullIf(F('result_stats__attempts'), 0),
+            output_field=FloatField()
+        )
+    ).order_by('-tests_count')
+
+
+def statistics_context(counters, totals, recent_days, top_students, hardest_tests, courses_stats):
+    """Контекст statistics.html; totals і recent_days - результати aggregate(**score_totals())"""
+    avg_score = totals['score_sum'] / totals['attempts'] if totals['attempts'] else 0
+    return {
+        'total_users': counters['users_count'],
+        'students': counters['students_count'],
+        'teachers': counters['teachers_count'],
+        'total_tests_taken': counters['results_count'],
+        'avg_score': round(avg_score, 2),
+        'top_students': top_students,
+        'hardest_tests': hardest_tests,
+        'recent_activity': recent_days['attempts'] or 0,
+        'courses_stats': courses_stats,
+    }
+
+
+# === Проходження тесту ===
+def test_questions_queryset(test):
+    return Question.objects.filter(test=test).prefetch_related('answer_set')
+
+
+def students_queryset():
+    return PlatformUser.objects.filter(role='student')
+
+
+def graded_result(test, user, grade):
+    """Незбережений результат спроби (збереження - save() або asave())"""
+    return Result(user=user, test=test, score=grade.score, answers_data=grade.compact_answers_data)
+
+
+def take_test_context(test, questions, users):
+    return {
+        'test': test,
+        'questions': questions,
+        'users': users
+    }
+
+
+def test_result_context(test, grade):
+    return {
+        'test': test,
+        'score': grade.score,
+        'correct_answers': grade.correct_answers,
+        'total_questions': grade.total_questions,
+        'answers_data': grade.answers_data
+    }
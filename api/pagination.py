@@ -0,0 +1,14 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    """Курсорна пагінація API за первинним ключем (result_id, question_id, ...).
+
+    Курсор кодує останній переданий ключ, тож кожна сторінка - WHERE pk > ... LIMIT N
+    без OFFSET. Розмір сторінки: ?page_size=N (не більше max_page_size).
+    """
+    ordering = 'pk'
+    page_size = getattr(settings, 'API_PAGE_SIZE', 50)
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 500)
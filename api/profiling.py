@@ -0,0 +1,163 @@
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+# Межі кошиків гістограм (верхні, включно); останній кошик - все, що більше
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SQL_SAMPLE_LENGTH = 200
+
+
+def _histogram(bounds):
+    return [0] * (len(bounds) + 1)
+
+
+class ViewProfile:
+    """Накопичені вимірювання одного view (в межах процесу)"""
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.duplicate_queries = 0
+        self.n_plus_one_requests = 0
+        self.sql_ms = 0.0
+        self.total_ms = 0.0
+        self.render_ms = 0.0
+        self.max_total_ms = 0.0
+        self.latency_histogram = _histogram(LATENCY_BUCKETS_MS)
+        self.query_histogram = _histogram(QUERY_COUNT_BUCKETS)
+        self.worst_duplicate = None  # (кількість повторів, SQL)
+
+    def add(self, sample):
+        self.requests += 1
+        self.queries += sample.queries
+        self.duplicate_queries += sample.duplicate_queries
+        self.sql_ms += sample.sql_ms
+        self.total_ms += sample.total_ms
+        self.render_ms += sample.render_ms
+        self.max_total_ms = max(self.max_total_ms, sample.total_ms)
+        self.latency_histogram[bisect_left(LATENCY_BUCKETS_MS, sample.total_ms)] += 1
+        self.query_histogram[bisect_left(QUERY_COUNT_BUCKETS, sample.queries)] += 1
+        if sample.n_plus_one:
+            self.n_plus_one_requests += 1
+            if self.worst_duplicate is None or sample.n_plus_one[0] >= self.worst_duplicate[0]:
+                self.worst_duplicate = sample.n_plus_one
+
+    def as_dict(self):
+        requests = self.requests or 1
+        return {
+            'requests': self.requests,
+            'avg_queries': round(self.queries / requests, 2),
+            'avg_duplicate_queries': round(self.duplicate_queries / requests, 2),
+            'n_plus_one_requests': self.n_plus_one_requests,
+            'avg_sql_ms': round(self.sql_ms / requests, 2),
+            'avg_render_ms': round(self.render_ms / requests, 2),
+            'avg_total_ms': round(self.total_ms / requests, 2),
+            'max_total_ms': round(self.max_total_ms, 2),
+            'latency_histogram': _labelled(LATENCY_BUCKETS_MS, self.latency_histogram, 'ms'),
+            'query_histogram': _labelled(QUERY_COUNT_BUCKETS, self.query_histogram, ''),
+            'worst_duplicate': {
+                'count': self.worst_duplicate[0], 'sql': self.worst_duplicate[1]
+            } if self.worst_duplicate else None,
+        }
+
+
+def _labelled(bounds, counts, unit):
+    labels = [f'<={bound}{unit}' for bound in bounds] + [f'>{bounds[-1]}{unit}']
+    return dict(zip(labels, counts))
+
+
+class RequestSample:
+    """Вимірювання одного запиту: збирається через connection.execute_wrapper"""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.total_ms = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_ms += (time.perf_counter() - start) * 1000
+            self.queries += 1
+            # SQL з плейсхолдерами однаковий для однакових запитів з різними параметрами
+            self.statements[sql] += 1
+
+    @property
+    def render_ms(self):
+        # Час поза базою: код view та рендеринг шаблону
+        return max(self.total_ms - self.sql_ms, 0.0)
+
+    @property
+    def duplicate_queries(self):
+        return sum(count - 1 for count in self.statements.values())
+
+    @property
+    def n_plus_one(self):
+        threshold = getattr(settings, 'QUERY_PROFILING_N_PLUS_ONE_THRESHOLD', 3)
+        if not self.statements:
+            return None
+        sql, count = self.statements.most_common(1)[0]
+        return (count, sql[:SQL_SAMPLE_LENGTH]) if count >= threshold else None
+
+
+_profiles = {}
+_profiles_lock = threading.Lock()
+
+
+def record(view_name, sample):
+    with _profiles_lock:
+        _profiles.setdefault(view_name, ViewProfile()).add(sample)
+
+
+def profiling_snapshot():
+    """Статистика по view поточного процесу, найповільніші - першими"""
+    with _profiles_lock:
+        views = {name: profile.as_dict() for name, profile in _profiles.items()}
+    return dict(sorted(views.items(), key=lambda item: -item[1]['avg_total_ms']))
+
+
+def reset_profiling():
+    with _profiles_lock:
+        _profiles.clear()
+
+
+class QueryProfilingMiddleware:
+    """Рахує SQL-запити, їх час, дублікати (N+1) і решту часу відповіді для кожного view.
+
+    Вмикається QUERY_PROFILING_ENABLED; частка запитів, що вимірюються, -
+    QUERY_PROFILING_SAMPLE_RATE (0..1). Невибрані запити проходять без обгорток.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'QUERY_PROFILING_SAMPLE_RATE', 1.0)
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        sample = RequestSample()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(sample))
+            response = self.get_response(request)
+        sample.total_ms = (time.perf_counter() - start) * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = (match.view_name or match._func_path) if match else 'unresolved'
+        record(view_name, sample)
+        return response
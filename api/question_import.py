@@ -0,0 +1,224 @@
+import csv
+import io
+import json
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .dashboard import invalidate_counters
+from .models import Test, Question, Answer
+from .search import index_objects
+from .signals import test_content_changed
+from .versioning import bump_content_version
+
+QUESTION_IMPORT_FORMATS = ('json', 'csv')
+QUESTION_IMPORT_MAX_QUESTIONS = getattr(settings, 'QUESTION_IMPORT_MAX_QUESTIONS', 50000)
+QUESTION_IMPORT_BATCH_SIZE = getattr(settings, 'QUESTION_IMPORT_BATCH_SIZE', 2000)
+
+CSV_COLUMNS = ('question_text', 'answer_text', 'is_correct')
+TRUE_VALUES = ('1', 'true', 'yes', 'так', '+')
+FALSE_VALUES = ('', '0', 'false', 'no', 'ні', '-')
+
+
+class QuestionBankError(ValueError):
+    """Файл неможливо прочитати (формат, кодування, структура)"""
+
+
+class ImportReport:
+    def __init__(self, questions_created=0, answers_created=0, errors=None):
+        self.questions_created = questions_created
+        self.answers_created = answers_created
+        self.errors = errors or []
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def as_dict(self):
+        return {
+            'questions_created': self.questions_created,
+            'answers_created': self.answers_created,
+            'errors': self.errors,
+        }
+
+
+def _text(content):
+    if isinstance(content, bytes):
+        try:
+            return content.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise QuestionBankError('Файл має бути в кодуванні UTF-8')
+    return content
+
+
+def parse_json_bank(content):
+    """[{"question_text": ..., "answers": [{"answer_text": ..., "is_correct": true}]}] або {"questions": [...]}"""
+    try:
+        data = json.loads(_text(content))
+    except json.JSONDecodeError as e:
+        raise QuestionBankError(f'Некоректний JSON: {e}')
+    return question_bank_items(data)
+
+
+def question_bank_items(data):
+    """Нумерує питання вже розібраного JSON (тіло запиту API чи файл)"""
+    if isinstance(data, dict):
+        data = data.get('questions')
+    if not isinstance(data, list):
+        raise QuestionBankError('Очікується список питань або об\'єкт з ключем "questions"')
+    return [(number, item) for number, item in enumerate(data, start=1)]
+
+
+def parse_csv_bank(content):
+    """Рядок на відповідь: question_text, answer_text, is_correct.
+
+    Питання - це послідовні рядки з однаковим question_text (порожній question_text
+    продовжує попереднє питання). Номер рядка питання - рядок його першої відповіді.
+    """
+    reader = csv.DictReader(io.StringIO(_text(content)))
+    missing = [column for column in CSV_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing:
+        raise QuestionBankError(f'Бракує колонок: {", ".join(missing)}')
+
+    items = []
+    current_text = None
+    for row in reader:
+        question_text = (row['question_text'] or '').strip()
+        if not items or (question_text and question_text != current_text):
+            current_text = question_text
+            items.append((reader.line_num, {'question_text': question_text, 'answers': []}))
+        items[-1][1]['answers'].append({'answer_text': row['answer_text'], 'is_correct': row['is_correct']})
+    return items
+
+
+def detect_format(filename):
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return extension if extension in QUESTION_IMPORT_FORMATS else None
+
+
+def parse_question_bank(content, file_format):
+    if file_format not in QUESTION_IMPORT_FORMATS:
+        raise QuestionBankError(f'Непідтримуваний формат: {file_format}')
+    return parse_json_bank(content) if file_format == 'json' else parse_csv_bank(content)
+
+
+def _is_correct(value):
+    if isinstance(value, bool):
+        return value
+    if value is None:
+        return False
+    value = str(value).strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(value)
+
+
+def validate_question(item):
+    """Повертає ((текст питання, [(текст відповіді, правильна)]), помилки)"""
+    if not isinstance(item, dict):
+        return None, ['Очікується об\'єкт питання']
+
+    errors = []
+    question_text = item.get('question_text')
+    if not isinstance(question_text, str) or not question_text.strip():
+        errors.append('question_text: обов\'язкове текстове поле')
+
+    answers = []
+    raw_answers = item.get('answers')
+    if not isinstance(raw_answers, list) or not raw_answers:
+        errors.append('answers: потрібна хоча б одна відповідь')
+        raw_answers = []
+    for position, answer in enumerate(raw_answers, start=1):
+        if not isinstance(answer, dict):
+            errors.append(f'answers[{position}]: очікується об\'єкт відповіді')
+            continue
+        answer_text = answer.get('answer_text')
+        if not isinstance(answer_text, str) or not answer_text.strip():
+            errors.append(f'answers[{position}].answer_text: обов\'язкове текстове поле')
+            continue
+        try:
+            answers.append((answer_text.strip(), _is_correct(answer.get('is_correct'))))
+        except ValueError as e:
+            errors.append(f'answers[{position}].is_correct: невідоме значення "{e}"')
+    if answers and len(answers) == len(raw_answers) and not any(is_correct for _, is_correct in answers):
+        errors.append('answers: жодна відповідь не позначена правильною')
+
+    if errors:
+        return None, errors
+    return (question_text.strip(), answers), []
+
+
+def _created_question_ids(test_id, questions, last_pk):
+    """Первинні ключі нових питань у порядку вставки.
+
+    Якщо база не повертає ключі з bulk_create (MySQL), нові рядки тесту читаються
+    окремим запитом і зіставляються з імпортованими за текстом у порядку вставки.
+    Блокування рядка тесту не дає втрутитися паралельному імпорту, але не окремим
+    питанням, створеним іншими запитами: їх ключі можуть стояти між нашими, тому
+    рядки з чужим текстом пропускаються. Кількість ключів перевіряє виклик.
+    """
+    if connection.features.can_return_rows_from_bulk_insert:
+        return [question.pk for question in questions]
+    question_ids = []
+    rows = Question.objects.filter(test_id=test_id, pk__gt=last_pk).order_by('pk').values_list('pk', 'question_text')
+    for pk, text in rows.iterator():
+        if len(question_ids) < len(questions) and text == questions[len(question_ids)].question_text:
+            question_ids.append(pk)
+    return question_ids
+
+
+def import_question_bank(test_id, items, batch_size=QUESTION_IMPORT_BATCH_SIZE):
+    """Валідує весь банк у пам'яті і, якщо помилок немає, створює питання та
+    відповіді через bulk_create в одній транзакції. Інакше нічого не змінює."""
+    if len(items) > QUESTION_IMPORT_MAX_QUESTIONS:
+        return ImportReport(errors=[{'row': None, 'errors': [
+            f'Не більше {QUESTION_IMPORT_MAX_QUESTIONS} питань за один імпорт'
+        ]}])
+
+    validated, errors = [], []
+    for row, item in items:
+        question, item_errors = validate_question(item)
+        if item_errors:
+            errors.append({'row': row, 'errors': item_errors})
+        else:
+            validated.append(question)
+    if errors:
+        return ImportReport(errors=errors)
+    if not validated:
+        return ImportReport(errors=[{'row': None, 'errors': ['Файл не містить питань']}])
+
+    with transaction.atomic():
+        if not Test.objects.select_for_update().filter(pk=test_id).exists():
+            return ImportReport(errors=[{'row': None, 'errors': ['Тест не знайдено']}])
+
+        last_pk = Question.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        questions = Question.objects.bulk_create(
+            [Question(test_id=test_id, question_text=text) for text, _ in validated], batch_size=batch_size
+        )
+        question_ids = _created_question_ids(test_id, questions, last_pk)
+        if len(question_ids) != len(questions):
+            transaction.set_rollback(True)
+            return ImportReport(errors=[{'row': None, 'errors': [
+                'Не вдалося зіставити створені питання з файлом, спробуйте імпорт ще раз'
+            ]}])
+        answers = Answer.objects.bulk_create([
+            Answer(question_id=question_id, answer_text=answer_text, is_correct=is_correct)
+            for question_id, (_, question_answers) in zip(question_ids, validated)
+            for answer_text, is_correct in question_answers
+        ], batch_size=batch_size)
+        index_objects('question', zip(question_ids, (text for text, _ in validated)))
+        index_objects('answer', Answer.objects.filter(question_id__in=question_ids).values_list('pk', 'answer_text'))
+
+        # bulk_create не надсилає post_save - кеші, версії й лічильники оновлюємо самі
+        transaction.on_commit(lambda: _content_imported(test_id))
+
+    return ImportReport(questions_created=len(questions), answers_created=len(answers))
+
+
+def _content_imported(test_id):
+    test_content_changed(test_id)
+    bump_content_version(Question)
+    bump_content_version(Answer)
+    invalidate_counters()
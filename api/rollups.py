@@ -0,0 +1,157 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction, IntegrityError
+from django.db.models import Count, F, FloatField, ExpressionWrapper, Sum
+from django.utils import timezone
+
+from .leaderboard import LEADERBOARD_RETENTION_DAYS, prune_expired_buckets
+from .models import Test, Result, UserStats, TestStats, CourseStats, DailyStats, LeaderboardBucket
+
+ROLLUP_MODELS = (UserStats, TestStats, CourseStats, DailyStats, LeaderboardBucket)
+
+
+def avg_score_expression():
+    """Середній бал з накопичених сум - для annotate() по таблицях статистики"""
+    return ExpressionWrapper(F('score_sum') * 1.0 / F('attempts'), output_field=FloatField())
+
+
+def _bump(model, lookup, attempts, score_sum):
+    updated = model.objects.filter(**lookup).update(
+        attempts=F('attempts') + attempts,
+        score_sum=F('score_sum') + score_sum,
+    )
+    if updated or attempts <= 0:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(attempts=attempts, score_sum=score_sum, **lookup)
+    except IntegrityError:
+        # Рядок встиг створити паралельний запит
+        model.objects.filter(**lookup).update(
+            attempts=F('attempts') + attempts,
+            score_sum=F('score_sum') + score_sum,
+        )
+
+
+def result_deltas(rows, sign=1, deltas=None):
+    """Згруповані дельти накопичувальних таблиць: {(модель, ключ): [attempts, score_sum]}.
+
+    rows - ітерабельне з кортежів (user_id, test_id, score, passed_at); курс тесту
+    читається зараз, тому для видалення дельти треба рахувати до видалення тесту.
+    deltas - словник, у який додаються дельти (для обробки рядків частинами).
+    """
+    if deltas is None:
+        deltas = defaultdict(lambda: [0, Decimal(0)])
+    rows = [
+        (user_id, test_id, Decimal(str(score)) * sign, timezone.localdate(passed_at) if passed_at else None)
+        for user_id, test_id, score, passed_at in rows
+    ]
+    course_ids = dict(
+        Test.objects.filter(test_id__in={row[1] for row in rows}).values_list('test_id', 'course_id')
+    )
+
+    for user_id, test_id, score, day in rows:
+        course_id = course_ids.get(test_id)
+        keys = [(UserStats, (('user_id', user_id),)), (TestStats, (('test_id', test_id),))]
+        if course_id is not None:
+            keys.append((CourseStats, (('course_id', course_id),)))
+        if day is not None:
+            keys.append((DailyStats, (('day', day),)))
+        if day is not None and course_id is not None:
+            keys.append((LeaderboardBucket, (('day', day), ('user_id', user_id), ('course_id', course_id))))
+        for key in keys:
+            delta = deltas[key]
+            delta[0] += sign
+            delta[1] += score
+    return deltas
+
+
+def apply_deltas(deltas):
+    """Записує дельти result_deltas: по одному UPDATE на ключ"""
+    for (model, lookup), (attempts, score_sum) in deltas.items():
+        if attempts or score_sum:
+            _bump(model, dict(lookup), attempts, score_sum)
+
+    prune_expired_buckets()
+
+
+def apply_results(rows, sign=1):
+    """Додає (sign=1) або віднімає (sign=-1) результати з накопичувальних таблиць.
+
+    rows - ітерабельне з кортежів (user_id, test_id, score, passed_at).
+    Дельти групуються, тож пакет з тисяч результатів дає по одному UPDATE на ключ.
+    """
+    apply_deltas(result_deltas(rows, sign))
+
+
+def result_row(result):
+    return result.user_id, result.test_id, result.score, result.passed_at
+
+
+def _leaderboard_buckets(results):
+    """Будує денні кошики рейтингу з результатів у межах терміну зберігання"""
+    since = timezone.now() - timedelta(days=LEADERBOARD_RETENTION_DAYS)
+    buckets = defaultdict(lambda: [0, Decimal(0)])
+    for passed_at, user_id, course_id, score in results.filter(passed_at__gte=since).values_list(
+        'passed_at', 'user_id', 'test__course_id', 'score'
+    ).iterator(chunk_size=5000):
+        bucket = buckets[(timezone.localdate(passed_at), user_id, course_id)]
+        bucket[0] += 1
+        bucket[1] += score
+    return [
+        LeaderboardBucket(day=day, user_id=user_id, course_id=course_id, attempts=attempts, score_sum=score_sum)
+        for (day, user_id, course_id), (attempts, score_sum) in buckets.items()
+    ]
+
+
+def rebuild_course_stats(course_ids):
+    """Перераховує статистику курсів з таблиці results (напр. після перенесення тесту)"""
+    course_ids = [course_id for course_id in course_ids if course_id is not None]
+    results = Result.objects.filter(test__course_id__in=course_ids)
+    CourseStats.objects.filter(course_id__in=course_ids).delete()
+    CourseStats.objects.bulk_create([
+        CourseStats(course_id=row['test__course_id'], attempts=row['attempts'], score_sum=row['score_sum'])
+        for row in results.values('test__course_id').annotate(attempts=Count('result_id'), score_sum=Sum('score'))
+    ])
+    LeaderboardBucket.objects.filter(course_id__in=course_ids).delete()
+    LeaderboardBucket.objects.bulk_create(_leaderboard_buckets(results), batch_size=1000)
+
+
+@transaction.atomic
+def rebuild_all():
+    """Повністю перебудовує всі накопичувальні таблиці з таблиці results"""
+    for model in ROLLUP_MODELS:
+        model.objects.all().delete()
+
+    def aggregate(group_by):
+        return Result.objects.values(group_by).annotate(
+            attempts=Count('result_id'), score_sum=Sum('score')
+        ).order_by()
+
+    UserStats.objects.bulk_create([
+        UserStats(user_id=row['user'], attempts=row['attempts'], score_sum=row['score_sum'])
+        for row in aggregate('user')
+    ], batch_size=1000)
+    TestStats.objects.bulk_create([
+        TestStats(test_id=row['test'], attempts=row['attempts'], score_sum=row['score_sum'])
+        for row in aggregate('test')
+    ], batch_size=1000)
+    CourseStats.objects.bulk_create([
+        CourseStats(course_id=row['test__course'], attempts=row['attempts'], score_sum=row['score_sum'])
+        for row in aggregate('test__course')
+    ], batch_size=1000)
+
+    # Дні рахуємо в Python, щоб межі доби відповідали TIME_ZONE так само, як при інкрементному оновленні
+    daily = defaultdict(lambda: [0, Decimal(0)])
+    for passed_at, score in Result.objects.values_list('passed_at', 'score').iterator(chunk_size=5000):
+        delta = daily[timezone.localdate(passed_at)]
+        delta[0] += 1
+        delta[1] += score
+    DailyStats.objects.bulk_create([
+        DailyStats(day=day, attempts=attempts, score_sum=score_sum)
+        for day, (attempts, score_sum) in daily.items()
+    ], batch_size=1000)
+
+    LeaderboardBucket.objects.bulk_create(_leaderboard_buckets(Result.objects.all()), batch_size=1000)
@@ -0,0 +1,283 @@
+"""Повнотекстовий пошук по питаннях, відповідях, тестах і курсах.
+
+Тексти лежать у SearchEntry (один рядок на об'єкт) і оновлюються сигналами при
+збереженні. Ранжування робить сама база: FTS5 (bm25) на SQLite, FULLTEXT
+(MATCH ... AGAINST) на MySQL. Якщо жодного немає (інша СУБД або SQLite без FTS5),
+працює власний інвертований індекс SearchToken з BM25-вагою, що рахується в Python.
+"""
+import math
+import re
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Course, Test, Question, Answer, SearchEntry, SearchToken
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = getattr(settings, 'SEARCH_MAX_LIMIT', 100)
+SEARCH_BATCH_SIZE = 2000
+SEARCH_MAX_QUERY_TOKENS = 8
+TOKEN_MAX_LENGTH = 64
+FTS_TABLE = 'search_fts'
+
+# object_type -> (модель, поле з текстом)
+SEARCH_SOURCES = {
+    'question': (Question, 'question_text'),
+    'answer': (Answer, 'answer_text'),
+    'test': (Test, 'test_name'),
+    'course': (Course, 'course_name'),
+}
+SEARCH_MODEL_TYPES = {model: object_type for object_type, (model, _) in SEARCH_SOURCES.items()}
+
+# Як у токенізатора unicode61 з FTS5: літери й цифри, "_" - роздільник
+TOKEN_RE = re.compile(r'[^\W_]+')
+
+_fts_available = {}
+
+
+class SearchQueryError(ValueError):
+    pass
+
+
+def tokenize(text):
+    return [token[:TOKEN_MAX_LENGTH] for token in TOKEN_RE.findall(text.lower())]
+
+
+def search_backend():
+    """'fts5', 'mysql' або 'python'; SEARCH_BACKEND у settings задає його явно"""
+    backend = getattr(settings, 'SEARCH_BACKEND', None)
+    if backend:
+        return backend
+    if connection.vendor == 'mysql':
+        return 'mysql'
+    if connection.vendor == 'sqlite':
+        name = connection.settings_dict['NAME']
+        if name not in _fts_available:
+            _fts_available[name] = FTS_TABLE in connection.introspection.table_names()
+        if _fts_available[name]:
+            return 'fts5'
+    return 'python'
+
+
+# === Оновлення індексу ===
+def _replace_tokens(entries):
+    """Токени записів для backend 'python'; FTS5 і FULLTEXT оновлюються самі"""
+    SearchToken.objects.filter(entry__in=[entry.pk for entry in entries]).delete()
+    tokens = []
+    for entry in entries:
+        counts = defaultdict(int)
+        for token in tokenize(entry.text):
+            counts[token] += 1
+        tokens.extend(SearchToken(token=token, entry_id=entry.pk, count=count) for token, count in counts.items())
+    SearchToken.objects.bulk_create(tokens, batch_size=SEARCH_BATCH_SIZE)
+
+
+def index_object(object_type, object_id, text):
+    """Додає або оновлює текст об'єкта; незмінений текст індекс не чіпає"""
+    entry, created = SearchEntry.objects.get_or_create(
+        object_type=object_type, object_id=object_id, defaults={'text': text}
+    )
+    if not created:
+        if entry.text == text:
+            return
+        entry.text = text
+        entry.save(update_fields=['text'])
+    if search_backend() == 'python':
+        _replace_tokens([entry])
+
+
+def unindex_object(object_type, object_id):
+    SearchEntry.objects.filter(object_type=object_type, object_id=object_id).delete()
+
+
+def index_objects(object_type, rows, batch_size=SEARCH_BATCH_SIZE):
+    """Масове індексування нових об'єктів: rows - пари (первинний ключ, текст).
+    Для шляхів з bulk_create, які не надсилають post_save"""
+    rows = list(rows)
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        entries = SearchEntry.objects.bulk_create(
+            [SearchEntry(object_type=object_type, object_id=object_id, text=text) for object_id, text in batch]
+        )
+        if search_backend() == 'python':
+            if not connection.features.can_return_rows_from_bulk_insert:
+                entries = list(SearchEntry.objects.filter(
+                    object_type=object_type, object_id__in=[object_id for object_id, _ in batch]
+                ))
+            _replace_tokens(entries)
+
+
+def rebuild_search_index(batch_size=SEARCH_BATCH_SIZE):
+    """Повна перебудова індексу з таблиць-джерел; повертає {object_type: кількість}"""
+    SearchToken.objects.all().delete()
+    SearchEntry.objects.all().delete()
+    counts = {}
+    for object_type, (model, field) in SEARCH_SOURCES.items():
+        counts[object_type] = 0
+        queryset = model.objects.order_by('pk').values_list('pk', field)
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            index_objects(object_type, batch, batch_size)
+            counts[object_type] += len(batch)
+            last_pk = batch[-1][0]
+    if search_backend() == 'fts5':
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES('optimize')")
+    return counts
+
+
+# === Пошук ===
+def _type_filter(types, column, params):
+    if not types:
+        return ''
+    params.extend(types)
+    return f' AND {column} IN ({", ".join(["%s"] * len(types))})'
+
+
+def _fts5_query(tokens):
+    # Кожен токен у лапках - синтаксис FTS5 у запиті користувача не інтерпретується;
+    # "*" - пошук за префіксом, пробіл між токенами - AND
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _mysql_query(tokens):
+    # BOOLEAN MODE: "+" - токен обов'язковий, "*" - префікс.
+    # Токени, коротші за innodb_ft_min_token_size (типово 3), InnoDB ігнорує
+    return ' '.join(f'+{token}*' for token in tokens)
+
+
+def _search_fts5(tokens, types, limit, offset):
+    params = [_fts5_query(tokens)]
+    type_filter = _type_filter(types, 'e.object_type', params)
+    params.extend([limit, offset])
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT e.object_type, e.object_id, e.text, -bm25({FTS_TABLE}) '
+            f'FROM {FTS_TABLE} JOIN search_entries e ON e.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s{type_filter} '
+            f'ORDER BY bm25({FTS_TABLE}) LIMIT %s OFFSET %s',
+            params
+        )
+        return cursor.fetchall()
+
+
+def _search_mysql(tokens, types, limit, offset):
+    query = _mysql_query(tokens)
+    params = [query, query]
+    type_filter = _type_filter(types, 'object_type', params)
+    params.extend([limit, offset])
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT object_type, object_id, text, MATCH(text) AGAINST (%s IN BOOLEAN MODE) AS score '
+            'FROM search_entries WHERE MATCH(text) AGAINST (%s IN BOOLEAN MODE)' + type_filter +
+            ' ORDER BY score DESC LIMIT %s OFFSET %s',
+            params
+        )
+        return cursor.fetchall()
+
+
+def _token_prefix_filter(token):
+    """Умова "токен починається з token". SQLite порівнює рядки побайтово (BINARY),
+    тож діапазон точний і йде по індексу (token, entry), а LIKE з ESCAPE індекс там не бере.
+    На інших СУБД порядок задає колація, і діапазон до '\\uffff' може загубити чи
+    захопити зайві токени - там LIKE 'token%' (на PostgreSQL - індекс з varchar_pattern_ops)"""
+    if connection.vendor == 'sqlite':
+        return Q(token__gte=token, token__lt=token + '\uffff')
+    return Q(token__startswith=token)
+
+
+def _search_python(tokens, types, limit, offset, k1=1.2):
+    """BM25 без нормалізації за довжиною: усі токени запиту обов'язкові, кожен - префікс"""
+    total = SearchEntry.objects.count()
+    scores = None
+    for token in tokens:
+        matches = SearchToken.objects.filter(_token_prefix_filter(token))
+        if types:
+            matches = matches.filter(entry__object_type__in=types)
+        frequencies = defaultdict(int)
+        for entry_id, count in matches.values_list('entry_id', 'count'):
+            frequencies[entry_id] += count
+        idf = math.log(1 + (total - len(frequencies) + 0.5) / (len(frequencies) + 0.5))
+        if scores is not None:
+            frequencies = {entry_id: tf for entry_id, tf in frequencies.items() if entry_id in scores}
+        scores = {
+            entry_id: (scores[entry_id] if scores is not None else 0) + idf * tf * (k1 + 1) / (tf + k1)
+            for entry_id, tf in frequencies.items()
+        }
+        if not scores:
+            return []
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[offset:offset + limit]
+    entries = SearchEntry.objects.in_bulk([entry_id for entry_id, _ in ranked])
+    return [
+        (entries[entry_id].object_type, entries[entry_id].object_id, entries[entry_id].text, score)
+        for entry_id, score in ranked
+    ]
+
+
+SEARCH_BACKENDS = {
+    'fts5': _search_fts5,
+    'mysql': _search_mysql,
+    'python': _search_python,
+}
+
+
+def clamp_search_limit(value):
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return SEARCH_DEFAULT_LIMIT
+    return max(1, min(limit, SEARCH_MAX_LIMIT))
+
+
+def parse_search_types(value):
+    """'question,answer' -> ['question', 'answer']; порожнє значення - усі типи"""
+    types = [item.strip() for item in (value or '').split(',') if item.strip()]
+    unknown = [item for item in types if item not in SEARCH_SOURCES]
+    if unknown:
+        raise SearchQueryError(f'type: невідомий тип {", ".join(unknown)} (можливі: {", ".join(SEARCH_SOURCES)})')
+    return types
+
+
+def search(query, types=None, limit=SEARCH_DEFAULT_LIMIT, offset=0):
+    """Результати за спаданням релевантності: [{'type', 'id', 'text', 'score'}]"""
+    tokens = list(dict.fromkeys(tokenize(query)))[:SEARCH_MAX_QUERY_TOKENS]
+    if not tokens:
+        return []
+    rows = SEARCH_BACKENDS[search_backend()](tokens, types or [], limit, offset)
+    return [
+        {'type': object_type, 'id': object_id, 'text': text, 'score': round(float(score), 4)}
+        for object_type, object_id, text, score in rows
+    ]
+
+
+def matching_entries(object_type, query):
+    """Усі записи індексу одного типу, що відповідають запиту, без ранжування й ліміту -
+    queryset SearchEntry для підзапиту (напр. pk__in=...values('object_id') в адмін-панелі)"""
+    tokens = list(dict.fromkeys(tokenize(query)))[:SEARCH_MAX_QUERY_TOKENS]
+    entries = SearchEntry.objects.filter(object_type=object_type)
+    if not tokens:
+        return entries.none()
+    backend = search_backend()
+    if backend == 'fts5':
+        return entries.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [_fts5_query(tokens)]
+        ))
+    if backend == 'mysql':
+        return entries.filter(pk__in=RawSQL(
+            'SELECT id FROM search_entries WHERE MATCH(text) AGAINST (%s IN BOOLEAN MODE)', [_mysql_query(tokens)]
+        ))
+    for token in tokens:
+        entries = entries.filter(pk__in=SearchToken.objects.filter(_token_prefix_filter(token)).values('entry_id'))
+    return entries
+
+
+def search_ids(object_type, query, limit=SEARCH_MAX_LIMIT):
+    """Первинні ключі до limit найрелевантніших об'єктів одного типу"""
+    return [result['id'] for result in search(query, [object_type], limit=limit)]
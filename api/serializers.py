@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import PlatformUser, Course, Test, Question, Answer, Result
+from .grading import expand_answers_data
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -30,3 +31,63 @@ class ResultSerializer(serializers.ModelSerializer):
     class Meta:
         model = Result
         fields = '__all__'
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if instance.answers_data is not None:
+            # Компактний формат розгортається в повні деталі; ключі відповідей - один на тест на сторінку
+            answer_keys = self.context.setdefault('answer_keys', {})
+            data['answers_data'] = expand_answers_data(instance.answers_data, instance.test_id, answer_keys)
+        return data
+
+
+class BulkResultItemSerializer(serializers.Serializer):
+    """Одна спроба в пакетному завантаженні результатів.
+
+    Або готова оцінка (score), або відповіді (answers: question_id -> answer_id),
+    які буде оцінено за ключем відповідей тесту.
+    """
+    user = serializers.IntegerField()
+    test = serializers.IntegerField()
+    score = serializers.DecimalField(max_digits=5, decimal_places=2, min_value=0, max_value=100, required=False)
+    time_spent = serializers.IntegerField(min_value=0, required=False, allow_null=True)
+    answers = serializers.DictField(child=serializers.IntegerField(), required=False)
+
+    def validate_answers(self, value):
+        try:
+            return {int(question_id): answer_id for question_id, answer_id in value.items()}
+        except ValueError:
+            raise serializers.ValidationError('Ключі answers мають бути ідентифікаторами питань')
+
+    def validate(self, attrs):
+        if 'score' not in attrs and 'answers' not in attrs:
+            raise serializers.ValidationError('Потрібно вказати score або answers')
+        return attrs
+
+
+# === Повний тест з питаннями та відповідями (лише читання) ===
+class FullAnswerSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Answer
+        fields = ['answer_id', 'answer_text', 'is_correct']
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Правильні відповіді - лише на явний запит (include_correct у контексті)
+        if not self.context.get('include_correct', False):
+            data.pop('is_correct')
+        return data
+
+class FullQuestionSerializer(serializers.ModelSerializer):
+    answers = FullAnswerSerializer(source='answer_set', many=True, read_only=True)
+
+    class Meta:
+        model = Question
+        fields = ['question_id', 'question_text', 'answers']
+
+class FullTestSerializer(serializers.ModelSerializer):
+    questions = FullQuestionSerializer(source='question_set', many=True, read_only=True)
+
+    class Meta:
+        model = Test
+        fields = ['test_id', 'test_name', 'description', 'course', 'questions']
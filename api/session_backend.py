@@ -0,0 +1,58 @@
+"""Сесії з мінімумом записів у базу.
+
+Активні сесії живуть у кеші (як у cached_db), а в django_session запис іде
+лише при реальній зміні даних або коли настав час продовжити термін дії -
+не частіше ніж раз на SESSION_REFRESH_INTERVAL секунд. Це робить
+SESSION_SAVE_EVERY_REQUEST дешевим: звичайний перегляд сторінки нічого не пише.
+
+Підключення: SESSION_ENGINE = 'api.session_backend'
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+SESSION_BACKEND = __name__
+REFRESHED_AT_KEY = '_refreshed_at'
+
+_stats = {'writes': 0, 'writes_avoided': 0}
+_stats_lock = threading.Lock()
+
+
+def _record(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def session_write_stats():
+    """Лічильники поточного процесу: скільки записів сесій зроблено і скільки пропущено"""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_session_write_stats():
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
+
+
+class SessionStore(CachedDBStore):
+
+    def _refresh_interval(self):
+        return getattr(settings, 'SESSION_REFRESH_INTERVAL', 5 * 60)
+
+    def _expiry_refresh_due(self):
+        refreshed_at = self._get_session().get(REFRESHED_AT_KEY)
+        return refreshed_at is None or time.time() - refreshed_at >= self._refresh_interval()
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        if not (must_create or self.modified or self._expiry_refresh_due()):
+            _record('writes_avoided')
+            return
+        # Пишемо напряму в словник, щоб не позначати сесію зміненою
+        self._get_session()[REFRESHED_AT_KEY] = int(time.time())
+        super().save(must_create=must_create)
+        _record('writes')
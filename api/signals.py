@@ -0,0 +1,220 @@
+from itertools import islice
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from .dashboard import TABLE_COUNTERS, invalidate_counters
+from .item_analysis import invalidate_item_analysis
+from .models import PlatformUser, Course, Test, Question, Answer, Result, UserTheme, results_deleting
+from .rollups import apply_deltas, apply_results, rebuild_course_stats, result_deltas, result_row
+from .search import SEARCH_MODEL_TYPES, SEARCH_SOURCES, index_object, unindex_object
+from .themes import user_theme_cache_key
+from .versioning import bump_content_version, touch_test_content
+
+
+def _answer_test_id(question_id):
+    return Question.objects.filter(pk=question_id).values_list('test_id', flat=True).first()
+
+
+def test_content_changed(test_id):
+    """Нова версія вмісту тесту в базі (ключі відповідей і повного тесту API в кешах
+    усіх воркерів стають застарілими); аналіз завдань скидається в кеші процесу"""
+    touch_test_content(test_id)
+    invalidate_item_analysis(test_id)
+
+
+# === Інвалідація кешів вмісту тесту ===
+@receiver(pre_save, sender=Question)
+def question_before_save(sender, instance, **kwargs):
+    # Питання могли перенести в інший тест - старий ключ теж треба скинути
+    if instance.pk:
+        instance._previous_test_id = Question.objects.filter(
+            pk=instance.pk
+        ).values_list('test_id', flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_changed(sender, instance, **kwargs):
+    test_content_changed(instance.test_id)
+    previous_test_id = getattr(instance, '_previous_test_id', None)
+    if previous_test_id is not None and previous_test_id != instance.test_id:
+        test_content_changed(previous_test_id)
+
+
+@receiver(pre_save, sender=Answer)
+def answer_before_save(sender, instance, **kwargs):
+    if instance.pk:
+        previous_question_id = Answer.objects.filter(
+            pk=instance.pk
+        ).values_list('question_id', flat=True).first()
+        if previous_question_id is not None and previous_question_id != instance.question_id:
+            instance._previous_test_id = _answer_test_id(previous_question_id)
+
+
+@receiver([post_save, post_delete], sender=Answer)
+def answer_changed(sender, instance, **kwargs):
+    # При каскадному видаленні питання вже може не бути - тоді кеш очистить question_changed
+    test_content_changed(_answer_test_id(instance.question_id))
+    previous_test_id = getattr(instance, '_previous_test_id', None)
+    if previous_test_id is not None:
+        test_content_changed(previous_test_id)
+
+
+# === Лічильники головної сторінки ===
+def _invalidate_counters_on_commit():
+    transaction.on_commit(invalidate_counters)
+
+
+@receiver(pre_save, sender=PlatformUser)
+def user_before_save(sender, instance, **kwargs):
+    if instance.pk:
+        instance._previous_role = PlatformUser.objects.filter(
+            pk=instance.pk
+        ).values_list('role', flat=True).first()
+
+
+@receiver(post_save, sender=PlatformUser)
+def user_role_changed(sender, instance, created, **kwargs):
+    previous_role = getattr(instance, '_previous_role', None)
+    if not created and previous_role is not None and previous_role != instance.role:
+        _invalidate_counters_on_commit()
+
+
+def counted_object_created(sender, instance, created, **kwargs):
+    if created:
+        _invalidate_counters_on_commit()
+
+
+def counted_object_deleted(sender, instance, **kwargs):
+    _invalidate_counters_on_commit()
+
+
+for _model in TABLE_COUNTERS:
+    post_save.connect(counted_object_created, sender=_model, dispatch_uid=f'dashboard_created_{_model.__name__}')
+    # Видалені результати рахує results_before_delete - без post_delete на Result
+    if _model is not Result:
+        post_delete.connect(counted_object_deleted, sender=_model, dispatch_uid=f'dashboard_deleted_{_model.__name__}')
+
+
+# === Накопичувальна статистика результатів ===
+RESULT_DELETE_CHUNK = 5000
+
+
+@receiver(pre_save, sender=Result)
+def result_before_save(sender, instance, **kwargs):
+    if instance.pk:
+        instance._previous_row = Result.objects.filter(
+            pk=instance.pk
+        ).values_list('user_id', 'test_id', 'score', 'passed_at').first()
+
+
+@receiver(post_save, sender=Result)
+def result_saved(sender, instance, created, **kwargs):
+    previous_row = getattr(instance, '_previous_row', None)
+    if created or previous_row is None:
+        _apply_results_on_commit([result_row(instance)])
+    elif previous_row != result_row(instance):
+        _apply_results_on_commit([previous_row], sign=-1)
+        _apply_results_on_commit([result_row(instance)])
+        _invalidate_item_analysis_on_commit(previous_row[1])
+    instance._previous_row = result_row(instance)
+    _invalidate_item_analysis_on_commit(instance.test_id)
+
+
+@receiver(results_deleting, sender=Result)
+def results_before_delete(sender, queryset, **kwargs):
+    """Віднімає результати, які зараз будуть видалені, з накопичувальних таблиць.
+
+    Дельти рахуються до видалення (поки відомий курс тесту) частинами по
+    RESULT_DELETE_CHUNK рядків, а записуються після коміту - по UPDATE на ключ.
+    """
+    deltas, count, test_ids = None, 0, set()
+    rows = queryset.order_by().values_list('user_id', 'test_id', 'score', 'passed_at').iterator(
+        chunk_size=RESULT_DELETE_CHUNK
+    )
+    while chunk := list(islice(rows, RESULT_DELETE_CHUNK)):
+        deltas = result_deltas(chunk, sign=-1, deltas=deltas)
+        count += len(chunk)
+        test_ids.update(row[1] for row in chunk)
+    if not count:
+        return
+    transaction.on_commit(lambda: apply_deltas(deltas))
+    _invalidate_counters_on_commit()
+    for test_id in test_ids:
+        _invalidate_item_analysis_on_commit(test_id)
+
+
+# Каскадне видалення тесту або користувача прибирає результати одним DELETE без сигналів
+# (швидке видалення) - статистику віднімаємо пакетно перед ним. Курс видаляє свої тести
+# по одному, тож для нього спрацьовує pre_delete тесту
+@receiver(pre_delete, sender=Test)
+def test_before_delete(sender, instance, **kwargs):
+    results_before_delete(Result, Result.objects.filter(test_id=instance.pk))
+
+
+@receiver(pre_delete, sender=PlatformUser)
+def user_before_delete(sender, instance, **kwargs):
+    results_before_delete(Result, Result.objects.filter(user_id=instance.pk))
+
+
+def _apply_results_on_commit(rows, sign=1):
+    # Статистика пишеться після коміту: відкат не лишає в ній чужих спроб,
+    # а транзакція збереження не тримає блокувань рядків статистики
+    transaction.on_commit(lambda: apply_results(rows, sign))
+
+
+def _invalidate_item_analysis_on_commit(test_id):
+    # Після коміту: аналіз, запущений паралельно до коміту, інакше закешував би стан без цієї спроби
+    transaction.on_commit(lambda: invalidate_item_analysis(test_id))
+
+
+@receiver(pre_save, sender=Test)
+def test_before_save(sender, instance, **kwargs):
+    if instance.pk:
+        instance._previous_course_id = Test.objects.filter(
+            pk=instance.pk
+        ).values_list('course_id', flat=True).first()
+
+
+@receiver(post_save, sender=Test)
+def test_course_changed(sender, instance, created, **kwargs):
+    previous_course_id = getattr(instance, '_previous_course_id', None)
+    if not created and previous_course_id is not None and previous_course_id != instance.course_id:
+        rebuild_course_stats([previous_course_id, instance.course_id])
+
+
+# === Тема користувача ===
+@receiver([post_save, post_delete], sender=UserTheme)
+def user_theme_changed(sender, instance, **kwargs):
+    cache.delete(user_theme_cache_key(instance.user_id))
+
+
+# === Версії вмісту для ETag ===
+VERSIONED_MODELS = (Course, Test, Question, Answer)
+
+
+def content_changed(sender, **kwargs):
+    transaction.on_commit(lambda: bump_content_version(sender))
+
+
+for _model in VERSIONED_MODELS:
+    post_save.connect(content_changed, sender=_model, dispatch_uid=f'content_version_saved_{_model.__name__}')
+    post_delete.connect(content_changed, sender=_model, dispatch_uid=f'content_version_deleted_{_model.__name__}')
+
+
+# === Індекс повнотекстового пошуку ===
+# Оновлюється в тій самій транзакції, що й об'єкт: відкат не лишає в індексі чужого тексту
+def search_source_saved(sender, instance, **kwargs):
+    object_type = SEARCH_MODEL_TYPES[sender]
+    index_object(object_type, instance.pk, getattr(instance, SEARCH_SOURCES[object_type][1]))
+
+
+def search_source_deleted(sender, instance, **kwargs):
+    unindex_object(SEARCH_MODEL_TYPES[sender], instance.pk)
+
+
+for _model in SEARCH_MODEL_TYPES:
+    post_save.connect(search_source_saved, sender=_model, dispatch_uid=f'search_saved_{_model.__name__}')
+    post_delete.connect(search_source_deleted, sender=_model, dispatch_uid=f'search_deleted_{_model.__name__}')
@@ -1,3 +1,1053 @@
-from django.test import TestCase
+import io
+import json
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.db import DatabaseError, connection, connections, transaction
+from django.db.models import F
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .db_pool import ConnectionPool, PoolTimeout
+from .db_pool.sqlite3.base import DatabaseWrapper as PooledSQLiteWrapper
+from .duplicates import find_duplicates
+from .exports import stream_export
+from .grading import get_answer_key, compact_answers
+from .item_analysis import analyze_test, get_item_analysis
+from .leaderboard import get_leaderboard, window_start
+from .management.commands.explain_hot_queries import hot_queries
+from .models import PlatformUser, Course, Test, Question, Answer, Result, UserStats, TestStats, CourseStats, DailyStats, \
+    LeaderboardBucket, ContentVersion, UserTheme
+from .profiling import QueryProfilingMiddleware, profiling_snapshot, reset_profiling
+from .question_import import _created_question_ids, import_question_bank
+from .search import search, rebuild_search_index
+from .session_backend import SessionStore, reset_session_write_stats, session_write_stats
+from .themes import THEME_COOKIE_NAME, THEME_COOKIE_SALT, resolve_theme, save_theme
+from .versioning import touch_test_content
+
+
+class ListViewQueryCountTests(TestCase):
+    """Кількість запитів сторінок-списків не залежить від кількості рядків"""
+
+    def create_rows(self, count):
+        for i in range(count):
+            teacher = PlatformUser.objects.create(
+                username=f'teacher{self.created + i}', email=f'teacher{self.created + i}@example.com',
+                password='x', role='teacher'
+            )
+            student = PlatformUser.objects.create(
+                username=f'student{self.created + i}', email=f'student{self.created + i}@example.com',
+                password='x'
+            )
+            course = Course.objects.create(course_name=f'Курс {i}', teacher=teacher)
+            test = Test.objects.create(course=course, test_name=f'Тест {i}')
+            question = Question.objects.create(test=test, question_text=f'Питання {i}')
+            Answer.objects.create(question=question, answer_text='Так', is_correct=True)
+            Answer.objects.create(question=question, answer_text='Ні')
+            Result.objects.create(user=student, test=test, score=50)
+        self.created += count
+
+    def setUp(self):
+        cache.clear()
+        self.created = 0
+
+    def assertListQueries(self, url_name, expected):
+        for rows in (1, 5):
+            self.create_rows(rows)
+            self.client.get(reverse(url_name))  # прогрів кешів лічильників
+            with self.assertNumQueries(expected):
+                response = self.client.get(reverse(url_name))
+            self.assertEqual(response.status_code, 200)
+
+    def test_user_list(self):
+        self.assertListQueries('user_list', 1)
+
+    def test_course_list(self):
+        self.assertListQueries('course_list', 1)
+
+    def test_test_list(self):
+        self.assertListQueries('test_list', 1)
+
+    def test_question_list(self):
+        self.assertListQueries('question_list', 1)
+
+    def test_answer_list(self):
+        self.assertListQueries('answer_list', 1)
+
+    def test_result_list(self):
+        self.assertListQueries('result_list', 1)
+
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        student = PlatformUser.objects.create(username='student', email='student@example.com', password='x')
+        course = Course.objects.create(course_name='Курс')
+        test = Test.objects.create(course=course, test_name='Тест')
+        self.results = [Result.objects.create(user=student, test=test, score=i) for i in range(5)]
+
+    def test_html_list_pages_by_primary_key(self):
+        url = reverse('result_list')
+        response = self.client.get(url, {'page_size': 2})
+        page = response.context['page_obj']
+        self.assertEqual([r.pk for r in response.context['results']], [r.pk for r in self.results[:2]])
+        self.assertTrue(page.has_next)
+        self.assertFalse(page.has_previous)
+
+        response = self.client.get(url, {'page_size': 2, 'after': page.next_after})
+        page = response.context['page_obj']
+        self.assertEqual([r.pk for r in response.context['results']], [r.pk for r in self.results[2:4]])
+
+        response = self.client.get(url, {'page_size': 2, 'before': page.previous_before})
+        self.assertEqual([r.pk for r in response.context['results']], [r.pk for r in self.results[:2]])
+        self.assertFalse(response.context['page_obj'].has_previous)
+
+    def test_api_cursor_pagination(self):
+        response = self.client.get('/api/results/', {'page_size': 3})
+        data = response.json()
+        self.assertEqual([r['result_id'] for r in data['results']], [r.pk for r in self.results[:3]])
+        data = self.client.get(data['next']).json()
+        self.assertEqual([r['result_id'] for r in data['results']], [r.pk for r in self.results[3:]])
+        self.assertIsNone(data['next'])
+
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        course = Course.objects.create(course_name='Курс')
+        self.test = Test.objects.create(course=course, test_name='Тест')
+
+    def test_list_not_modified_until_content_changes(self):
+        etag = self.client.get('/api/tests/')['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/tests/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Test.objects.create(course=self.test.course, test_name='Новий тест')
+        self.assertEqual(self.client.get('/api/tests/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_version_shared_between_workers(self):
+        etag = self.client.get('/api/tests/')['ETag']
+        # Інший воркер змінив тести: кеш цього процесу не чіпали, версія - з бази
+        ContentVersion.objects.filter(model='api.test').update(version=F('version') + 1)
+        self.assertEqual(self.client.get('/api/tests/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail_not_modified_until_object_changes(self):
+        url = f'/api/tests/{self.test.pk}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.test.test_name = 'Змінений тест'
+        self.test.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class FullTestApiTests(TestCase):
+    """Повний тест API: правильні відповіді лише на явний запит"""
+
+    def setUp(self):
+        cache.clear()
+        self.test = Test.objects.create(course=Course.objects.create(course_name='Курс'), test_name='Тест')
+        question = Question.objects.create(test=self.test, question_text='Питання')
+        Answer.objects.create(question=question, answer_text='Так', is_correct=True)
+
+    def test_correct_answers_are_opt_in(self):
+        url = f'/api/tests/{self.test.test_id}/full/'
+        [answer] = self.client.get(url).json()['questions'][0]['answers']
+        self.assertNotIn('is_correct', answer)
+        [answer] = self.client.get(url, {'include_correct': 'abc'}).json()['questions'][0]['answers']
+        self.assertNotIn('is_correct', answer)
+        [answer] = self.client.get(url, {'include_correct': '1'}).json()['questions'][0]['answers']
+        self.assertTrue(answer['is_correct'])
+
+    def test_follows_changes_made_by_other_workers(self):
+        url = f'/api/tests/{self.test.test_id}/full/'
+        self.assertEqual(self.client.get(url).json()['questions'][0]['question_text'], 'Питання')
+        # Інший воркер змінив питання: у базі - новий текст і версія тесту, кеш цього процесу не чіпали
+        Question.objects.filter(test=self.test).update(question_text='Нове питання')
+        touch_test_content(self.test.test_id)
+        self.assertEqual(self.client.get(url).json()['questions'][0]['question_text'], 'Нове питання')
+        Test.objects.filter(pk=self.test.pk).delete()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class BulkResultIngestTests(TestCase):
+    """POST /api/results/bulk/: оцінювання за ключем відповідей і статус кожного елемента"""
+
+    def setUp(self):
+        cache.clear()
+        self.course = Course.objects.create(course_name='Курс')
+        self.test = Test.objects.create(course=self.course, test_name='Тест')
+        self.student = PlatformUser.objects.create(username='student', email='student@example.com', password='x')
+        self.questions = [Question.objects.create(test=self.test, question_text=f'Питання {i}') for i in range(2)]
+        self.right = [Answer.objects.create(question=q, answer_text='Так', is_correct=True) for q in self.questions]
+        self.wrong = [Answer.objects.create(question=q, answer_text='Ні') for q in self.questions]
+
+    def post(self, items):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/results/bulk/', {'results': items}, content_type='application/json')
+
+    def test_all_created_are_graded_and_counted(self):
+        answers = {str(self.questions[0].pk): self.right[0].pk, str(self.questions[1].pk): self.wrong[1].pk}
+        response = self.post([
+            {'user': self.student.id, 'test': self.test.test_id, 'answers': answers, 'time_spent': 30},
+            {'user': self.student.id, 'test': self.test.test_id, 'score': '80'},
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['created'], 2)
+        graded = Result.objects.get(pk=response.json()['items'][0]['result_id'])
+        self.assertEqual(graded.score, 50)
+        self.assertEqual(graded.answers_data['c'], '10')
+
+        self.assertEqual(UserStats.objects.values_list('attempts', 'score_sum').get(user=self.student), (2, 130))
+        self.assertEqual(TestStats.objects.values_list('attempts', 'score_sum').get(test=self.test), (2, 130))
+        self.assertEqual(CourseStats.objects.values_list('attempts', 'score_sum').get(course=self.course), (2, 130))
+        self.assertEqual(DailyStats.objects.get().attempts, 2)
+
+    def test_partial_failure_is_multi_status(self):
+        response = self.post([
+            {'user': self.student.id, 'test': self.test.test_id, 'score': '70'},
+            {'user': self.student.id, 'test': self.test.test_id},
+            {'user': 999, 'test': self.test.test_id, 'score': '70'},
+            {'user': self.student.id, 'test': 999, 'score': '70'},
+        ])
+        self.assertEqual(response.status_code, 207)
+        items = response.json()['items']
+        self.assertEqual([item['status'] for item in items], ['created', 'error', 'error', 'error'])
+        self.assertIn('non_field_errors', items[1]['errors'])
+        self.assertEqual(list(items[2]['errors']), ['user'])
+        self.assertEqual(list(items[3]['errors']), ['test'])
+        self.assertEqual(Result.objects.count(), 1)
+
+    def test_all_invalid_is_bad_request(self):
+        response = self.post([{'user': 'x', 'test': self.test.test_id, 'score': '500'}, {'user': 999, 'test': 999}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['failed'], 2)
+        self.assertFalse(Result.objects.exists())
+        self.assertFalse(UserStats.objects.exists())
+        response = self.client.post('/api/results/bulk/', {'results': 'x'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class ResultExportTests(TestCase):
+    """Потоковий експорт результатів у CSV та JSONL"""
+
+    def setUp(self):
+        student = PlatformUser.objects.create(username='student', email='student@example.com', password='x')
+        course = Course.objects.create(course_name='Курс')
+        self.test = Test.objects.create(course=course, test_name='Тест')
+        other = Test.objects.create(course=Course.objects.create(course_name='Інший'), test_name='Інший тест')
+        for score in (40, 60, 80):
+            Result.objects.create(user=student, test=self.test, score=score, answers_data=[{'question_id': 1}])
+        Result.objects.create(user=student, test=other, score=100)
+
+    def test_csv_streams_all_rows_in_chunks(self):
+        lines = list(stream_export('csv', {}, chunk_size=2))
+        self.assertEqual(len(lines), 5)
+        self.assertTrue(lines[0].startswith('result_id,user_id,username'))
+
+    def test_jsonl_filtered_by_course(self):
+        response = self.client.get(
+            reverse('result_export', args=['jsonl']), {'course': self.test.course_id, 'answers': '1'}
+        )
+        self.assertEqual(response.status_code, 200)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0])['answers_data'], [{'question_id': 1}])
+
+    def test_api_export_and_invalid_filters(self):
+        response = self.client.get('/api/results/export/csv/', {'test': self.test.test_id})
+        self.assertEqual(len(b''.join(response.streaming_content).decode().splitlines()), 4)
+        self.assertEqual(self.client.get('/api/results/export/csv/', {'date_from': 'вчора'}).status_code, 400)
+
+    def test_nonexistent_date_is_bad_request(self):
+        self.assertEqual(self.client.get('/api/results/export/csv/', {'date_from': '2024-02-30'}).status_code, 400)
+        response = self.client.get(reverse('result_export', args=['csv']), {'date_to': '2024-13-01'})
+        self.assertEqual(response.status_code, 400)
+
+
+class QuestionImportTests(TestCase):
+    """Імпорт банку питань: все або нічого, з помилками по рядках"""
+
+    def setUp(self):
+        cache.clear()
+        self.test = Test.objects.create(course=Course.objects.create(course_name='Курс'), test_name='Тест')
+
+    def test_api_json_import_creates_questions_and_answers(self):
+        bank = [
+            {'question_text': f'Питання {i}', 'answers': [
+                {'answer_text': 'Так', 'is_correct': True}, {'answer_text': 'Ні', 'is_correct': False},
+            ]} for i in range(3)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f'/api/tests/{self.test.test_id}/import-questions/', bank, content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['answers_created'], 6)
+        self.assertEqual(Answer.objects.filter(question__test=self.test, is_correct=True).count(), 3)
+        self.assertEqual(get_answer_key(self.test.test_id).total_questions, 3)
+
+    def test_question_ids_reread_by_text_without_returning_ids(self):
+        # Як на MySQL: bulk_create не повертає ключі, між новими рядками - питання іншого запиту
+        bank = [(1, {'question_text': 'Перше', 'answers': [{'answer_text': 'А', 'is_correct': True}]})]
+        Question.objects.create(test=self.test, question_text='Чуже')
+        with patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            self.assertTrue(import_question_bank(self.test.test_id, bank).ok)
+            questions = [Question(test=self.test, question_text=text) for text in ('Друге', 'Третє')]
+            Question.objects.bulk_create(questions[:1])
+            Question.objects.create(test=self.test, question_text='Чуже')
+            Question.objects.bulk_create(questions[1:])
+            expected = Question.objects.filter(question_text__in=['Друге', 'Третє']).order_by('pk')
+            self.assertEqual(
+                _created_question_ids(self.test.test_id, questions, last_pk=0),
+                list(expected.values_list('pk', flat=True))
+            )
+        self.assertEqual(Answer.objects.get().question.question_text, 'Перше')
+
+    def test_invalid_rows_reported_and_nothing_created(self):
+        content = 'question_text,answer_text,is_correct\nДобре,Так,1\n,Ні,0\nПогане,Так,можливо\n'
+        response = self.client.post(reverse('question_import'), {
+            'test': self.test.test_id,
+            'file': SimpleUploadedFile('bank.csv', content.encode()),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([error['row'] for error in response.context['report'].errors], [4])
+        self.assertFalse(Question.objects.exists())
+
+    def test_csv_upload_groups_answers_by_question(self):
+        content = 'question_text,answer_text,is_correct\nПерше,А,так\n,Б,\nДруге,В,\n,Г,+\n'
+        response = self.client.post(reverse('question_import'), {
+            'test': self.test.test_id,
+            'file': SimpleUploadedFile('bank.csv', content.encode()),
+        })
+        self.assertRedirects(response, reverse('question_list'))
+        self.assertEqual(
+            list(Answer.objects.filter(is_correct=True).values_list('question__question_text', 'answer_text')),
+            [('Перше', 'А'), ('Друге', 'Г')]
+        )
+
+
+class CompactAnswersDataTests(TestCase):
+    """answers_data зберігає лише ID відповідей, деталі відновлюються при читанні"""
+
+    def setUp(self):
+        cache.clear()
+        self.student = PlatformUser.objects.create(username='student', email='student@example.com', password='x')
+        self.test = Test.objects.create(course=Course.objects.create(course_name='Курс'), test_name='Тест')
+        self.question = Question.objects.create(test=self.test, question_text='Столиця України?')
+        self.right = Answer.objects.create(question=self.question, answer_text='Київ', is_correct=True)
+        self.wrong = Answer.objects.create(question=self.question, answer_text='Львів')
+
+    def test_take_test_stores_compact_data_and_detail_rebuilds_it(self):
+        self.client.post(reverse('take_test', args=[self.test.test_id]), {
+            'user_id': self.student.id, f'question_{self.question.question_id}': self.wrong.answer_id,
+        })
+        result = Result.objects.get()
+        self.assertEqual(result.answers_data, {
+            'v': 2, 's': [[self.question.question_id, self.wrong.answer_id]], 'c': '0',
+        })
+
+        response = self.client.get(reverse('result_detail', args=[result.result_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['answers_data'], [{
+            'question_id': self.question.question_id,
+            'question_text': 'Столиця України?',
+            'selected_answer': 'Львів',
+            'is_correct': False,
+            'correct_answer': 'Київ',
+        }])
+
+    def test_answer_key_follows_changes_made_by_other_workers(self):
+        self.assertEqual(get_answer_key(self.test.test_id).grade({self.question.pk: self.right.pk}).score, 100)
+        # Інший воркер виправив відповідь: у базі - нові дані й версія тесту, кеш цього процесу не чіпали
+        Answer.objects.filter(pk=self.right.pk).update(is_correct=False)
+        Answer.objects.filter(pk=self.wrong.pk).update(is_correct=True)
+        touch_test_content(self.test.test_id)
+        self.assertEqual(get_answer_key(self.test.test_id).grade({self.question.pk: self.right.pk}).score, 0)
+
+    def test_legacy_rows_are_read_unchanged(self):
+        legacy = [{'question_id': self.question.question_id, 'question_text': 'Старий текст',
+                   'selected_answer': 'Київ', 'is_correct': True, 'correct_answer': 'Київ'}]
+        result = Result.objects.create(user=self.student, test=self.test, score=100, answers_data=legacy)
+        response = self.client.get(f'/api/results/{result.result_id}/')
+        self.assertEqual(response.json()['answers_data'], legacy)
+
+
+class AsyncViewsTests(TestCase):
+    """Асинхронні версії сторінок і read-only API повертають ті самі дані"""
+
+    def setUp(self):
+        cache.clear()
+        self.student = PlatformUser.objects.create(username='student', email='student@example.com', password='x')
+        self.test = Test.objects.create(course=Course.objects.create(course_name='Курс'), test_name='Тест')
+        self.question = Question.objects.create(test=self.test, question_text='2 + 2?')
+        self.right = Answer.objects.create(question=self.question, answer_text='4', is_correct=True)
+
+    async def test_take_test_post_saves_result(self):
+        response = await self.async_client.post(reverse('async_take_test', args=[self.test.test_id]), {
+            'user_id': self.student.id, f'question_{self.question.question_id}': self.right.answer_id,
+        })
+        self.assertEqual(response.status_code, 200)
+        result = await Result.objects.aget()
+        self.assertEqual(result.score, 100)
+
+    async def test_pages_render(self):
+        for name in ('async_statistics', 'async_top_results'):
+            response = await self.async_client.get(reverse(name))
+            self.assertEqual(response.status_code, 200)
+
+    async def test_same_context_as_sync_views(self):
+        await Result.objects.acreate(user=self.student, test=self.test, score=75)
+        for name, args, keys in (
+            ('statistics', [], ('avg_score', 'top_students', 'hardest_tests', 'recent_activity', 'courses_stats')),
+            ('take_test', [self.test.test_id], ('test', 'questions', 'users')),
+        ):
+            sync_context = (await sync_to_async(self.client.get)(reverse(name, args=args))).context
+            async_context = (await self.async_client.get(reverse(f'async_{name}', args=args))).context
+            for key in keys:
+                value = sync_context[key]
+                self.assertEqual(async_context[key], value if isinstance(value, (int, float, Test)) else list(value), key)
+
+    async def test_api_list_keyset_pages_and_detail(self):
+        answer_ids = [self.right.answer_id]
+        for i in range(2):
+            answer_ids.append((await Answer.objects.acreate(question=self.question, answer_text=f'Відповідь {i}')).pk)
+        response = await self.async_client.get(
+            reverse('async_api_list', args=['answers']), {'page_size': 2}
+        )
+        page = response.json()
+        self.assertEqual([item['answer_id'] for item in page['results']], answer_ids[:2])
+        self.assertIn(f'after={answer_ids[1]}', page['next'])
+
+        response = await self.async_client.get(reverse('async_api_detail', args=['tests', self.test.test_id]))
+        self.assertEqual(response.json()['test_name'], 'Тест')
+        response = await self.async_client.get(reverse('async_api_detail', args=['unknown', 1]))
+        self.assertEqual(response.status_code, 404)
+
+
+class FullTextSearchTests(TestCase):
+    """Індекс пошуку оновлюється при збереженні; ранжування однакове за змістом для всіх backend"""
+
+    def setUp(self):
+        course = Course.objects.create(course_name='Алгебра')
+        self.test = Test.objects.create(course=course, test_name='Лінійні рівняння')
+        self.question = Question.objects.create(test=self.test, question_text='Розв\'яжіть рівняння 2x = 4')
+        Question.objects.create(test=self.test, question_text='Рівняння з рівнянням усередині: рівняння')
+        Answer.objects.create(question=self.question, answer_text='x = 2', is_correct=True)
+
+    def check_index_follows_changes(self):
+        results = search('рівнян')
+        expected = {('question', pk) for pk in Question.objects.values_list('pk', flat=True)}
+        self.assertEqual({(r['type'], r['id']) for r in results}, expected | {('test', self.test.test_id)})
+        # Більше входжень - вища релевантність
+        self.assertEqual(results[0]['text'], 'Рівняння з рівнянням усередині: рівняння')
+        self.assertEqual([r['id'] for r in search('рівняння 2x', ['question'])], [self.question.pk])
+
+        self.question.question_text = 'Знайдіть корінь'
+        self.question.save()
+        self.assertEqual([r['id'] for r in search('корінь')], [self.question.pk])
+        self.assertNotIn(self.question.pk, [r['id'] for r in search('2x', ['question'])])
+
+        self.test.course.delete()
+        self.assertEqual(search('рівняння'), [])
+
+    def test_fts5_index(self):
+        self.check_index_follows_changes()
+
+    @override_settings(SEARCH_BACKEND='python')
+    def test_python_index(self):
+        rebuild_search_index()
+        self.check_index_follows_changes()
+
+    @override_settings(SEARCH_BACKEND='python')
+    def test_python_index_like_prefix(self):
+        # Поза SQLite префікс шукається через LIKE, а не діапазоном, що залежить від колації
+        rebuild_search_index()
+        with patch('api.search.connection', vendor='postgresql'):
+            self.check_index_follows_changes()
+
+    def test_admin_search_keeps_related_fields(self):
+        question_admin = admin.site._registry[Question]
+        request = RequestFactory().get('/admin/api/question/')
+        for backend in ('fts5', 'python'):
+            with self.subTest(backend=backend), override_settings(SEARCH_BACKEND=backend):
+                rebuild_search_index()
+                # "Лінійні" є лише в назві тесту (test__test_name), "усередині" - лише в тексті питання
+                for term, expected in (('Лінійні', 2), ('усередині', 1), ('Лінійні рівняння', 2)):
+                    results, _ = question_admin.get_search_results(request, Question.objects.all(), term)
+                    self.assertEqual(results.distinct().count(), expected, term)
+
+    def test_bulk_import_is_indexed_and_api_ranks(self):
+        items = [(1, {'question_text': 'Що таке матриця?', 'answers': [
+            {'answer_text': 'Таблиця чисел', 'is_correct': True}, {'answer_text': 'Вектор', 'is_correct': False},
+        ]})]
+        self.assertTrue(import_question_bank(self.test.test_id, items).ok)
+
+        response = self.client.get('/api/search/', {'q': 'матриц', 'type': 'question'})
+        self.assertEqual(response.status_code, 200)
+        [result] = response.json()['results']
+        self.assertEqual(result['text'], 'Що таке матриця?')
+        self.assertTrue(result['url'].endswith(f'/api/questions/{result["id"]}/'))
+        self.assertEqual(len(search('таблиця', ['answer'])), 1)
+
+        self.assertEqual(self.client.get('/api/search/').status_code, 400)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'x', 'type': 'users'}).status_code, 400)
+
+
+class AutocompleteTests(TestCase):
+    """Автодоповнення: без сортування тексту для порожнього запиту, пошук питань через індекс"""
+
+    def setUp(self):
+        self.test = Test.objects.create(course=Course.objects.create(course_name='Курс'), test_name='Тест')
+        self.questions = [
+            Question.objects.create(test=self.test, question_text=text)
+            for text in ('Яка столиця Франції?', 'Атом складається з ядра', 'Столиця Італії - Рим?')
+        ]
+
+    def get_ids(self, term):
+        response = self.client.get(reverse('autocomplete', args=['questions']), {'q': term})
+        return [row['id'] for row in response.json()['results']]
+
+    def test_empty_short_and_full_terms(self):
+        self.assertEqual(self.get_ids(''), [question.pk for question in self.questions])
+        self.assertEqual(self.get_ids('с'), [])
+        self.assertEqual(self.get_ids(str(self.questions[1].pk)), [self.questions[1].pk])
+        # Префікс будь-якого слова, а не лише початку тексту
+        self.assertEqual(sorted(self.get_ids('стол')), [self.questions[0].pk, self.questions[2].pk])
+        self.assertEqual(self.get_ids('ядр'), [self.questions[1].pk])
+
+
+class DuplicateQuestionsTests(TestCase):
+    """Точні й майже однакові питання групуються в кластери з тестами й курсами"""
+
+    def setUp(self):
+        cache.clear()
+        course = Course.objects.create(course_name='Фізика')
+        self.first = Test.objects.create(course=course, test_name='Механіка')
+        self.second = Test.objects.create(course=course, test_name='Кінематика')
+        text = 'Тіло рухається рівномірно прямолінійно зі швидкістю десять метрів за секунду. Який шлях за хвилину?'
+        self.exact = [
+            Question.objects.create(test=self.first, question_text=text),
+            Question.objects.create(test=self.second, question_text=text.upper()),
+        ]
+        self.near = [
+            Question.objects.create(test=self.first, question_text='Назвіть одиницю вимірювання сили в системі СІ.'),
+            Question.objects.create(test=self.second, question_text='Назвіть одиницю вимірювання сили в системі СІ?!'),
+            Question.objects.create(test=self.second, question_text='Назвіть одиниці вимірювання сили в системі СІ'),
+        ]
+        Question.objects.create(test=self.first, question_text='Сформулюйте другий закон Ньютона')
+
+    def test_clusters(self):
+        report = find_duplicates(threshold=0.7)
+        self.assertEqual(report['questions_scanned'], 6)
+        clusters = {cluster['kind']: cluster for cluster in report['clusters']}
+        self.assertEqual(len(report['clusters']), 2)
+        self.assertEqual([q['question_id'] for q in clusters['exact']['questions']], [q.pk for q in self.exact])
+        self.assertEqual({q['question_id'] for q in clusters['near']['questions']}, {q.pk for q in self.near})
+        self.assertEqual({q['test_name'] for q in clusters['exact']['questions']}, {'Механіка', 'Кінематика'})
+        self.assertEqual(report['duplicate_questions'], 3)
+
+    def test_api_serves_stored_report(self):
+        url = '/api/questions/duplicates/'
+        self.assertEqual(self.client.get(url).status_code, 404)
+        call_command('find_duplicate_questions', threshold=0.7, stdout=io.StringIO())
+
+        # Зміни питань не запускають пошук у запиті - видно лише наступний запуск команди
+        with self.captureOnCommitCallbacks(execute=True):
+            self.exact[1].delete()
+        with self.assertNumQueries(2):
+            report = self.client.get(url, {'threshold': '0.70'}).json()
+        self.assertEqual(len(report['clusters']), 2)
+        self.assertIn('computed_at', report)
+        self.assertEqual(len(self.client.get(url, {'limit': '1'}).json()['clusters']), 1)
+        self.assertEqual(self.client.get(url, {'limit': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'threshold': '0.9'}).status_code, 400)
+
+        call_command('find_duplicate_questions', threshold=0.7, stdout=io.StringIO())
+        self.assertEqual([cluster['kind'] for cluster in self.client.get(url).json()['clusters']], ['near'])
+
+
+class ItemAnalysisTests(TestCase):
+    """Показники аналізу завдань на малому наборі, порахованому вручну"""
+
+    def setUp(self):
+        cache.clear()
+        self.test = Test.objects.create(course=Course.objects.create(course_name='Курс'), test_name='Тест')
+        self.user = PlatformUser.objects.create(username='s', email='s@example.com', password='x')
+        first = Question.objects.create(test=self.test, question_text='Перше')
+        second = Question.objects.create(test=self.test, question_text='Друге')
+        self.a1 = Answer.objects.create(question=first, answer_text='A1', is_correct=True)
+        self.a2 = Answer.objects.create(question=first, answer_text='A2', is_correct=False)
+        self.b1 = Answer.objects.create(question=second, answer_text='B1', is_correct=True)
+        self.b2 = Answer.objects.create(question=second, answer_text='B2', is_correct=False)
+
+        # Сумарні бали спроб: 2, 2, 1, 0; остання - у старому форматі answers_data
+        for answers in ([self.a1, self.b1], [self.a1, self.b1], [self.a1, self.b2]):
+            self.add_result(compact_answers([(a.question_id, a.pk, a.is_correct) for a in answers]))
+        self.add_result([
+            {'question_id': first.pk, 'question_text': 'Перше', 'selected_answer': 'A2', 'is_correct': False},
+            {'question_id': second.pk, 'question_text': 'Друге', 'selected_answer': 'B2', 'is_correct': False},
+        ])
+
+    def add_result(self, answers_data):
+        with self.captureOnCommitCallbacks(execute=True):
+            Result.objects.create(user=self.user, test=self.test, score=0, answers_data=answers_data)
+
+    def test_statistics(self):
+        analysis = get_item_analysis(self.test.test_id)
+        self.assertEqual(analysis['attempts'], 4)
+        first, second = analysis['questions']
+        self.assertEqual((first['difficulty'], second['difficulty']), (0.75, 0.5))
+        # Верхні 27% (1.08 спроби) - бал 2; нижні - бал 0 і 0.08 спроби з балом 1
+        self.assertEqual((first['discrimination'], second['discrimination']), (0.9259, 1.0))
+        self.assertEqual([answer['rate'] for answer in first['answers']], [0.75, 0.25])
+        self.assertEqual(analysis['cronbach_alpha'], 0.7273)
+
+    def test_score_bands(self):
+        # Бали 0 і 1 потрапляють в одну смугу - нижня група бере їх порівну
+        with patch('api.item_analysis.ITEM_ANALYSIS_SCORE_BANDS', 2):
+            first, second = analyze_test(self.test.test_id)['questions']
+        self.assertEqual((first['discrimination'], second['discrimination']), (0.5, 1.0))
+        self.assertEqual((first['difficulty'], second['difficulty']), (0.75, 0.5))
+
+    def test_cached_until_new_result(self):
+        self.assertEqual(self.client.get(f'/api/tests/{self.test.test_id}/item-analysis/').json()['attempts'], 4)
+        self.add_result(compact_answers([(self.a2.question_id, self.a2.pk, False)]))
+        response = self.client.get(reverse('test_item_analysis', args=[self.test.test_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['analysis']['attempts'], 5)
+
+
+class ResultRollupTests(TestCase):
+    """Накопичувальна статистика оновлюється після коміту, каскадне видалення - пакетно"""
+
+    def setUp(self):
+        self.course = Course.objects.create(course_name='Курс')
+        self.test = Test.objects.create(course=self.course, test_name='Тест')
+        self.other_test = Test.objects.create(course=self.course, test_name='Інший')
+        self.user = PlatformUser.objects.create(username='s', email='s@example.com', password='x')
+        with self.captureOnCommitCallbacks(execute=True):
+            for score in (60, 80, 100):
+                Result.objects.create(user=self.user, test=self.test, score=score)
+            Result.objects.create(user=self.user, test=self.other_test, score=50)
+
+    def stats(self, model, **lookup):
+        return model.objects.filter(**lookup).values_list('attempts', 'score_sum').first()
+
+    def test_written_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            Result.objects.create(user=self.user, test=self.test, score=40)
+        self.assertEqual(self.stats(UserStats, user=self.user), (4, 290))
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.stats(UserStats, user=self.user), (5, 330))
+
+    def test_cascade_delete_is_bulk(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for score in range(50):
+                Result.objects.create(user=self.user, test=self.test, score=score)
+        # Читання рядків, курсів їх тестів і один DELETE - незалежно від кількості результатів
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(3):
+                Result.objects.filter(test=self.test).delete()
+        self.assertEqual(self.stats(UserStats, user=self.user), (1, 50))
+
+        other_test_id = self.other_test.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_test.delete()
+        self.assertEqual(self.stats(UserStats, user=self.user), (0, 0))
+        self.assertEqual(self.stats(CourseStats, course=self.course), (0, 0))
+        self.assertIsNone(self.stats(TestStats, test_id=other_test_id))
+        self.assertEqual(DailyStats.objects.get().attempts, 0)
+
+
+class DashboardCountersTests(TestCase):
+    """Лічильники головної сторінки після створення й видалення об'єктів"""
+    names = ('users_count', 'students_count', 'courses_count', 'results_count')
+
+    def setUp(self):
+        cache.clear()
+
+    def counters(self):
+        context = self.client.get(reverse('home')).context
+        return tuple(context[name] for name in self.names)
+
+    def test_follow_creates_and_deletes(self):
+        self.assertEqual(self.counters(), (0, 0, 0, 0))
+        with self.captureOnCommitCallbacks(execute=True):
+            user = PlatformUser.objects.create(username='s', email='s@example.com', password='x', role='student')
+            course = Course.objects.create(course_name='Курс')
+            result = Result.objects.create(user=user, test=Test.objects.create(course=course, test_name='Т'), score=50)
+        self.assertEqual(self.counters(), (1, 1, 1, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result.delete()
+        self.assertEqual(self.counters(), (1, 1, 1, 0))
+        with self.captureOnCommitCallbacks(execute=True):
+            course.delete()
+            user.delete()
+        self.assertEqual(self.counters(), (0, 0, 0, 0))
+
+
+class LeaderboardWindowTests(TestCase):
+    """Вікно рейтингу в N днів - рівно N календарних днів, включно з сьогоднішнім"""
+
+    def setUp(self):
+        cache.clear()
+        course = Course.objects.create(course_name='Курс')
+        today = timezone.localdate()
+        for name, days_ago in (('inside', 6), ('outside', 7)):
+            user = PlatformUser.objects.create(username=name, email=f'{name}@example.com', password='x')
+            LeaderboardBucket.objects.create(
+                day=today - timedelta(days=days_ago), user=user, course=course, attempts=1, score_sum=90
+            )
+
+    def test_boundary_days(self):
+        self.assertEqual([row['user__username'] for row in get_leaderboard(days=7)], ['inside'])
+        self.assertEqual(len(get_leaderboard(days=8)), 2)
+        self.assertEqual(window_start(1), timezone.localdate())
+
+    def test_explained_query_has_same_window(self):
+        # explain_hot_queries пояснює саме запит рейтингу, з тією самою межею вікна
+        _, queryset = hot_queries()[0]
+        self.assertEqual([row['user__username'] for row in queryset], ['inside'])
+
+
+class RecentActivityTests(TestCase):
+    """Активність за тиждень на сторінці статистики - сім днів, включно з сьогоднішнім"""
+
+    def setUp(self):
+        cache.clear()
+        today = timezone.localdate()
+        DailyStats.objects.create(day=today - timedelta(days=6), attempts=1, score_sum=50)
+        DailyStats.objects.create(day=today - timedelta(days=7), attempts=10, score_sum=500)
+
+    def test_boundary_days(self):
+        for name in ('statistics', 'async_statistics'):
+            self.assertEqual(self.client.get(reverse(name)).context['recent_activity'], 1, name)
+
+
+class AdminChangelistCountTests(TestCase):
+    """Стовпці з кількістю в адмін-панелі: запитів стільки ж при будь-якій кількості рядків,
+    сортування - за анотацією"""
+    # url списку -> (позиція стовпця в list_display, атрибут з анотації)
+    changelists = {
+        'admin:api_platformuser_changelist': (5, 'courses_count'),
+        'admin:api_course_changelist': (4, 'tests_count'),
+        'admin:api_test_changelist': (4, 'questions_count'),
+        'admin:api_question_changelist': (None, None),
+    }
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        self.add_rows(0, 3)
+
+    def add_rows(self, start, count):
+        """i-й викладач має i + 1 курсів, його перший курс - i + 1 тестів, перший тест - i питань"""
+        for i in range(start, start + count):
+            teacher = PlatformUser.objects.create(username=f'u{i}', email=f'u{i}@example.com', password='x')
+            courses = [Course.objects.create(course_name=f'Курс {i}.{j}', teacher=teacher) for j in range(i + 1)]
+            tests = [Test.objects.create(course=courses[0], test_name=f'Тест {i}.{j}') for j in range(i + 1)]
+            for j in range(i):
+                Question.objects.create(test=tests[0], question_text=f'Питання {i}.{j}')
+
+    def changelist_queries(self):
+        counts = {}
+        for url in self.changelists:
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(reverse(url)).status_code, 200)
+            counts[url] = len(queries)
+        return counts
+
+    def test_query_count_does_not_grow_with_rows(self):
+        before = self.changelist_queries()
+        self.add_rows(3, 5)
+        self.assertEqual(self.changelist_queries(), before)
+
+    def test_sort_by_annotated_count(self):
+        for url, (column, attribute) in self.changelists.items():
+            if column is None:
+                continue
+            for order, reverse_order in ((str(column), False), (f'-{column}', True)):
+                with self.subTest(url=url, order=order):
+                    result_list = self.client.get(reverse(url), {'o': order}).context['cl'].result_list
+                    counts = [getattr(obj, attribute) for obj in result_list]
+                    self.assertEqual(counts, sorted(counts, reverse=reverse_order))
+                    self.assertNotEqual(counts[0], counts[-1])
+
+
+class QueryProfilingTests(TestCase):
+    """QueryProfilingMiddleware записує кількість запитів і гістограми для view"""
+
+    def setUp(self):
+        cache.clear()
+        reset_profiling()
+        self.addCleanup(reset_profiling)
+
+    @override_settings(QUERY_PROFILING_ENABLED=True, QUERY_PROFILING_SAMPLE_RATE=1.0)
+    def test_records_view(self):
+        # Лічильники головної сторінки без кешу - два запити
+        with self.assertNumQueries(2):
+            self.client.get(reverse('home'))
+        profile = profiling_snapshot()['home']
+        self.assertEqual((profile['requests'], profile['avg_queries']), (1, 2))
+        self.assertEqual({label for label, count in profile['query_histogram'].items() if count}, {'<=2'})
+        self.assertEqual(sum(profile['latency_histogram'].values()), 1)
+
+    @override_settings(QUERY_PROFILING_ENABLED=False)
+    def test_disabled(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            QueryProfilingMiddleware(lambda request: None)
+        self.client.get(reverse('home'))
+        self.assertEqual(profiling_snapshot(), {})
+
+
+class ThemeResolutionTests(TestCase):
+    """Тема читається без записів у базу: cookie -> сесія -> UserTheme (через кеш) -> за замовчуванням"""
+
+    def setUp(self):
+        cache.clear()
+        platform_user = PlatformUser.objects.create(username='s', email='s@example.com', password='x')
+        UserTheme.objects.create(user=platform_user, theme='dark')
+        self.user = SimpleNamespace(is_authenticated=True, platformuser=platform_user)
+
+    def request(self, cookie=None, session_theme=None, user=None):
+        request = RequestFactory().get('/')
+        if cookie is not None:
+            response = HttpResponse()
+            response.set_signed_cookie(THEME_COOKIE_NAME, cookie, salt=THEME_COOKIE_SALT)
+            request.COOKIES[THEME_COOKIE_NAME] = response.cookies[THEME_COOKIE_NAME].value
+        request.session = {'theme': session_theme} if session_theme else {}
+        if user is not None:
+            request.user = user
+        return request
+
+    def resolve(self, request):
+        with CaptureQueriesContext(connection) as queries:
+            theme = resolve_theme(request)
+        writes = [q['sql'] for q in queries if q['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE'))]
+        self.assertEqual(writes, [])
+        return theme, len(queries)
+
+    def test_fallback_order_without_writes(self):
+        # Cookie переважає сесію й базу; сесія - базу; жодного запиту
+        self.assertEqual(self.resolve(self.request('light', 'dark', self.user)), ('light', 0))
+        self.assertEqual(self.resolve(self.request(None, 'light', self.user)), ('light', 0))
+        # Лише UserTheme: один SELECT, далі - з кешу
+        self.assertEqual(self.resolve(self.request(user=self.user)), ('dark', 1))
+        self.assertEqual(self.resolve(self.request(user=self.user)), ('dark', 0))
+        self.assertEqual(self.resolve(self.request()), ('light', 0))
+
+    def test_saved_theme_is_read_back(self):
+        request = self.request(user=self.user)
+        response = HttpResponse()
+        self.assertEqual(save_theme(request, response, 'light'), 'light')
+        self.assertEqual(UserTheme.objects.get().theme, 'light')
+        request.COOKIES[THEME_COOKIE_NAME] = response.cookies[THEME_COOKIE_NAME].value
+        self.assertEqual(self.resolve(request), ('light', 0))
+
+
+class ResultAdminTests(TestCase):
+    """Фільтр результатів за id тесту в адмін-панелі"""
+
+    def setUp(self):
+        course = Course.objects.create(course_name='Курс')
+        self.tests = [Test.objects.create(course=course, test_name=f'Тест {i}') for i in range(2)]
+        student = PlatformUser.objects.create(username='s', email='s@example.com', password='x')
+        for test in self.tests + self.tests[:1]:
+            Result.objects.create(user=student, test=test, score=50)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+
+    def test_filter_by_test_id(self):
+        url = reverse('admin:api_result_changelist')
+        response = self.client.get(url, {'test_id': self.tests[0].test_id})
+        self.assertEqual(response.context['cl'].result_count, 2)
+        self.assertContains(response, f'value="{self.tests[0].test_id}"')
+        # Список тестів для фільтра не будується
+        self.assertNotContains(response, 'Тест 1')
+        self.assertRedirects(self.client.get(url, {'test_id': 'abc'}), f'{url}?e=1', fetch_redirect_response=False)
+
+
+class SessionBackendTests(TestCase):
+    """Сесія пишеться в базу лише при зміні або коли настав час продовжити термін дії"""
+
+    def setUp(self):
+        cache.clear()
+        reset_session_write_stats()
+        session = SessionStore()
+        session['cart'] = [1]
+        session.save()
+        self.session_key = session.session_key
+        self.created_at = time.time()
+
+    def save_unmodified(self, now):
+        session = SessionStore(self.session_key)
+        self.assertEqual(session['cart'], [1])
+        with patch('api.session_backend.time') as clock:
+            clock.time.return_value = now
+            session.save()
+
+    @override_settings(SESSION_REFRESH_INTERVAL=300)
+    def test_unmodified_session_is_not_written(self):
+        with self.assertNumQueries(0):
+            self.save_unmodified(self.created_at + 299)
+        self.assertEqual(session_write_stats(), {'writes': 1, 'writes_avoided': 1})
+
+    @override_settings(SESSION_REFRESH_INTERVAL=300)
+    def test_expiry_refreshed_after_interval(self):
+        expire_date = Session.objects.get(pk=self.session_key).expire_date
+        self.save_unmodified(self.created_at + 301)
+        self.assertGreater(Session.objects.get(pk=self.session_key).expire_date, expire_date)
+        self.assertEqual(session_write_stats(), {'writes': 2, 'writes_avoided': 0})
+
+    def test_stats_on_profiling_report(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        sessions = self.client.get(reverse('profiling_report_json')).json()['sessions']
+        self.assertTrue(sessions['enabled'])
+        self.assertGreaterEqual(sessions['writes'], 2)
+        self.client.post(reverse('profiling_report'))
+        self.assertEqual(session_write_stats()['writes'], 0)
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Пул з'єднань: повторне використання, перевірка справності, обмеження розміру"""
+
+    class FakeConnection:
+        def __init__(self):
+            self.closed = False
+            self.healthy = True
+
+        def close(self):
+            self.closed = True
+
+    @staticmethod
+    def ping(connection):
+        if not connection.healthy:
+            raise ConnectionError
+
+    def test_released_connection_is_reused(self):
+        pool = ConnectionPool('default', size=2, health_check_interval=30, max_lifetime=3600)
+        connection = self.FakeConnection()
+        pool.register(connection)
+        pool.release(connection)
+        self.assertIs(pool.acquire(self.ping), connection)
+        self.assertEqual(pool.stats()['reused'], 1)
+
+    def test_broken_idle_connection_is_discarded(self):
+        pool = ConnectionPool('default', size=2, health_check_interval=0, max_lifetime=3600)
+        connection = self.FakeConnection()
+        pool.register(connection)
+        pool.release(connection)
+        connection.healthy = False
+        self.assertIsNone(pool.acquire(self.ping))
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats()['health_check_failures'], 1)
+
+    def test_connections_over_size_or_unusable_are_closed(self):
+        pool = ConnectionPool('default', size=1, health_check_interval=30, max_lifetime=3600)
+        connections = [self.FakeConnection() for _ in range(3)]
+        for connection in connections:
+            pool.register(connection)
+        self.assertTrue(pool.release(connections[0]))
+        self.assertFalse(pool.release(connections[1]))
+        self.assertFalse(pool.release(connections[2], reusable=False))
+        self.assertEqual([c.closed for c in connections], [False, True, True])
+        self.assertEqual(pool.stats()['in_use'], 0)
+
+    def test_max_open_waits_then_times_out(self):
+        pool = ConnectionPool('default', size=1, health_check_interval=30, max_lifetime=3600,
+                              max_open=1, checkout_timeout=0.2)
+        self.assertIsNone(pool.acquire(self.ping))
+        connection = self.FakeConnection()
+        pool.register(connection)
+        # Єдине з'єднання повертається, поки інший потік чекає
+        threading.Timer(0.05, pool.release, [connection]).start()
+        self.assertIs(pool.acquire(self.ping), connection)
+
+        pool.checkout_timeout = 0.01
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(self.ping)
+        stats = pool.stats()
+        self.assertEqual((stats['max_open'], stats['open'], stats['waits'], stats['timeouts']), (1, 1, 2, 1))
+
+    def test_failed_open_frees_reserved_place(self):
+        pool = ConnectionPool('default', size=1, health_check_interval=30, max_lifetime=3600,
+                              max_open=1, checkout_timeout=0)
+        self.assertIsNone(pool.acquire(self.ping))
+        pool.cancel_open()
+        self.assertEqual(pool.stats()['open'], 0)
+        self.assertIsNone(pool.acquire(self.ping))
+
+
+class PooledDatabaseWrapperTests(SimpleTestCase):
+    """Бекенд з пулом на окремій файловій SQLite: з'єднання після close() повертається
+    в пул, якщо воно чисте, і відкидається після помилки чи закриття всередині atomic"""
+    alias = 'pool_test'
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_dict = {
+            **connections['default'].settings_dict,
+            'ENGINE': 'api.db_pool.sqlite3', 'NAME': f'{directory.name}/pool.db', 'OPTIONS': {},
+            'POOL': {'SIZE': 2, 'MAX_OPEN': 2, 'CHECKOUT_TIMEOUT': 0.01},
+        }
+
+    def wrapper(self):
+        wrapper = PooledSQLiteWrapper(self.settings_dict, alias=self.alias)
+        self.addCleanup(wrapper.pool.clear)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def test_reused_after_close(self):
+        first = self.wrapper()
+        raw = first.connection
+        first.close()
+        self.assertIs(self.wrapper().connection, raw)
+        self.assertEqual(first.pool.stats()['reused'], 1)
+
+    def test_discarded_after_error(self):
+        first = self.wrapper()
+        raw = first.connection
+        with self.assertRaises(DatabaseError), first.cursor() as cursor:
+            cursor.execute('SELECT * FROM missing_table')
+        first.close()
+        self.assertIsNot(self.wrapper().connection, raw)
+        self.assertEqual(first.pool.stats()['closed'], 1)
+
+    def test_discarded_when_closed_in_atomic(self):
+        first = self.wrapper()
+        raw = first.connection
+        connections[self.alias] = first
+        self.addCleanup(connections.__delitem__, self.alias)
+        with transaction.atomic(using=self.alias):
+            first.close()
+        self.assertIsNot(self.wrapper().connection, raw)
+        self.assertEqual(first.pool.stats()['closed'], 1)
+
+    def test_checkout_over_max_open_times_out(self):
+        held = [self.wrapper(), self.wrapper()]
+        with self.assertRaises(PoolTimeout):
+            self.wrapper()
+        held[0].close()
+        self.wrapper()
+        self.assertEqual(held[0].pool.stats()['timeouts'], 1)
@@ -0,0 +1,69 @@
+from django.core.cache import cache
+
+from .models import UserTheme
+
+DEFAULT_THEME = 'light'
+THEMES = ('light', 'dark')
+
+THEME_COOKIE_NAME = 'theme'
+THEME_COOKIE_SALT = 'api.themes'
+THEME_COOKIE_MAX_AGE = 60 * 60 * 24 * 365  # 1 рік
+USER_THEME_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def user_theme_cache_key(platform_user_id):
+    return f'user_theme:{platform_user_id}'
+
+
+def _platform_user(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and hasattr(user, 'platformuser'):
+        return user.platformuser
+    return None
+
+
+def get_user_theme(platform_user_id):
+    """Тема користувача з кешу; база читається лише при промаху"""
+    key = user_theme_cache_key(platform_user_id)
+    theme = cache.get(key)
+    if theme is None:
+        theme = UserTheme.objects.filter(user_id=platform_user_id).values_list('theme', flat=True).first()
+        theme = theme or DEFAULT_THEME
+        cache.set(key, theme, USER_THEME_CACHE_TIMEOUT)
+    return theme
+
+
+def resolve_theme(request):
+    """Визначає тему запиту без жодного запису: cookie -> сесія -> кеш користувача"""
+    theme = request.get_signed_cookie(THEME_COOKIE_NAME, default=None, salt=THEME_COOKIE_SALT)
+    if theme in THEMES:
+        return theme
+
+    session = getattr(request, 'session', None)
+    if session is not None:
+        theme = session.get('theme')
+        if theme in THEMES:
+            return theme
+
+    platform_user = _platform_user(request)
+    if platform_user is not None:
+        return get_user_theme(platform_user.pk)
+    return DEFAULT_THEME
+
+
+def save_theme(request, response, theme):
+    """Єдине місце запису теми: сесія, підписане cookie і UserTheme для авторизованих"""
+    if theme not in THEMES:
+        theme = DEFAULT_THEME
+
+    request.session['theme'] = theme
+    response.set_signed_cookie(
+        THEME_COOKIE_NAME, theme, salt=THEME_COOKIE_SALT,
+        max_age=THEME_COOKIE_MAX_AGE, httponly=True, samesite='Lax'
+    )
+
+    platform_user = _platform_user(request)
+    if platform_user is not None:
+        UserTheme.objects.update_or_create(user=platform_user, defaults={'theme': theme})
+        cache.set(user_theme_cache_key(platform_user.pk), theme, USER_THEME_CACHE_TIMEOUT)
+    return theme
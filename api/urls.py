@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import views, async_views
 
 urlpatterns = [
     path('', views.home, name='home'),
@@ -26,6 +26,7 @@ urlpatterns = [
     # Questions URLs
     path('questions/', views.QuestionListView.as_view(), name='question_list'),
     path('questions/add/', views.QuestionCreateView.as_view(), name='question_add'),
+    path('questions/import/', views.question_import, name='question_import'),
     path('questions/<int:pk>/edit/', views.QuestionUpdateView.as_view(), name='question_edit'),
     path('questions/<int:pk>/delete/', views.question_delete, name='question_delete'),
 
@@ -40,10 +41,20 @@ urlpatterns = [
     path('results/add/', views.ResultCreateView.as_view(), name='result_add'),
     path('results/<int:pk>/edit/', views.ResultUpdateView.as_view(), name='result_edit'),
     path('results/<int:pk>/delete/', views.result_delete, name='result_delete'),
+    path('results/export/<str:export_format>/', views.result_export, name='result_export'),
     path('statistics/', views.statistics, name='statistics'),
     path('tests/<int:test_id>/take/', views.take_test, name='take_test'),
+    path('tests/<int:test_id>/analysis/', views.test_item_analysis, name='test_item_analysis'),
     path('results/<int:result_id>/detail/', views.test_results_detail, name='result_detail'),
 
     path('top-results/', views.top_results, name='top_results'),
     path('themes/', views.theme_selection, name='theme_selection'),
-]
\ No newline at end of file
+    path('autocomplete/<str:source>/', views.autocomplete, name='autocomplete'),
+
+    # Асинхронні версії для ASGI (uvicorn)
+    path('async/statistics/', async_views.statistics, name='async_statistics'),
+    path('async/tests/<int:test_id>/take/', async_views.take_test, name='async_take_test'),
+    path('async/top-results/', async_views.top_results, name='async_top_results'),
+    path('async/api/<str:resource>/', async_views.api_list, name='async_api_list'),
+    path('async/api/<str:resource>/<int:pk>/', async_views.api_detail, name='async_api_detail'),
+]
@@ -0,0 +1,60 @@
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import ContentVersion, Test
+
+
+def _label(model):
+    return model._meta.label_lower
+
+
+def content_version(model):
+    """Версія вмісту таблиці - мітка часу останньої зміни в наносекундах.
+
+    Зберігається в таблиці content_versions, а не в кеші процесу: зміну, зроблену
+    одним воркером, одразу бачать усі. Рядок створюється при першому читанні.
+    """
+    label = _label(model)
+    version = ContentVersion.objects.filter(model=label).values_list('version', flat=True).first()
+    if version is None:
+        version, _ = ContentVersion.objects.get_or_create(model=label, defaults={'version': time.time_ns()})
+        version = version.version
+    return version
+
+
+def bump_content_version(model):
+    """Нова версія не менша за попередню + 1, навіть якщо годинники воркерів розійшлися"""
+    label = _label(model)
+    now = time.time_ns()
+    if ContentVersion.objects.filter(model=label).update(version=Greatest(F('version') + 1, Value(now))):
+        return
+    try:
+        with transaction.atomic():
+            ContentVersion.objects.create(model=label, version=now)
+    except IntegrityError:
+        # Рядок встиг створити паралельний запит
+        ContentVersion.objects.filter(model=label).update(version=Greatest(F('version') + 1, Value(now)))
+
+
+def test_content_version(test_id):
+    """Версія вмісту тесту (питання й відповіді) для ключів кешу - Test.updated_at
+    у мікросекундах; None, якщо тесту немає. Читається з бази, тож після зміни
+    вмісту застарілий кеш не використовує жоден воркер"""
+    updated_at = Test.objects.filter(pk=test_id).values_list('updated_at', flat=True).first()
+    return None if updated_at is None else int(updated_at.timestamp() * 1_000_000)
+
+
+def touch_test_content(test_id):
+    """Нова версія вмісту тесту: оновлює updated_at (у тій самій транзакції, що й зміна)"""
+    if test_id is not None and Test.objects.filter(pk=test_id).update(updated_at=timezone.now()):
+        # updated_at є у списку тестів API - його ETag теж має змінитися
+        transaction.on_commit(lambda: bump_content_version(Test))
+
+
+def version_datetime(version):
+    return datetime.fromtimestamp(version / 1e9, tz=dt_timezone.utc)
@@ -1,16 +1,36 @@
-from django.contrib import messages
+from django.conf import settings
+from django.contrib import admin, messages
 from django.db import models
-from django.http import HttpResponseBadRequest, Http404
+from django.http import HttpResponseBadRequest, Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
-from django.urls import reverse_lazy
-from rest_framework import viewsets
-from .models import PlatformUser, Course, Test, Question, Answer, Result, UserTheme
-from .forms import UserForm, CourseForm, TestForm, QuestionForm, AnswerForm, ResultForm
+from django.urls import reverse, reverse_lazy
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from .models import PlatformUser, Course, Test, Question, Answer, Result
+from .forms import UserForm, CourseForm, TestForm, QuestionForm, QuestionImportForm, AnswerForm, ResultForm
+from .autocomplete import AUTOCOMPLETE_SOURCES, AUTOCOMPLETE_DEFAULT_LIMIT, clamp_limit
+from .dashboard import get_dashboard_counters
+from .duplicates import latest_duplicate_report
+from .db_pool import pool_stats
+from .exports import EXPORT_FORMATS, ExportFilterError, parse_export_filters, stream_export, export_content_type
+from .grading import get_answer_key, expand_answers_data
+from .ingestion import ingest_results, BULK_RESULTS_MAX_ITEMS, STATUS_CREATED
+from .item_analysis import get_item_analysis
+from .profiling import profiling_snapshot, reset_profiling
+from .question_import import QuestionBankError, detect_format, parse_question_bank, question_bank_items, \
+    import_question_bank
+from .mixins import OptimizedListMixin, KeysetPaginationMixin, ConditionalGetMixin
+from .leaderboard import get_leaderboard, clamp_window, window_start, LEADERBOARD_DEFAULT_DAYS
+from .pages import statistics_context, score_totals, totals_queryset, recent_days_queryset, top_students_queryset, \
+    hardest_tests_queryset, courses_stats_queryset, test_questions_queryset, students_queryset, graded_result, \
+    take_test_context, test_result_context
+from .session_backend import SESSION_BACKEND, session_write_stats, reset_session_write_stats
+from .search import SearchQueryError, search, clamp_search_limit, parse_search_types
+from .full_test import get_full_test_payload
+from .themes import save_theme, DEFAULT_THEME
 #from django.contrib.auth.models import User
-from django.db.models import Avg, Count, Max, Min
-from django.utils import timezone
-from datetime import timedelta
 
 from .serializers import UserSerializer, CourseSerializer, TestSerializer, QuestionSerializer, AnswerSerializer, \
     ResultSerializer
@@ -18,28 +38,23 @@ from .serializers import UserSerializer, CourseSerializer, TestSerializer, Quest
 
 # === Головна сторінка ===
 def home(request):
-    context = {
-        'teachers_count': PlatformUser.objects.filter(role='teacher').count(),
-        'students_count': PlatformUser.objects.filter(role='student').count(),
-        'admins_count': PlatformUser.objects.filter(role='admin').count(),
-        'users_count': PlatformUser.objects.count(),
-        'courses_count': Course.objects.count(),
-        'tests_count': Test.objects.count(),
-        'questions_count': Question.objects.count(),
-        'answers_count': Answer.objects.count(),
-        'results_count': Result.objects.count(),
-
-    }
+    context = get_dashboard_counters()
     return render(request, 'home.html', context)
 
 # === Users ===
-class UserListView(ListView):
+class UserListView(KeysetPaginationMixin, OptimizedListMixin, ListView):
     model = PlatformUser
     template_name = 'users/user_list.html'
     context_object_name = 'users'
 
     def get_queryset(self):
-        return PlatformUser.objects.all().order_by('id')
+        return super().get_queryset().order_by('id')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # На сторінці лише її частина - загальну кількість беремо з лічильників
+        context['users_total'] = get_dashboard_counters()['users_count']
+        return context
 
 
 class UserCreateView(CreateView):
@@ -65,10 +80,11 @@ def user_delete(request, pk):
     return render(request, 'users/user_confirm_delete.html', {'user': user})
 
 # === Courses ===
-class CourseListView(ListView):
+class CourseListView(KeysetPaginationMixin, OptimizedListMixin, ListView):
     model = Course
     template_name = 'courses/course_list.html'
     context_object_name = 'courses'
+    list_select_related = ('teacher',)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -104,10 +120,11 @@ def course_delete(request, pk):
     return render(request, 'courses/course_confirm_delete.html', {'course': course})
 
 # === Tests ===
-class TestListView(ListView):
+class TestListView(KeysetPaginationMixin, OptimizedListMixin, ListView):
     model = Test
     template_name = 'tests/test_list.html'
     context_object_name = 'tests'
+    list_select_related = ('course',)
 
 class TestCreateView(CreateView):
     model = Test
@@ -138,10 +155,12 @@ def test_delete(request, pk):
     return render(request, 'tests/test_confirm_delete.html', {'test': test})
 
 # === Questions ===
-class QuestionListView(ListView):
+class QuestionListView(KeysetPaginationMixin, OptimizedListMixin, ListView):
     model = Question
     template_name = 'questions/question_list.html'
     context_object_name = 'questions'
+    list_select_related = ('test__course',)
+    list_count_annotations = {'answers_count': 'answer'}
 
 class QuestionCreateView(CreateView):
     model = Question
@@ -171,11 +190,36 @@ def question_delete(request, pk):
         return redirect('question_list')
     return render(request, 'questions/question_confirm_delete.html', {'question': question})
 
+def question_import(request):
+    """Імпорт банку питань з файлу JSON/CSV: все або нічого, з переліком помилок по рядках"""
+    report = None
+    form = QuestionImportForm(request.POST or None, request.FILES or None)
+    if request.method == 'POST' and form.is_valid():
+        upload = form.cleaned_data['file']
+        file_format = detect_format(upload.name)
+        try:
+            if file_format is None:
+                raise QuestionBankError('Підтримуються файли .json та .csv')
+            report = import_question_bank(
+                form.cleaned_data['test'].pk, parse_question_bank(upload.read(), file_format)
+            )
+        except QuestionBankError as error:
+            form.add_error('file', str(error))
+        else:
+            if report.ok:
+                messages.success(
+                    request,
+                    f'Імпортовано питань: {report.questions_created}, відповідей: {report.answers_created}'
+                )
+                return redirect('question_list')
+    return render(request, 'questions/question_import.html', {'form': form, 'report': report})
+
 # === Answers ===
-class AnswerListView(ListView):
+class AnswerListView(KeysetPaginationMixin, OptimizedListMixin, ListView):
     model = Answer
     template_name = 'answers/answer_list.html'
     context_object_name = 'answers'
+    list_select_related = ('question__test',)
 
 class AnswerCreateView(CreateView):
     model = Answer
@@ -206,10 +250,12 @@ def answer_delete(request, pk):
     return render(request, 'answers/answer_confirm_delete.html', {'answer': answer})
 
 # === Results ===
-class ResultListView(ListView):
+class ResultListView(KeysetPaginationMixin, OptimizedListMixin, ListView):
     model = Result
     template_name = 'results/result_list.html'
     context_object_name = 'results'
+    list_select_related = ('user', 'test__course')
+    list_defer = ('answers_data',)
 
 class ResultCreateView(CreateView):
     model = Result
@@ -239,24 +285,182 @@ def result_delete(request, pk):
         return redirect('result_list')
     return render(request, 'results/result_confirm_delete.html', {'result': result})
 
+def results_export_response(export_format, params):
+    """Потоковий експорт результатів (CSV або JSONL) з фільтрами test, course, date_from, date_to"""
+    if export_format not in EXPORT_FORMATS:
+        raise Http404
+    try:
+        filters = parse_export_filters(params)
+    except ExportFilterError as error:
+        return HttpResponseBadRequest(str(error))
+
+    response = StreamingHttpResponse(stream_export(export_format, filters),
+                                     content_type=export_content_type(export_format))
+    response['Content-Disposition'] = f'attachment; filename="results.{export_format}"'
+    return response
+
+def result_export(request, export_format):
+    return results_export_response(export_format, request.GET)
+
+# === Автодоповнення для форм ===
+def autocomplete(request, source):
+    """Варіанти для AutocompleteSelect: ?q=<префікс>&limit=<N>"""
+    autocomplete_source = AUTOCOMPLETE_SOURCES.get(source)
+    if autocomplete_source is None:
+        raise Http404
+    limit = clamp_limit(request.GET.get('limit', AUTOCOMPLETE_DEFAULT_LIMIT))
+    results = autocomplete_source.search(request.GET.get('q', ''), limit=limit)
+    return JsonResponse({'results': results})
+
+# === Повнотекстовий пошук ===
+SEARCH_DETAIL_ROUTES = {
+    'question': 'question-detail',
+    'answer': 'answer-detail',
+    'test': 'test-detail',
+    'course': 'course-detail',
+}
+
+
+def search_api(request):
+    """GET /api/search/?q=<запит>&type=question,answer&limit=N&offset=M - результати за релевантністю"""
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'error': 'q: порожній запит'}, status=400)
+    try:
+        types = parse_search_types(request.GET.get('type'))
+    except SearchQueryError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    offset = request.GET.get('offset', '0')
+    offset = int(offset) if offset.isdigit() else 0
+
+    results = search(query, types, limit=clamp_search_limit(request.GET.get('limit')), offset=offset)
+    for result in results:
+        result['url'] = request.build_absolute_uri(
+            reverse(SEARCH_DETAIL_ROUTES[result['type']], args=[result['id']])
+        )
+    return JsonResponse({'query': query, 'results': results})
+
+# === Профілювання запитів (адмін-панель) ===
+def profiling_report(request):
+    """Сторінка адмін-панелі зі статистикою QueryProfilingMiddleware, пулу з'єднань і записів сесій.
+    POST скидає лічильники профілювання й сесій поточного процесу"""
+    if request.method == 'POST':
+        reset_profiling()
+        reset_session_write_stats()
+        return redirect('profiling_report')
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Профілювання запитів',
+        'views_stats': profiling_snapshot(),
+        'profiling_enabled': getattr(settings, 'QUERY_PROFILING_ENABLED', False),
+        'db_pool_enabled': getattr(settings, 'DB_POOL_ENABLED', False),
+        'db_pool': pool_stats(),
+        'session_backend_enabled': settings.SESSION_ENGINE == SESSION_BACKEND,
+        'session_writes': session_write_stats(),
+    }
+    return render(request, 'admin/profiling_report.html', context)
+
+
+def profiling_report_json(request):
+    return JsonResponse({
+        'enabled': getattr(settings, 'QUERY_PROFILING_ENABLED', False),
+        'views': profiling_snapshot(),
+        'sessions': {
+            'enabled': settings.SESSION_ENGINE == SESSION_BACKEND,
+            **session_write_stats(),
+        },
+    })
+
+def db_pool_report_json(request):
+    """Статистика пулу з'єднань воркера, що обробив запит"""
+    return JsonResponse({
+        'enabled': getattr(settings, 'DB_POOL_ENABLED', False),
+        **pool_stats(),
+    })
+
 # === API Views ===
 class UserViewSet(viewsets.ModelViewSet):
     queryset = PlatformUser.objects.all()
     serializer_class = UserSerializer
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
 
-class TestViewSet(viewsets.ModelViewSet):
+class TestViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Test.objects.all()
     serializer_class = TestSerializer
 
-class QuestionViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'])
+    def full(self, request, pk=None):
+        """Тест з питаннями та відповідями: GET /api/tests/<id>/full/.
+        Правильні відповіді не віддаються, доки не запитані явно: ?include_correct=1"""
+        include_correct = request.query_params.get('include_correct', '').lower() in ('1', 'true', 'yes')
+        payload = get_full_test_payload(pk, include_correct=include_correct) if pk.isdigit() else None
+        if payload is None:
+            raise Http404
+        return Response(payload)
+
+    @action(detail=True, methods=['get'], url_path='item-analysis')
+    def item_analysis(self, request, pk=None):
+        """Аналіз завдань: GET /api/tests/<id>/item-analysis/ - складність, дискримінація,
+        частоти вибору відповідей і альфа Кронбаха"""
+        test = self.get_object()
+        return Response(get_item_analysis(test.pk))
+
+    @action(detail=True, methods=['post'], url_path='import-questions')
+    def import_questions(self, request, pk=None):
+        """Імпорт банку питань: POST /api/tests/<id>/import-questions/ (JSON-тіло або файл у полі file)"""
+        test = self.get_object()
+        upload = request.FILES.get('file')
+        try:
+            if upload is not None:
+                file_format = detect_format(upload.name)
+                if file_format is None:
+                    raise QuestionBankError('Підтримуються файли .json та .csv')
+                items = parse_question_bank(upload.read(), file_format)
+            else:
+                items = question_bank_items(request.data)
+        except QuestionBankError as error:
+            return Response({'detail': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        report = import_question_bank(test.pk, items)
+        return Response(
+            report.as_dict(), status=status.HTTP_201_CREATED if report.ok else status.HTTP_400_BAD_REQUEST
+        )
+
+def _same_threshold(value, threshold):
+    try:
+        return round(float(value), 2) == round(threshold, 2)
+    except ValueError:
+        return False
+
+class QuestionViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Question.objects.all()
     serializer_class = QuestionSerializer
 
-class AnswerViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    def duplicates(self, request):
+        """Останній звіт про точні й майже однакові питання: GET /api/questions/duplicates/?limit=N.
+        Звіт рахує команда find_duplicate_questions (cron або вручну)"""
+        limit = request.query_params.get('limit')
+        if limit is not None and not limit.isdigit():
+            return Response({'detail': 'limit: очікується невід\'ємне ціле число'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        report = latest_duplicate_report()
+        if report is None:
+            return Response({'detail': 'Звіт ще не пораховано: виконайте manage.py find_duplicate_questions'},
+                            status=status.HTTP_404_NOT_FOUND)
+        # Звіт рахується для одного порогу - інший поріг клієнта не можна тихо підмінити
+        threshold = request.query_params.get('threshold')
+        if threshold is not None and not _same_threshold(threshold, report['threshold']):
+            return Response({'detail': f'threshold: доступний лише звіт з порогом {report["threshold"]}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if limit is not None:
+            report = {**report, 'clusters': report['clusters'][:int(limit)]}
+        return Response(report)
+
+class AnswerViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Answer.objects.all()
     serializer_class = AnswerSerializer
 
@@ -264,6 +468,35 @@ class ResultViewSet(viewsets.ModelViewSet):
     queryset = Result.objects.all()
     serializer_class = ResultSerializer
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Пакетне збереження спроб: POST /api/results/bulk/"""
+        items = request.data.get('results') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list):
+            return Response({'detail': 'Очікується список результатів'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > BULK_RESULTS_MAX_ITEMS:
+            return Response(
+                {'detail': f'Не більше {BULK_RESULTS_MAX_ITEMS} результатів за один запит'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        statuses = ingest_results(items)
+        created = sum(1 for item in statuses if item['status'] == STATUS_CREATED)
+        failed = len(statuses) - created
+
+        if failed == 0:
+            response_status = status.HTTP_201_CREATED
+        elif created == 0:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+        return Response({'created': created, 'failed': failed, 'items': statuses}, status=response_status)
+
+    @action(detail=False, methods=['get'], url_path=r'export/(?P<export_format>csv|jsonl)')
+    def export(self, request, export_format=None):
+        """Потоковий експорт: GET /api/results/export/csv/?test=&course=&date_from=&date_to=&answers=1"""
+        return results_export_response(export_format, request.query_params)
+
 
 def documentation(request):
     """Сторінка документації системи"""
@@ -403,49 +636,15 @@ def documentation(request):
 # === СТАТИСТИКА ===
 def statistics(request):
     """Сторінка з детальною статистикою"""
-
-    # Загальна статистика
-    total_users = PlatformUser.objects.count()
-    total_tests_taken = Result.objects.count()
-    avg_score = Result.objects.aggregate(Avg('score'))['score__avg'] or 0
-
-    # Статистика по ролям
-    students = PlatformUser.objects.filter(role='student').count()
-    teachers = PlatformUser.objects.filter(role='teacher').count()
-
-    # Топ-5 студентів
-    top_students = Result.objects.values('user__username').annotate(
-        avg_score=Avg('score'),
-        tests_count=Count('result_id')
-    ).order_by('-avg_score')[:5]
-
-    # Топ-5 тестів (найбільш складні)
-    hardest_tests = Result.objects.values('test__test_name').annotate(
-        avg_score=Avg('score'),
-        attempts=Count('result_id')
-    ).order_by('avg_score')[:5]
-
-    # Активність за останній тиждень
-    week_ago = timezone.now() - timedelta(days=7)
-    recent_activity = Result.objects.filter(passed_at__gte=week_ago).count()
-
-    # Статистика по курсах
-    courses_stats = Course.objects.annotate(
-        tests_count=Count('test'),
-        avg_score=Avg('test__result__score')
-    ).order_by('-tests_count')
-
-    context = {
-        'total_users': total_users,
-        'students': students,
-        'teachers': teachers,
-        'total_tests_taken': total_tests_taken,
-        'avg_score': round(avg_score, 2),
-        'top_students': top_students,
-        'hardest_tests': hardest_tests,
-        'recent_activity': recent_activity,
-        'courses_stats': courses_stats,
-    }
+    # Лічильники беремо з кешу головної сторінки, решту - з накопичувальних таблиць
+    context = statistics_context(
+        get_dashboard_counters(),
+        totals=totals_queryset().aggregate(**score_totals()),
+        recent_days=recent_days_queryset().aggregate(**score_totals()),
+        top_students=top_students_queryset(),
+        hardest_tests=hardest_tests_queryset(),
+        courses_stats=courses_stats_queryset(),
+    )
 
     return render(request, 'statistics.html', context)
 
@@ -454,95 +653,60 @@ def statistics(request):
 def take_test(request, test_id):
     """Інтерактивне проходження тесту"""
     test = get_object_or_404(Test, test_id=test_id)
-    questions = Question.objects.filter(test=test).prefetch_related('answer_set')
 
     if request.method == 'POST':
-        # Обробка відповідей
-        score = 0
-        total_questions = questions.count()
-        answers_data = []
-
-        for question in questions:
-            selected_answer_id = request.POST.get(f'question_{question.question_id}')
-            if selected_answer_id:
-                selected_answer = Answer.objects.get(answer_id=selected_answer_id)
-                is_correct = selected_answer.is_correct
-                if is_correct:
-                    score += 1
-
-                answers_data.append({
-                    'question_id': question.question_id,
-                    'question_text': question.question_text,
-                    'selected_answer': selected_answer.answer_text,
-                    'is_correct': is_correct,
-                    'correct_answer': Answer.objects.filter(
-                        question=question,
-                        is_correct=True
-                    ).first().answer_text
-                })
-
-        # Підрахунок результату
-        final_score = (score / total_questions * 100) if total_questions > 0 else 0
+        # Оцінювання за кешованим ключем відповідей - без запитів на кожне питання
+        grade = get_answer_key(test.test_id).grade_post(request.POST)
 
         # Збереження результату (якщо є user_id в POST)
         user_id = request.POST.get('user_id')
         if user_id:
-            user = PlatformUser.objects.get(id=user_id)
-            Result.objects.create(
-                user=user,
-                test=test,
-                score=final_score,
-                answers_data=answers_data
-            )
+            graded_result(test, PlatformUser.objects.get(id=user_id), grade).save()
 
         # Показуємо результати
-        return render(request, 'tests/test_result.html', {
-            'test': test,
-            'score': final_score,
-            'correct_answers': score,
-            'total_questions': total_questions,
-            'answers_data': answers_data
-        })
+        return render(request, 'tests/test_result.html', test_result_context(test, grade))
 
     # GET запит - показуємо тест
-    users = PlatformUser.objects.filter(role='student')
-    return render(request, 'tests/take_test.html', {
-        'test': test,
-        'questions': questions,
-        'users': users
-    })
+    return render(request, 'tests/take_test.html', take_test_context(
+        test, test_questions_queryset(test), students_queryset()
+    ))
 
 
 def test_results_detail(request, result_id):
     """Детальний перегляд результату тесту"""
-    result = get_object_or_404(Result, result_id=result_id)
+    result = get_object_or_404(Result.objects.select_related('user', 'test'), result_id=result_id)
+    answers_data = expand_answers_data(result.answers_data, result.test_id)
 
     context = {
         'result': result,
-        'answers_data': result.answers_data or []
+        'answers_data': answers_data,
+        'correct_answers': sum(1 for item in answers_data if item.get('is_correct')),
     }
 
     return render(request, 'tests/result_detail.html', context)
 
+def test_item_analysis(request, test_id):
+    """Аналіз завдань тесту за збереженими відповідями"""
+    test = get_object_or_404(Test.objects.select_related('course'), test_id=test_id)
+    return render(request, 'tests/item_analysis.html', {
+        'test': test,
+        'analysis': get_item_analysis(test.test_id),
+    })
+
 # === Top Results ===
 def top_results(request):
-    # Топ-5 студентів за останні 7 днів
-    week_ago = timezone.now() - timezone.timedelta(days=7)
-
-    top_students = Result.objects.filter(
-        passed_at__gte=week_ago,
-        user__role='student'
-    ).values(
-        'user__username',
-        'user__id'
-    ).annotate(
-        avg_score=models.Avg('score'),
-        tests_count=models.Count('test')
-    ).order_by('-avg_score')[:5]
+    # Топ-5 студентів за останні N днів (за замовчуванням 7), за потреби - в межах курсу
+    days = clamp_window(request.GET.get('days', LEADERBOARD_DEFAULT_DAYS))
+    course = None
+    course_id = request.GET.get('course')
+    if course_id and course_id.isdigit():
+        course = Course.objects.filter(course_id=course_id).first()
 
     context = {
-        'top_students': top_students,
-        'week_ago': week_ago.date()
+        'top_students': get_leaderboard(days=days, course_id=course.course_id if course else None),
+        'week_ago': window_start(days),
+        'days': days,
+        'course': course,
     }
     return render(request, 'top_results/top_results.html', context)
 
@@ -550,37 +714,12 @@ def top_results(request):
 # === Theme Selection ===
 def theme_selection(request):
     if request.method == 'POST':
-        theme = request.POST.get('theme', 'light')
-
-        # Зберігаємо в сесії для всіх користувачів
-        request.session['theme'] = theme
-        request.session.modified = True
-
-        # Для авторизованих користувачів зберігаємо в базі
-        if request.user.is_authenticated and hasattr(request.user, 'platformuser'):
-            user_theme, created = UserTheme.objects.get_or_create(
-                user=request.user.platformuser
-            )
-            user_theme.theme = theme
-            user_theme.save()
+        response = redirect('theme_selection')
+        # Зберігаємо в сесії, підписаному cookie і (для авторизованих) в базі
+        theme = save_theme(request, response, request.POST.get('theme', DEFAULT_THEME))
 
         messages.success(request, f'Тему змінено на {"світлу" if theme == "light" else "темну"}!')
-        return redirect('theme_selection')
+        return response
 
     # Для GET запиту просто показуємо сторінку
     return render(request, 'themes/theme_selection.html')
-
-
-# Додати context processor для теми
-def theme_context(request):
-    current_theme = 'light'
-    if request.user.is_authenticated and hasattr(request.user, 'platformuser'):
-        try:
-            user_theme = UserTheme.objects.get(user=request.user.platformuser)
-            current_theme = user_theme.theme
-        except UserTheme.DoesNotExist:
-            pass
-    else:
-        current_theme = request.session.get('theme', 'light')
-
-    return {'current_theme': current_theme}
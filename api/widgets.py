@@ -0,0 +1,27 @@
+from django import forms
+from django.urls import reverse_lazy
+
+from .autocomplete import AUTOCOMPLETE_SOURCES
+
+
+class AutocompleteSelect(forms.Select):
+    """Select, що рендерить лише вибраний варіант, а решту підвантажує з /autocomplete/<source>/.
+
+    Скрипт підключено в base.html (includes/autocomplete.html). Перевірка надісланого
+    id лишається за ModelChoiceField - це один запит get(pk=...).
+    """
+
+    def __init__(self, source, attrs=None):
+        self.source = source
+        attrs = {
+            **(attrs or {}),
+            'data-autocomplete-url': reverse_lazy('autocomplete', args=[source]),
+        }
+        super().__init__(attrs)
+
+    def optgroups(self, name, value, attrs=None):
+        options = [self.create_option(name, '', '---------', not any(value), 0)]
+        selected = AUTOCOMPLETE_SOURCES[self.source].selected(value)
+        for index, row in enumerate(selected, start=1):
+            options.append(self.create_option(name, row['id'], row['text'], True, index))
+        return [(None, options, 0)]
@@ -1,12 +1,24 @@
 import os
+import sys
 import django
+import argparse
+import hashlib
 import importlib
 import inspect
+import json
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from pathlib import Path
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
 import re
 
+# matplotlib імпортується лише при малюванні схеми - режим --json працює без нього
+DIAGRAM_PATH = 'django_detailed_architecture.png'
+REPORT_PATH = 'django_detailed_report.md'
+CACHE_PATH = '.architecture_cache.json'
+CACHE_VERSION = 1
+# Менше шаблонів швидше проаналізувати в одному процесі, ніж запускати пул
+PARALLEL_MIN_TEMPLATES = 8
+
 
 def setup_django():
     """Автоматичне налаштування Django"""
@@ -30,8 +42,26 @@ def discover_django_apps():
     return apps_list
 
 
-def analyze_app_structure(app_config):
-    """Детально аналізує структуру додатка"""
+def find_templates(app_config):
+    """Шаблони додатка (templates/<app> проекту та додатка)"""
+    templates_dirs = [
+        Path('templates') / app_config.name,
+        Path(app_config.path) / 'templates' / app_config.name
+    ]
+    templates = []
+    for templates_dir in templates_dirs:
+        if templates_dir.exists():
+            templates.extend(sorted(templates_dir.glob('*.html')))
+    return templates
+
+
+def analyze_app_structure(app_config, template_components=None):
+    """Детально аналізує структуру додатка.
+
+    template_components - вже проаналізовані шаблони {шлях: компоненти} (кеш/пул процесів);
+    шаблони, яких там немає, аналізуються на місці.
+    """
+    template_components = template_components or {}
     app_info = {
         'name': app_config.verbose_name,
         'models': [],
@@ -66,20 +96,13 @@ def analyze_app_structure(app_config):
         print(f"   ⚠️ Не вдалося імпортувати views: {e}")
 
     # Templates
-    templates_dirs = [
-        Path('templates') / app_config.name,
-        Path(app_config.path) / 'templates' / app_config.name
-    ]
-
-    for templates_dir in templates_dirs:
-        if templates_dir.exists():
-            for template_file in templates_dir.glob('*.html'):
-                template_info = {
-                    'name': template_file.name,
-                    'path': str(template_file),
-                    'components': analyze_template(template_file)
-                }
-                app_info['templates'].append(template_info)
+    for template_file in find_templates(app_config):
+        components = template_components.get(str(template_file))
+        app_info['templates'].append({
+            'name': template_file.name,
+            'path': str(template_file),
+            'components': components if components is not None else analyze_template(template_file)
+        })
 
     # Admin
     try:
@@ -136,6 +159,9 @@ def analyze_template(template_path):
 
 def generate_clear_architecture_diagram(apps_data):
     """Генерує зрозумілу візуальну схему"""
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as patches
+
     fig, ax = plt.subplots(figsize=(18, 14))
     ax.set_xlim(0, 16)
     ax.set_ylim(0, 12)
@@ -228,14 +254,14 @@ def generate_clear_architecture_diagram(apps_data):
     plt.title('🎯 Детальна архітектура Django проекту\n',
               fontsize=20, pad=30, weight='bold', color='#2C3E50')
     plt.tight_layout()
-    plt.savefig('django_detailed_architecture.png', dpi=300, bbox_inches='tight',
+    plt.savefig(DIAGRAM_PATH, dpi=300, bbox_inches='tight',
                 facecolor='#F8F9FA', edgecolor='none')
     plt.close()
 
 
 def generate_detailed_report(apps_data):
     """Генерує дуже детальний текстовий звіт"""
-    with open('django_detailed_report.md', 'w', encoding='utf-8') as f:
+    with open(REPORT_PATH, 'w', encoding='utf-8') as f:
         f.write("# 🎯 Детальний звіт архітектури Django проекту\n\n")
 
         for app_info in apps_data:
@@ -321,42 +347,201 @@ def print_console_summary(apps_data):
                 print(f"      • ... (+{len(app_info['templates']) - 2})")
 
 
-def main():
-    """Головна функція"""
-    print("🚀 ЗАПУСК ДЕТАЛЬНОГО АНАЛІЗУ DJANGO ПРОЄКТУ...")
-    print("=" * 50)
+# === Інкрементальний режим ===
+def file_hash(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
 
+def file_unchanged(path, entry):
+    """Швидка перевірка за mtime/розміром; при розбіжності - за вмістом (напр., після git checkout)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    if entry.get('mtime') == stat.st_mtime_ns and entry.get('size') == stat.st_size:
+        return True
+    if entry.get('sha256') == file_hash(path):
+        entry['mtime'], entry['size'] = stat.st_mtime_ns, stat.st_size
+        return True
+    return False
+
+
+def file_entry(path, **extra):
+    stat = os.stat(path)
+    return {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': file_hash(path), **extra}
+
+
+def load_cache(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if cache.get('version') == CACHE_VERSION else {}
+
+
+def save_cache(path, cache):
+    cache['version'] = CACHE_VERSION
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+
+
+def source_files(watched_dirs):
+    """Файли, від яких залежить результат аналізу: модулі додатків і шаблони"""
+    files = set()
+    for directory in watched_dirs:
+        directory = Path(directory)
+        if directory.exists():
+            files.update(str(path) for pattern in ('*.py', '*.html') for path in directory.rglob(pattern))
+    return sorted(files)
+
+
+def sources_unchanged(cache):
+    """True, якщо з попереднього запуску не змінився, не з'явився і не зник жоден файл"""
+    sources = cache.get('sources')
+    if not sources or 'apps_data' not in cache:
+        return False
+    if source_files(cache.get('watched_dirs', [])) != sorted(sources):
+        return False
+    return all(file_unchanged(path, entry) for path, entry in sources.items())
+
+
+def analyze_templates(paths, cache, jobs):
+    """Компоненти шаблонів {шлях: компоненти}; змінені шаблони аналізуються в пулі процесів"""
+    cached = cache.setdefault('templates', {})
+    result, pending = {}, []
+    for path in map(str, paths):
+        entry = cached.get(path)
+        if entry is not None and file_unchanged(path, entry):
+            result[path] = entry['components']
+        else:
+            pending.append(path)
+
+    if pending:
+        print(f"📄 Шаблонів до аналізу: {len(pending)} (з кешу: {len(result)})")
+        if jobs > 1 and len(pending) >= PARALLEL_MIN_TEMPLATES:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                analyzed = list(pool.map(analyze_template, pending, chunksize=max(1, len(pending) // (jobs * 4))))
+        else:
+            analyzed = [analyze_template(path) for path in pending]
+        for path, components in zip(pending, analyzed):
+            result[path] = components
+            cached[path] = file_entry(path, components=components)
+
+    # Видалені шаблони не тримаємо в кеші
+    cache['templates'] = {path: cached[path] for path in result}
+    return result
+
+
+def collect_apps_data(cache, jobs):
     if not setup_django():
-        return
+        return None
 
     # Знаходимо всі додатки
     apps = discover_django_apps()
     print(f"📦 Знайдено додатків: {len(apps)}")
 
+    template_paths = [path for app in apps for path in find_templates(app)]
+    template_components = analyze_templates(template_paths, cache, jobs)
+
     # Аналізуємо кожен додаток
-    apps_data = []
-    for app in apps:
-        app_info = analyze_app_structure(app)
-        apps_data.append(app_info)
+    apps_data = [analyze_app_structure(app, template_components) for app in apps]
+
+    watched_dirs = {str(Path('templates'))} | {app.path for app in apps}
+    settings_module = importlib.import_module(os.environ['DJANGO_SETTINGS_MODULE'])
+    watched_dirs.add(str(Path(settings_module.__file__).parent))
+    cache['watched_dirs'] = sorted(watched_dirs)
+    cache['sources'] = {path: file_entry(path) for path in source_files(watched_dirs)}
+    cache['apps_data'] = apps_data
+    return apps_data
+
+
+def apps_data_fingerprint(apps_data):
+    return hashlib.sha256(json.dumps(apps_data, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def summary_json(apps_data):
+    return {
+        'apps': apps_data,
+        'totals': {
+            'apps': len(apps_data),
+            'models': sum(len(app['models']) for app in apps_data),
+            'views': sum(len(app['views']) for app in apps_data),
+            'templates': sum(len(app['templates']) for app in apps_data),
+        },
+    }
 
-    # Генеруємо результати
-    print("\n🎨 СТВОРЕННЯ ВІЗУАЛІЗАЦІЇ...")
-    generate_clear_architecture_diagram(apps_data)
 
-    print("📊 СТВОРЕННЯ ДЕТАЛЬНОГО ЗВІТУ...")
-    generate_detailed_report(apps_data)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Аналіз архітектури Django проекту')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Використовувати кеш аналізу та не перегенеровувати незмінені результати')
+    parser.add_argument('--cache', default=CACHE_PATH, help=f'Файл кешу (за замовчуванням {CACHE_PATH})')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Кількість процесів для аналізу шаблонів')
+    parser.add_argument('--json', nargs='?', const='-', metavar='PATH',
+                        help='Вивести результат у JSON (stdout або файл) без схеми, звіту і matplotlib')
+    parser.add_argument('--force', action='store_true', help='Перегенерувати схему і звіт навіть без змін')
+    return parser.parse_args(argv)
 
-    print("📋 ВИВЕДЕННЯ ЗВЕДЕННЯ...")
-    print_console_summary(apps_data)
 
-    print("\n" + "=" * 50)
-    print("✅ АНАЛІЗ ЗАВЕРШЕНО!")
-    print("📁 РЕЗУЛЬТАТИ:")
-    print("   - 📊 django_detailed_architecture.png (Візуальна схема)")
-    print("   - 📄 django_detailed_report.md (Детальний звіт)")
-    print("   - 📋 Зведення вище (Консольна версія)")
-    print("=" * 50)
+def main(argv=None):
+    """Головна функція"""
+    args = parse_args(argv)
+    cache = load_cache(args.cache) if args.incremental else {}
+
+    # Службові повідомлення - в stderr, щоб stdout містив лише JSON
+    stdout = sys.stdout
+    with redirect_stdout(sys.stderr if args.json == '-' else stdout):
+        print("🚀 ЗАПУСК ДЕТАЛЬНОГО АНАЛІЗУ DJANGO ПРОЄКТУ...")
+        print("=" * 50)
+
+        if args.incremental and sources_unchanged(cache):
+            print("♻️ Файли проекту не змінилися - використовую збережений аналіз")
+            apps_data = cache['apps_data']
+        else:
+            apps_data = collect_apps_data(cache, args.jobs)
+            if apps_data is None:
+                return
+
+        if args.json:
+            if args.incremental:
+                save_cache(args.cache, cache)
+            output = json.dumps(summary_json(apps_data), ensure_ascii=False, indent=2)
+            if args.json == '-':
+                stdout.write(output + '\n')
+            else:
+                Path(args.json).write_text(output, encoding='utf-8')
+                print(f"✅ JSON збережено: {args.json}")
+            return
+
+        fingerprint = apps_data_fingerprint(apps_data)
+        outputs_exist = Path(DIAGRAM_PATH).exists() and Path(REPORT_PATH).exists()
+        if args.incremental and not args.force and outputs_exist and cache.get('outputs_fingerprint') == fingerprint:
+            print("\n♻️ Архітектура не змінилася - схема і звіт актуальні")
+        else:
+            # Генеруємо результати
+            print("\n🎨 СТВОРЕННЯ ВІЗУАЛІЗАЦІЇ...")
+            generate_clear_architecture_diagram(apps_data)
+
+            print("📊 СТВОРЕННЯ ДЕТАЛЬНОГО ЗВІТУ...")
+            generate_detailed_report(apps_data)
+            cache['outputs_fingerprint'] = fingerprint
+
+        if args.incremental:
+            save_cache(args.cache, cache)
+
+        print("📋 ВИВЕДЕННЯ ЗВЕДЕННЯ...")
+        print_console_summary(apps_data)
+
+        print("\n" + "=" * 50)
+        print("✅ АНАЛІЗ ЗАВЕРШЕНО!")
+        print("📁 РЕЗУЛЬТАТИ:")
+        print(f"   - 📊 {DIAGRAM_PATH} (Візуальна схема)")
+        print(f"   - 📄 {REPORT_PATH} (Детальний звіт)")
+        print("   - 📋 Зведення вище (Консольна версія)")
+        print("=" * 50)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -53,15 +53,33 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.profiling.QueryProfilingMiddleware',
 ]
 
+# Профілювання запитів: кількість і час SQL, дублікати (N+1), час поза базою по кожному view.
+# Звіт: /admin/profiling/ та /admin/profiling/json/
+QUERY_PROFILING_ENABLED = os.environ.get('QUERY_PROFILING_ENABLED', '0') == '1'
+QUERY_PROFILING_SAMPLE_RATE = float(os.environ.get('QUERY_PROFILING_SAMPLE_RATE', '1.0'))
+QUERY_PROFILING_N_PLUS_ONE_THRESHOLD = 3
+
 # Налаштування сесій
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Кеш + БД, запис у БД лише при зміні даних або раз на SESSION_REFRESH_INTERVAL
+SESSION_ENGINE = 'api.session_backend'
 SESSION_COOKIE_AGE = 60 * 60 * 24 * 30  # 30 днів
 SESSION_SAVE_EVERY_REQUEST = True
+SESSION_REFRESH_INTERVAL = 60 * 5  # 5 хвилин
 
 ROOT_URLCONF = 'education_platform_api.urls'
 
+# Пагінація: keyset за первинним ключем для API та HTML-списків
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetCursorPagination',
+}
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 500
+LIST_PAGE_SIZE = 50
+LIST_MAX_PAGE_SIZE = 500
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 TEMPLATES = [
@@ -114,6 +132,32 @@ if DATABASE_URL:
         conn_health_checks=True,
     )
 
+# Пул з'єднань у кожному воркері (api.db_pool): з'єднання після запиту повертається в пул,
+# а не закривається, тож його підхоплює наступний запит будь-якого потоку.
+# Вимкнено (DB_POOL_ENABLED=0) - постійні з'єднання Django на потік (CONN_MAX_AGE).
+DB_POOL_ENABLED = os.environ.get('DB_POOL_ENABLED', '1') == '1'
+DB_POOL = {
+    'SIZE': int(os.environ.get('DB_POOL_SIZE', '10')),
+    'MAX_OPEN': int(os.environ.get('DB_POOL_MAX_OPEN', '20')),
+    'CHECKOUT_TIMEOUT': float(os.environ.get('DB_POOL_CHECKOUT_TIMEOUT', '10')),
+    'HEALTH_CHECK_INTERVAL': int(os.environ.get('DB_POOL_HEALTH_CHECK_INTERVAL', '30')),
+    'MAX_LIFETIME': int(os.environ.get('DB_POOL_MAX_LIFETIME', '3600')),
+}
+POOLED_ENGINES = {
+    'django.db.backends.mysql': 'api.db_pool.mysql',
+    'django.db.backends.postgresql': 'api.db_pool.postgresql',
+    'django.db.backends.sqlite3': 'api.db_pool.sqlite3',
+}
+for _database in DATABASES.values():
+    if DB_POOL_ENABLED and _database['ENGINE'] in POOLED_ENGINES:
+        _database['ENGINE'] = POOLED_ENGINES[_database['ENGINE']]
+        _database['POOL'] = DB_POOL
+        # Повернення в пул дешеве - з'єднання не закріплюється за потоком
+        _database['CONN_MAX_AGE'] = 0
+    else:
+        _database.setdefault('CONN_MAX_AGE', 600)
+        _database.setdefault('CONN_HEALTH_CHECKS', True)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -14,7 +14,11 @@ router.register(r'answers', views.AnswerViewSet)
 router.register(r'results', views.ResultViewSet)
 
 urlpatterns = [
+    path('admin/profiling/', admin.site.admin_view(views.profiling_report), name='profiling_report'),
+    path('admin/profiling/json/', admin.site.admin_view(views.profiling_report_json), name='profiling_report_json'),
+    path('admin/db-pool/json/', admin.site.admin_view(views.db_pool_report_json), name='db_pool_report_json'),
     path('admin/', admin.site.urls),
+    path('api/search/', views.search_api, name='search_api'),
     path('api/', include(router.urls)),  # API endpoints
     path('', include('api.urls')),       # UI endpoints
 ]